@@ -1,25 +1,289 @@
+import csv
+import functools
+import hashlib
+import io
+import math
 import os
-import psycopg2
+import re
+import time
+from datetime import date
+from urllib.parse import urlencode
+from psycopg2 import errors
 from psycopg2.extras import RealDictCursor
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, g, has_app_context, has_request_context
+from flask.json.provider import JSONProvider
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+
+import metrics
+import profiling
+from cache import get_cache
+from db import DB_NAME, DB_REPLICA_STALE_WINDOW, DB_REPLICAS, PoolTimeout, get_pool, get_replicas
+from importer import IMPORT_FORMATS, THESIS_YEAR_RANGE, import_theses
+from serializers import create_json_provider, export_json_line
+from similarity import SIMILAR_K, forget_theses, lock_similar, refresh_similar
 
 app = Flask(__name__)
-
-# DB CONFIG
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_NAME = os.getenv("DB_NAME", "gtsdb")
-DB_PORT = int(os.getenv("DB_PORT", "5432"))
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+# JSON_BACKEND=orjson ile hızlı encoder (bkz. serializers.py)
+app.json = create_json_provider(app)
+
+# --- READ REPLICAS (DB_REPLICAS ayarlıysa, bkz. db.py) ---
+# GET istekleri ve sadece okuyan POST endpoint'leri replica'lardan okur; yazan
+# istekler primary'ye gider. Başarılı bir yazmadan sonra istemci
+# DB_REPLICA_STICKY saniye boyunca primary'den okur (read-your-writes): süre
+# cookie'de tutulduğu için tüm worker'larda geçerlidir. Replica'nın geride
+# olabileceği süreden (max_lag + kontrol aralığı) kısa olamaz.
+DB_REPLICA_STICKY = max(
+    float(os.getenv("DB_REPLICA_STICKY", str(DB_REPLICA_STALE_WINDOW))), DB_REPLICA_STALE_WINDOW
+)
+REPLICA_STICKY_COOKIE = "gts_primary_until"
+READ_ONLY_ENDPOINTS = {"api_search", "api_bundle"}
+
+def pinned_to_primary(cookies):
+    # İstemci son yazmasından bu yana DB_REPLICA_STICKY saniye içindeyse (asgi.py de kullanır)
+    try:
+        primary_until = float(cookies.get(REPLICA_STICKY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    return primary_until > time.time()
+
+def reads_from_replica():
+    if not DB_REPLICAS or not has_request_context():
+        return False
+    if request.method not in ("GET", "HEAD") and request.endpoint not in READ_ONLY_ENDPOINTS:
+        return False
+    return not pinned_to_primary(request.cookies)
 
 def get_db_connection():
-    return psycopg2.connect(
-        host=DB_HOST,
-        database=DB_NAME,
-        port=DB_PORT,
-        user=DB_USER,
-        password=DB_PASSWORD
-    )
+    # Bağlantı havuzdan alınır; conn.close() bağlantıyı havuza geri verir.
+    # /api/bundle içindeki alt istekler bundle'ın bağlantısını paylaşır.
+    if has_app_context() and g.get("bundle_connection") is not None:
+        return g.bundle_connection
+    conn = None
+    if reads_from_replica():
+        # Uygun replica yoksa primary'ye düşülür
+        replica, conn = get_replicas().getconn(g.get("db_replica"))
+        if replica is not None:
+            g.db_replica = replica
+    if conn is None:
+        conn = get_pool().getconn()
+    if has_app_context():
+        g.setdefault("db_connections", []).append(conn)
+    return conn
+
+@app.teardown_appcontext
+def release_db_connections(exc):
+    # Hata yüzünden close() çağrılmadan kalan bağlantılar da havuza döner
+    for conn in g.pop("db_connections", []):
+        conn.close()
+
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(exc):
+    return jsonify({"error": str(exc)}), 503
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+@app.errorhandler(ApiError)
+def handle_api_error(exc):
+    return jsonify({"error": str(exc)}), exc.status
+
+if DB_REPLICAS:
+    @app.after_request
+    def pin_writer_to_primary(response):
+        replica = g.get("db_replica")
+        if replica is not None:
+            response.headers["X-DB-Replica"] = replica.name
+        elif (request.method not in ("GET", "HEAD", "OPTIONS")
+              and request.endpoint not in READ_ONLY_ENDPOINTS
+              and response.status_code < 400):
+            response.set_cookie(
+                REPLICA_STICKY_COOKIE,
+                f"{time.time() + DB_REPLICA_STICKY:.3f}",
+                max_age=math.ceil(DB_REPLICA_STICKY),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+# --- METRICS (METRICS_ENABLED=1 ise, bkz. metrics.py) ---
+def metrics_route():
+    # Etiket route kalıbıdır (/api/theses/<int:th_num>), id'ler kardinaliteyi artırmasın
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+class TimedJSONProvider(JSONProvider):
+    # Seçili provider'ı sarar; cevap gövdesi üretme süresi ölçülür
+    def __init__(self, app, inner):
+        super().__init__(app)
+        self.inner = inner
+
+    def _timed(self, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.JSON_SERIALIZE.observe(time.perf_counter() - started, metrics.current_route.get())
+
+    def dumps(self, obj, **kwargs):
+        return self._timed(self.inner.dumps, obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return self.inner.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        return self._timed(self.inner.response, *args, **kwargs)
+
+if metrics.METRICS_ENABLED:
+    app.json = TimedJSONProvider(app, app.json)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        # SQL ve JSON ölçümleri bu route ile etiketlenir
+        metrics.current_route.set(metrics_route())
+
+    @app.after_request
+    def observe_request_metrics(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            metrics.REQUEST_DURATION.observe(
+                time.perf_counter() - started, request.method, metrics_route(), str(response.status_code)
+            )
+        return response
+
+    @app.teardown_request
+    def count_request_exception(exc):
+        if exc is not None:
+            metrics.REQUEST_EXCEPTIONS.inc(metrics_route(), type(exc).__name__)
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# --- PROFILING (PROFILE_ENABLED=1 ise, bkz. profiling.py) ---
+if profiling.PROFILE_ENABLED:
+    @app.before_request
+    def start_request_profile():
+        # Yavaş sorgu logu route'u buradan okur
+        metrics.current_route.set(metrics_route())
+        if profiling.profile_requested(request.headers.get("X-Profile"), request.args.get("profile")):
+            g.profile_started = time.perf_counter()
+            g.profile = profiling.start_profile()
+
+    @app.after_request
+    def attach_request_profile(response):
+        profile = g.pop("profile", None)
+        if profile is not None:
+            total = time.perf_counter() - g.pop("profile_started")
+            response.headers["Server-Timing"] = profiling.finish_profile(profile, metrics_route(), total)
+        return response
+
+# --- RESPONSE CACHE ---
+# GET cevapları tag'lerle saklanır; yazma route'ları commit sonrası ilgili tag'leri
+# invalidate eder. Tag'ler:
+#   "theses", "persons", "universities", "institutes"    -> liste/arama cevapları
+#   "thesis:N", "person:N", "university:N", "institute:N" -> detaylar (ve onları gösteren cevaplar)
+#   "person:N:theses", "university:N:theses", "institute:N:theses",
+#   "university:N:institutes", "person:N:supervised"     -> alt listeler
+#   "thesis-sublists"                                    -> tüm tez alt listeleri (toplu import)
+#   "similar"                                            -> benzer tez listeleri (terim değişikliği)
+def cached(*tags, dynamic_tags=None):
+    # tags içindeki {th_num} gibi alanlar route parametreleriyle doldurulur;
+    # dynamic_tags(json) cevaptaki id'lerden ek tag üretir
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            cache = get_cache()
+            if cache is None:
+                return view(**kwargs)
+
+            key = request.full_path
+            hit = cache.get(key)
+            if hit is not None:
+                body, mimetype, headers = hit
+                response = Response(body, mimetype=mimetype, headers=headers)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            epoch = cache.epoch()
+            response = app.make_response(view(**kwargs))
+            # Yeni bir yazmayı henüz görmemiş olabilecek replica cevabı cache'e girmez
+            from_replica = g.get("db_replica") is not None
+            if (response.status_code == 200 and not response.is_streamed
+                    and not (from_replica and cache.invalidated_within(DB_REPLICA_STALE_WINDOW))):
+                route_tags = [tag.format(**kwargs) for tag in tags]
+                if dynamic_tags is not None:
+                    route_tags.extend(dynamic_tags(response.get_json()))
+                headers = [(k, v) for k, v in response.headers.items()
+                           if k not in ("Content-Type", "Content-Length")]
+                cache.set(key, (response.get_data(), response.mimetype, headers), route_tags, epoch)
+                response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+def invalidate(*tags):
+    cache = get_cache()
+    if cache is not None:
+        cache.invalidate(tags)
+
+def thesis_tags(th_num, author_id, uni_id, ins_id):
+    return [
+        "theses",
+        f"thesis:{th_num}",
+        f"person:{author_id}:theses",
+        f"university:{uni_id}:theses",
+        f"institute:{ins_id}:theses",
+    ]
+
+# --- CONDITIONAL GET ---
+# table_version (migrations/0004, 0010) satır değiştiren her yazma statement'ında
+# trigger ile artar. ETag, URL ve route'un okuduğu tabloların versiyonlarından
+# üretilir; If-None-Match tutarsa view (ve cache) hiç çalışmadan 304 döner.
+# Versiyonlar view'dan önce okunur: arada bir yazma olursa ETag eski kalır ve
+# sonraki istekte eşleşmez.
+def table_versions(tables):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT table_name, version FROM table_version WHERE table_name = ANY(%s)",
+            (list(tables),),
+        )
+        return sorted(cur.fetchall())
+    except errors.UndefinedTable:
+        # migration 0004 uygulanmamış; ETag'siz devam edilir
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+def conditional(*tables):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            # bundle alt isteklerinde ETag anlamsız; snapshot transaction'a dokunulmaz
+            if g.get("bundle_connection") is not None:
+                return view(**kwargs)
+            versions = table_versions(tables)
+            if versions is None:
+                return view(**kwargs)
+
+            etag = hashlib.sha1(f"{request.full_path}|{versions}".encode("utf-8")).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = app.make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Tarayıcı saklar ama her seferinde If-None-Match ile doğrular
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
 
 # --- HEALTH CHECK (DB bağlı mı hızlı görürsün) ---
 @app.get("/api/health")
@@ -30,14 +294,144 @@ def api_health():
     v = cur.fetchone()[0]
     cur.close()
     conn.close()
-    return jsonify({"ok": True, "db": DB_NAME, "test": v})
+    cache = get_cache()
+    return jsonify({
+        "ok": True,
+        "db": DB_NAME,
+        "test": v,
+        "pool": get_pool().stats(),
+        "replicas": get_replicas().stats() if DB_REPLICAS else None,
+        "cache": cache.stats() if cache is not None else None,
+    })
 
 def parse_date_from_year(year_value):
     try:
         year_int = int(year_value)
     except (TypeError, ValueError):
         return None
-    return f"{year_int}-01-01"
+    # Import ile aynı aralık; dört haneye tamamlanır ("5-01-01" date değil)
+    if not THESIS_YEAR_RANGE[0] <= year_int <= THESIS_YEAR_RANGE[1]:
+        return None
+    return f"{year_int:04d}-01-01"
+
+# --- LIST HELPERS (keyset pagination + fields projection) ---
+# ?limit=N&cursor=<son id> ile sayfalama yapılır; sonraki sayfanın cursor'u
+# X-Next-Cursor header'ında döner. Parametre verilmezse eskisi gibi tüm liste döner.
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_PAGE_MAX = int(os.getenv("API_PAGE_MAX", "1000"))
+
+def parse_page_args():
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    if limit is None and cursor is None:
+        return None, None
+    try:
+        limit = int(limit) if limit is not None else API_PAGE_SIZE
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        raise ApiError("Invalid limit or cursor")
+    if limit < 1:
+        raise ApiError("Invalid limit or cursor")
+    return min(limit, API_PAGE_MAX), cursor
+
+def parse_fields(columns, key):
+    raw = request.args.get("fields")
+    if not raw:
+        return list(columns)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in columns]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    # Sayfalama için anahtar kolon her zaman döner
+    if key not in fields:
+        fields.insert(0, key)
+    return fields
+
+def parse_shape():
+    # ?shape=columns: {"columns": [...], "rows": [[...], ...]}; satır başına dict
+    # oluşturulmaz ve alan adları her satırda tekrar edilmez
+    shape = (request.args.get("shape") or "objects").strip().lower()
+    if shape not in ("objects", "columns"):
+        raise ApiError("Invalid shape")
+    return shape
+
+def deleted_filter(column):
+    # Soft-delete edilmiş kayıtlar listelerde görünmez; ?deleted=only sadece
+    # onları listeler (geri alma ekranı için)
+    value = (request.args.get("deleted") or "").strip().lower()
+    if value == "only":
+        return [(f"{column} IS NOT NULL", [])]
+    if value:
+        raise ApiError("Invalid deleted")
+    return [(f"{column} IS NULL", [])]
+
+def fetch_list(cur, columns, key, from_sql, joins=None, filters=None):
+    # columns: alan adı -> SQL ifadesi; joins: alan adı -> o alan için gereken JOIN;
+    # filters: AND ile eklenecek (SQL koşulu, parametreler) listesi
+    fields = parse_fields(columns, key)
+    limit, cursor = parse_page_args()
+
+    select_sql = ",\n            ".join(f'{columns[f]} AS "{f}"' for f in fields)
+    join_sql = ""
+    for join in dict.fromkeys((joins or {}).get(f) for f in fields):
+        if join:
+            join_sql += f"\n        {join}"
+
+    query = f"""
+        SELECT
+            {select_sql}
+        FROM {from_sql}{join_sql}
+    """
+    where = []
+    params = []
+    for condition, values in filters or []:
+        where.append(condition)
+        params.extend(values)
+    if cursor is not None:
+        where.append(f"{columns[key]} > %s")
+        params.append(cursor)
+    if where:
+        query += "WHERE " + "\n          AND ".join(where) + "\n"
+    query += f"ORDER BY {columns[key]}\n"
+    if limit is not None:
+        query += "LIMIT %s"
+        params.append(limit + 1)
+
+    if parse_shape() == "columns":
+        # Tuple cursor: satırlar dict'e çevrilmeden kolon listesiyle döner
+        tuple_cur = cur.connection.cursor()
+        try:
+            tuple_cur.execute(query, params)
+            rows = tuple_cur.fetchall()
+        finally:
+            tuple_cur.close()
+        key_index = fields.index(key)
+    else:
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        key_index = key
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1][key_index]
+    if isinstance(key_index, int):
+        rows = {"columns": fields, "rows": rows}
+    return rows, next_cursor
+
+def list_response(rows, next_cursor, facets=None):
+    # facets istenmişse gövde {"items": [...], "facets": {...}} olur
+    if isinstance(rows, dict):
+        response = jsonify(rows if facets is None else {**rows, "facets": facets})
+    else:
+        response = jsonify(rows if facets is None else {"items": rows, "facets": facets})
+    if next_cursor is not None:
+        args = request.args.to_dict(flat=False)
+        args["cursor"] = [str(next_cursor)]
+        args.setdefault("limit", [str(API_PAGE_SIZE)])
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        response.headers["Link"] = f'<{request.path}?{urlencode(args, doseq=True)}>; rel="next"'
+    return response
 
 # --- HTML HOME (Jinja) ---
 @app.route("/")
@@ -60,90 +454,285 @@ def home():
     return render_template("home.html", theses=theses)
 
 # --- API: LIST THESES (React için) ---
+THESIS_LIST_COLUMNS = {
+    "th_num": "T.th_num",
+    "title": "T.title",
+    "th_year": "EXTRACT(YEAR FROM T.th_year)::int",
+    "th_type": "T.th_type",
+    "author": "P.first_name || ' ' || P.second_name",
+}
+THESIS_LIST_JOINS = {
+    "author": "JOIN person P ON T.author_id = P.per_id",
+}
+
+# --- THESIS FILTERS (liste, facet ve export için ortak) ---
+# Aynı parametrenin değerleri OR, farklı parametreler AND ile birleşir:
+#   ?type=PhD&language=English,Turkish&yearFrom=2015&university=3&topic=Robotics&topic=AI
+# topicMode=all: tez verilen konuların hepsine sahip olmalı
+def int_arg(name, args=None):
+    value = (request.args if args is None else args).get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(f"Invalid {name}")
+
+def arg_values(name, cast=str, split=True, args=None):
+    # ?x=a,b ve ?x=a&x=b aynıdır; split=False ise sadece tekrar eden parametreler
+    values = []
+    for raw in (request.args if args is None else args).getlist(name):
+        for value in raw.split(",") if split else [raw]:
+            value = value.strip()
+            if not value:
+                continue
+            try:
+                values.append(cast(value))
+            except ValueError:
+                raise ApiError(f"Invalid {name}")
+    return values
+
+def thesis_filters(args=None):
+    # boyut -> (thesis T üzerinde SQL koşulu, parametreler). args verilmezse query string
+    args = request.args if args is None else args
+    filters = {}
+    types = arg_values("type", args=args)
+    if types:
+        filters["type"] = ("T.th_type = ANY(%s)", [types])
+    languages = arg_values("language", args=args)
+    if languages:
+        filters["language"] = ("T.th_language = ANY(%s)", [languages])
+    universities = arg_values("university", int, args=args)
+    if universities:
+        filters["university"] = ("T.uni_id = ANY(%s)", [universities])
+    institutes = arg_values("institute", int, args=args)
+    if institutes:
+        filters["institute"] = ("T.ins_id = ANY(%s)", [institutes])
+
+    # th_year date kolonu; aralık olarak yazılır ki index kullanılabilsin
+    year = int_arg("year", args)
+    year_from = int_arg("yearFrom", args) if year is None else year
+    year_to = int_arg("yearTo", args) if year is None else year
+    year_sql = []
+    year_params = []
+    if year_from is not None:
+        year_sql.append("T.th_year >= make_date(%s, 1, 1)")
+        year_params.append(year_from)
+    if year_to is not None:
+        year_sql.append("T.th_year < make_date(%s + 1, 1, 1)")
+        year_params.append(year_to)
+    if year_sql:
+        filters["year"] = (" AND ".join(year_sql), year_params)
+
+    # Konu adlarında virgül olabilir: ?topic=a&topic=b
+    topics = list(dict.fromkeys(arg_values("topic", split=False, args=args)))
+    topic_mode = (args.get("topicMode") or "any").strip().lower()
+    if topic_mode not in ("any", "all"):
+        raise ApiError("Invalid topicMode")
+    if topics and topic_mode == "all":
+        filters["topic"] = ("""T.th_num IN (
+            SELECT th_num FROM topic WHERE topic_name = ANY(%s)
+            GROUP BY th_num HAVING count(DISTINCT topic_name) = %s)""", [topics, len(topics)])
+    elif topics:
+        filters["topic"] = ("T.th_num IN (SELECT th_num FROM topic WHERE topic_name = ANY(%s))", [topics])
+    return filters
+
+# --- THESIS FACETS ---
+# ?facets=type,year,... (veya all) ile listeye her boyut için değer/sayı eklenir.
+# Bir boyutun sayıları, o boyutun kendi filtresi hariç diğer tüm filtrelere uyan
+# tezlerden hesaplanır (seçili değerin alternatifleri de görünsün diye). Tüm
+# facet'ler thesis üzerinde tek geçişle hesaplanır; migrations/0006'daki
+# thesis_facets_idx bu geçişi index-only scan yapar.
+THESIS_FACETS = {
+    # boyut -> (değer kolonu, etiket JOIN'i, etiket kolonu, sıralama)
+    "type": ("F.th_type", "", "NULL", "n DESC, value"),
+    "language": ("F.th_language", "", "NULL", "n DESC, value"),
+    "year": ("F.th_year", "", "NULL", "F.th_year DESC NULLS LAST"),
+    "university": ("F.uni_id", "JOIN university U ON U.uni_id = F.uni_id", "U.uni_name", "n DESC, F.uni_id"),
+    "institute": ("F.ins_id", "JOIN institute I ON I.ins_id = F.ins_id", "I.ins_name", "n DESC, F.ins_id"),
+    # Yazma route'ları ve import bir tezdeki tekrar eden konuları tek kayda indirir,
+    # bu yüzden count(*) tez sayısıdır
+    "topic": ("TP.topic_name", "JOIN topic TP ON TP.th_num = F.th_num", "NULL", "n DESC, value"),
+}
+INT_FACETS = {"year", "university", "institute"}
+FACET_LIMIT = 50
+
+def parse_facets():
+    raw = request.args.get("facets")
+    if raw is None:
+        return None
+    names = [f.strip() for f in raw.split(",") if f.strip()]
+    if names == ["all"]:
+        return list(THESIS_FACETS)
+    unknown = [f for f in names if f not in THESIS_FACETS]
+    if unknown:
+        raise ApiError(f"Unknown facets: {', '.join(unknown)}")
+    return names
+
+def fetch_facets(cur, names, filters):
+    active = list(filters)
+    flags_sql = "".join(
+        f",\n                coalesce(({filters[d][0]}), false) AS m_{d}" for d in active
+    )
+    params = [value for d in active for value in filters[d][1]]
+    # Sadece en fazla bir filtreye uymayan tezler bir facet'e sayılabilir
+    where_sql = ""
+    if len(active) > 1:
+        where_sql = "WHERE " + " + ".join(f"m_{d}::int" for d in active) + f" >= {len(active) - 1}"
+
+    branches = []
+    for name in names:
+        value_sql, join_sql, label_sql, order_sql = THESIS_FACETS[name]
+        others = [f"F.m_{d}" for d in active if d != name]
+        group_sql = value_sql if label_sql == "NULL" else f"{value_sql}, {label_sql}"
+        branches.append(f"""(
+            SELECT %s AS facet, {value_sql}::text AS value, {label_sql}::text AS label, count(*) AS n
+            FROM F {join_sql}
+            WHERE {" AND ".join(others) or "true"}
+            GROUP BY {group_sql}
+            ORDER BY {order_sql}
+            LIMIT {FACET_LIMIT}
+        )""")
+        params.append(name)
+
+    cur.execute(f"""
+        WITH F AS MATERIALIZED (
+            SELECT * FROM (
+                SELECT
+                    T.th_num,
+                    T.th_type,
+                    T.th_language,
+                    EXTRACT(YEAR FROM T.th_year)::int AS th_year,
+                    T.uni_id,
+                    T.ins_id{flags_sql}
+                FROM thesis T
+            ) X
+            {where_sql}
+        )
+        {" UNION ALL ".join(branches)}
+    """, params)
+
+    facets = {name: [] for name in names}
+    for row in cur.fetchall():
+        value = row["value"]
+        if value is not None and row["facet"] in INT_FACETS:
+            value = int(value)
+        item = {"value": value, "count": row["n"]}
+        if row["label"] is not None:
+            item["label"] = row["label"]
+        facets[row["facet"]].append(item)
+    return facets
+
+def thesis_list_tags(data):
+    # ?ids= cevapları tam kayıtlardır; danışman değişikliği gibi sadece "thesis:N"
+    # düşüren yazmalar da onları geçersiz kılmalı
+    if not request.args.get("ids"):
+        return []
+    return [tag for t in data for tag in thesis_detail_tags(t)]
+
 @app.get("/api/theses")
+@conditional("thesis", "person", "topic", "university", "institute", "keyword", "supervisor", "cosupervisor")
+@cached("theses", dynamic_tags=thesis_list_tags)
 def api_theses():
+    # ?ids=1,2,3: detay kayıtları (özet, konular, danışmanlar) tek sorguda, verilen sırayla
+    th_nums = list(dict.fromkeys(arg_values("ids", int)))
+    if th_nums:
+        if len(th_nums) > API_PAGE_MAX:
+            raise ApiError(f"At most {API_PAGE_MAX} ids per request")
+        conn = get_db_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        rows = fetch_thesis_details(cur, th_nums)
+        cur.close()
+        conn.close()
+        return jsonify(rows)
+
+    filters = thesis_filters()
+    facet_names = parse_facets()
+
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute("""
-        SELECT
-            T.th_num,
-            T.title,
-            EXTRACT(YEAR FROM T.th_year)::int AS th_year,
-            T.th_type,
-            P.first_name || ' ' || P.second_name AS author
-        FROM thesis T
-        JOIN person P ON T.author_id = P.per_id
-        ORDER BY T.th_num
-    """)
-    rows = cur.fetchall()
+    rows, next_cursor = fetch_list(
+        cur, THESIS_LIST_COLUMNS, "th_num", "thesis T", THESIS_LIST_JOINS,
+        filters=list(filters.values()),
+    )
+    facets = fetch_facets(cur, facet_names, filters) if facet_names else None
 
     cur.close()
     conn.close()
-    return jsonify(rows)
+    return list_response(rows, next_cursor, facets)
 
 # --- API: LIST PERSONS ---
+PERSON_LIST_COLUMNS = {
+    "id": "per_id",
+    "firstName": "first_name",
+    "secondName": "second_name",
+    "phoneNumber": "phone_num",
+}
+
 @app.get("/api/persons")
+@conditional("person")
+@cached("persons")
 def api_persons():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute("""
-        SELECT
-            per_id AS id,
-            first_name AS "firstName",
-            second_name AS "secondName",
-            phone_num AS "phoneNumber"
-        FROM person
-        ORDER BY per_id
-    """)
-    rows = cur.fetchall()
+    rows, next_cursor = fetch_list(
+        cur, PERSON_LIST_COLUMNS, "id", "person", filters=deleted_filter("deleted_at")
+    )
 
     cur.close()
     conn.close()
-    return jsonify(rows)
+    return list_response(rows, next_cursor)
 
 # --- API: LIST UNIVERSITIES ---
+UNIVERSITY_LIST_COLUMNS = {
+    "id": "uni_id",
+    "universityName": "uni_name",
+    "location": "uni_location",
+}
+
 @app.get("/api/universities")
+@conditional("university")
+@cached("universities")
 def api_universities():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute("""
-        SELECT
-            uni_id AS id,
-            uni_name AS "universityName",
-            uni_location AS "location"
-        FROM university
-        ORDER BY uni_id
-    """)
-    rows = cur.fetchall()
+    rows, next_cursor = fetch_list(
+        cur, UNIVERSITY_LIST_COLUMNS, "id", "university", filters=deleted_filter("deleted_at")
+    )
 
     cur.close()
     conn.close()
-    return jsonify(rows)
+    return list_response(rows, next_cursor)
 
 # --- API: LIST INSTITUTES ---
+INSTITUTE_LIST_COLUMNS = {
+    "id": "I.ins_id",
+    "instituteName": "I.ins_name",
+    "universityId": "I.uni_id",
+    "universityName": "U.uni_name",
+}
+INSTITUTE_LIST_JOINS = {
+    "universityName": "JOIN university U ON I.uni_id = U.uni_id",
+}
+
 @app.get("/api/institutes")
+@conditional("institute", "university")
+@cached("institutes")
 def api_institutes():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    cur.execute("""
-        SELECT
-            I.ins_id AS id,
-            I.ins_name AS "instituteName",
-            I.uni_id AS "universityId",
-            U.uni_name AS "universityName"
-        FROM institute I
-        JOIN university U ON I.uni_id = U.uni_id
-        ORDER BY I.ins_id
-    """)
-    rows = cur.fetchall()
+    rows, next_cursor = fetch_list(
+        cur, INSTITUTE_LIST_COLUMNS, "id", "institute I", INSTITUTE_LIST_JOINS,
+        filters=deleted_filter("I.deleted_at"),
+    )
 
     cur.close()
     conn.close()
-    return jsonify(rows)
+    return list_response(rows, next_cursor)
 
 # --- API: CREATE PERSON ---
 @app.post("/api/persons")
@@ -173,6 +762,7 @@ def api_person_create():
         cur.close()
         conn.close()
 
+    invalidate("persons")
     return jsonify({"id": new_id}), 201
 
 # --- API: UPDATE PERSON ---
@@ -194,7 +784,7 @@ def api_person_update(per_id: int):
             SET first_name = %s,
                 second_name = %s,
                 phone_num = %s
-            WHERE per_id = %s
+            WHERE per_id = %s AND deleted_at IS NULL
         """, (first_name, second_name, phone_num or None, per_id))
         conn.commit()
         if cur.rowcount == 0:
@@ -206,26 +796,14 @@ def api_person_update(per_id: int):
         cur.close()
         conn.close()
 
+    invalidate("persons", f"person:{per_id}", "theses")
     return jsonify({"ok": True})
 
 # --- API: DELETE PERSON ---
 @app.delete("/api/persons/<int:per_id>")
 def api_person_delete(per_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("DELETE FROM person WHERE per_id = %s", (per_id,))
-        conn.commit()
-        if cur.rowcount == 0:
-            return jsonify({"error": "Person not found"}), 404
-    except Exception as exc:
-        conn.rollback()
-        return jsonify({"error": str(exc)}), 400
-    finally:
-        cur.close()
-        conn.close()
-
-    return jsonify({"ok": True})
+    # ?mode=restrict|cascade|reassign&to=<id>|soft, bkz. DELETE HELPERS
+    return delete_entity("person", per_id)
 
 # --- API: CREATE UNIVERSITY ---
 @app.post("/api/universities")
@@ -254,6 +832,7 @@ def api_university_create():
         cur.close()
         conn.close()
 
+    invalidate("universities")
     return jsonify({"id": new_id}), 201
 
 # --- API: UPDATE UNIVERSITY ---
@@ -273,7 +852,7 @@ def api_university_update(uni_id: int):
             UPDATE university
             SET uni_name = %s,
                 uni_location = %s
-            WHERE uni_id = %s
+            WHERE uni_id = %s AND deleted_at IS NULL
         """, (uni_name, uni_location, uni_id))
         conn.commit()
         if cur.rowcount == 0:
@@ -285,26 +864,15 @@ def api_university_update(uni_id: int):
         cur.close()
         conn.close()
 
+    # Tez listesinin facet etiketleri üniversite adını gösterir
+    invalidate("universities", f"university:{uni_id}", "institutes", "theses")
     return jsonify({"ok": True})
 
 # --- API: DELETE UNIVERSITY ---
 @app.delete("/api/universities/<int:uni_id>")
 def api_university_delete(uni_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("DELETE FROM university WHERE uni_id = %s", (uni_id,))
-        conn.commit()
-        if cur.rowcount == 0:
-            return jsonify({"error": "University not found"}), 404
-    except Exception as exc:
-        conn.rollback()
-        return jsonify({"error": str(exc)}), 400
-    finally:
-        cur.close()
-        conn.close()
-
-    return jsonify({"ok": True})
+    # ?mode=restrict|cascade|reassign&to=<id>|soft, bkz. DELETE HELPERS
+    return delete_entity("university", uni_id)
 
 # --- API: CREATE INSTITUTE ---
 @app.post("/api/institutes")
@@ -319,6 +887,7 @@ def api_institute_create():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
+        reject_deleted_references(conn, "university", [uni_id])
         cur.execute("""
             INSERT INTO institute (ins_name, uni_id)
             VALUES (%s, %s)
@@ -333,6 +902,7 @@ def api_institute_create():
         cur.close()
         conn.close()
 
+    invalidate("institutes", f"university:{uni_id}:institutes")
     return jsonify({"id": new_id}), 201
 
 # --- API: UPDATE INSTITUTE ---
@@ -348,14 +918,20 @@ def api_institute_update(ins_id: int):
     conn = get_db_connection()
     cur = conn.cursor()
     try:
+        # O: güncelleme öncesi satır; eski üniversitenin cache'i de temizlenir
         cur.execute("""
-            UPDATE institute
+            UPDATE institute I
             SET ins_name = %s,
                 uni_id = %s
-            WHERE ins_id = %s
+            FROM institute O
+            WHERE I.ins_id = %s AND O.ins_id = I.ins_id AND I.deleted_at IS NULL
+            RETURNING O.uni_id
         """, (ins_name, uni_id, ins_id))
+        old = cur.fetchone()
+        if old is not None:
+            reject_deleted_references(conn, "university", [uni_id], allowed={old[0]})
         conn.commit()
-        if cur.rowcount == 0:
+        if old is None:
             return jsonify({"error": "Institute not found"}), 404
     except Exception as exc:
         conn.rollback()
@@ -364,18 +940,461 @@ def api_institute_update(ins_id: int):
         cur.close()
         conn.close()
 
+    # "theses": tez listesinin facet etiketleri enstitü adını gösterir
+    invalidate(
+        "institutes",
+        f"institute:{ins_id}",
+        f"university:{old[0]}:institutes",
+        f"university:{uni_id}:institutes",
+        "theses",
+    )
     return jsonify({"ok": True})
 
 # --- API: DELETE INSTITUTE ---
 @app.delete("/api/institutes/<int:ins_id>")
 def api_institute_delete(ins_id: int):
-    conn = get_db_connection()
+    # ?mode=restrict|cascade|reassign&to=<id>|soft, bkz. DELETE HELPERS
+    return delete_entity("institute", ins_id)
+
+# --- THESIS TOPIC / KEYWORD HELPERS ---
+def clean_terms(values):
+    # Boşlar atılır, tekrarlar tek kayda indirilir (sıra korunur)
+    return list(dict.fromkeys(str(v).strip() for v in values if str(v).strip()))
+
+def insert_terms(cur, term_type, th_num, names):
+    if not names:
+        return
+    table, column = TERM_COLUMNS[term_type]
+    cur.execute(f"""
+        INSERT INTO {table} (th_num, {column})
+        SELECT %s, N.name
+        FROM unnest(%s::text[]) WITH ORDINALITY AS N(name, ord)
+        ORDER BY N.ord
+    """, (th_num, names))
+
+def sync_terms(cur, term_type, th_num, names):
+    # Tek statement: listede olmayanlar (ve tekrarlar) silinir, eksikler eklenir.
+    # INSERT kısmı silmeden önceki snapshot'ı görür; silinenler zaten listede olmayanlardır.
+    table, column = TERM_COLUMNS[term_type]
+    id_column = f"{table}_id"
+    cur.execute(f"""
+        WITH removed AS (
+            DELETE FROM {table} X
+            WHERE X.th_num = %(th_num)s
+              AND (
+                  X.{column} <> ALL(%(names)s::text[])
+                  OR EXISTS (
+                      SELECT 1 FROM {table} Y
+                      WHERE Y.th_num = X.th_num
+                        AND Y.{column} = X.{column}
+                        AND Y.{id_column} < X.{id_column}
+                  )
+              )
+        )
+        INSERT INTO {table} (th_num, {column})
+        SELECT %(th_num)s, N.name
+        FROM unnest(%(names)s::text[]) WITH ORDINALITY AS N(name, ord)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table} X
+            WHERE X.th_num = %(th_num)s AND X.{column} = N.name
+        )
+        ORDER BY N.ord
+    """, {"th_num": th_num, "names": names})
+
+# --- THESIS ADVISOR HELPERS (supervisor / cosupervisor) ---
+ADVISOR_ROLES = ("supervisor", "cosupervisor")
+ADVISOR_ID_FIELDS = {"supervisor": "supervisorIds", "cosupervisor": "cosupervisorIds"}
+
+def advisors_sql(table, th_num_sql="T.th_num"):
+    # Tezin danışmanları tek alt sorguda JSON dizisi olarak gelir (tez başına ek sorgu yok)
+    return f"""COALESCE((
+                SELECT json_agg(
+                    json_build_object('id', A.per_id, 'name', AP.first_name || ' ' || AP.second_name)
+                    ORDER BY A.per_id
+                )
+                FROM {table} A
+                JOIN person AP ON AP.per_id = A.per_id
+                WHERE A.th_num = {th_num_sql}
+            ), '[]'::json)"""
+
+def advisor_tags(data):
+    return [f"person:{a['id']}" for role in ADVISOR_ROLES for a in data[f"{role}s"]]
+
+def advisor_ids(body, role):
+    # Alan gönderilmediyse None: mevcut danışmanlar değişmez
+    values = body.get(ADVISOR_ID_FIELDS[role])
+    if values is None:
+        return None
+    if not isinstance(values, list):
+        raise ApiError(f"{ADVISOR_ID_FIELDS[role]} must be a list")
+    try:
+        return list(dict.fromkeys(int(v) for v in values))
+    except (TypeError, ValueError):
+        raise ApiError(f"Invalid {ADVISOR_ID_FIELDS[role]}")
+
+def sync_advisors(cur, role, th_num, per_ids):
+    # sync_terms gibi tek statement: listede olmayanlar silinir, eksikler eklenir
+    cur.execute(f"""
+        WITH removed AS (
+            DELETE FROM {role}
+            WHERE th_num = %(th_num)s AND per_id <> ALL(%(ids)s::int[])
+        )
+        INSERT INTO {role} (per_id, th_num)
+        SELECT N.id, %(th_num)s
+        FROM unnest(%(ids)s::int[]) AS N(id)
+        ON CONFLICT DO NOTHING
+    """, {"th_num": th_num, "ids": per_ids})
+
+def thesis_advisor_ids(cur, th_num):
+    # Tezin şu anki danışmanları (iki rol birlikte)
+    cur.execute(
+        " UNION ".join(f"SELECT per_id FROM {role} WHERE th_num = %(th_num)s" for role in ADVISOR_ROLES),
+        {"th_num": th_num},
+    )
+    return [row[0] for row in cur.fetchall()]
+
+def advisor_change_tags(th_num, per_ids):
+    # Çıkarılan danışmanın listesi "thesis:N" tag'i ile düşer; yeni eklenenlerinki ayrıca
+    return [f"thesis:{th_num}", *(f"person:{per_id}:supervised" for per_id in per_ids)]
+
+# --- DELETE HELPERS (etki özeti, cascade / reassign / soft delete) ---
+# DELETE /api/persons|universities|institutes/<id>?mode=...
+#   restrict (varsayılan): bağlı kayıt varsa 409 ve etki özeti döner
+#   cascade: bağlı tezler (konu, anahtar kelime ve danışman satırlarıyla),
+#            enstitüler ve danışmanlıklar aynı transaction'da set-based silinir
+#   reassign&to=<id>: bağlı kayıtlar başka bir kayda taşınır, sonra silinir
+#   soft: satır silinmez, deleted_at işaretlenir (migrations/0008); listelerde ve
+#         detayda görünmez, onu referans veren tezler olduğu gibi kalır.
+#         POST .../restore geri getirir.
+DELETE_MODES = ("restrict", "cascade", "reassign", "soft")
+DELETE_TARGETS = {
+    "person": {
+        "table": "person",
+        "key": "per_id",
+        "label": "Person",
+        "list_tag": "persons",
+        "theses": "T.author_id = ANY(%(ids)s)",
+        # restrict'te silmeyi engelleyen referanslar: (etki adı, tablo, kolon)
+        "blockers": [
+            ("theses", "thesis", "author_id"),
+            *(("supervising", role, "per_id") for role in ADVISOR_ROLES),
+        ],
+        "reassign": [
+            "UPDATE thesis SET author_id = %(to)s WHERE author_id = ANY(%(ids)s) RETURNING th_num",
+            # Hedef zaten danışmansa satır tekrar eklenmez
+            *(f"""
+            WITH moved AS (DELETE FROM {role} WHERE per_id = ANY(%(ids)s) RETURNING th_num)
+            INSERT INTO {role} (per_id, th_num)
+            SELECT %(to)s, th_num FROM moved
+            ON CONFLICT DO NOTHING
+            RETURNING th_num
+            """ for role in ADVISOR_ROLES),
+        ],
+        "cascade": [f"DELETE FROM {role} WHERE per_id = ANY(%(ids)s) RETURNING th_num" for role in ADVISOR_ROLES],
+    },
+    "university": {
+        "table": "university",
+        "key": "uni_id",
+        "label": "University",
+        "list_tag": "universities",
+        # Üniversitenin ve enstitülerinin tezleri; UNION ile iki FK index'i de kullanılır
+        "theses": """T.th_num IN (
+            SELECT th_num FROM thesis WHERE uni_id = ANY(%(ids)s)
+            UNION
+            SELECT X.th_num FROM institute I JOIN thesis X ON X.ins_id = I.ins_id WHERE I.uni_id = ANY(%(ids)s)
+        )""",
+        "blockers": [("theses", "thesis", "uni_id"), ("institutes", "institute", "uni_id")],
+        "reassign": [
+            "UPDATE thesis SET uni_id = %(to)s WHERE uni_id = ANY(%(ids)s) RETURNING th_num",
+            "UPDATE institute SET uni_id = %(to)s WHERE uni_id = ANY(%(ids)s) RETURNING ins_id",
+        ],
+        "cascade": ["DELETE FROM institute WHERE uni_id = ANY(%(ids)s) RETURNING ins_id"],
+    },
+    "institute": {
+        "table": "institute",
+        "key": "ins_id",
+        "label": "Institute",
+        "list_tag": "institutes",
+        "theses": "T.ins_id = ANY(%(ids)s)",
+        "blockers": [("theses", "thesis", "ins_id")],
+        # Tezin üniversitesi yeni enstitününkiyle aynı kalsın
+        "reassign": ["""
+            UPDATE thesis
+            SET ins_id = %(to)s,
+                uni_id = (SELECT uni_id FROM institute WHERE ins_id = %(to)s)
+            WHERE ins_id = ANY(%(ids)s)
+            RETURNING th_num
+        """],
+        "cascade": [],
+        # Geri getirmeden önce silinmemiş olması gereken üst kayıtlar: (hedef, kolon)
+        "parents": [("university", "uni_id")],
+    },
+}
+
+def delete_impact(cur, target, ids):
+    # Cascade silmenin dokunacağı satır sayıları (kayıtların toplamı)
+    extra = ""
+    if target == "person":
+        extra = """,
+            (SELECT count(*) FROM supervisor WHERE per_id = ANY(%(ids)s))
+            + (SELECT count(*) FROM cosupervisor WHERE per_id = ANY(%(ids)s)) AS supervising"""
+    elif target == "university":
+        extra = """,
+            (SELECT count(*) FROM institute WHERE uni_id = ANY(%(ids)s)) AS institutes"""
+    cur.execute(f"""
+        WITH affected AS (
+            SELECT T.th_num FROM thesis T WHERE {DELETE_TARGETS[target]["theses"]}
+        )
+        SELECT
+            (SELECT count(*) FROM affected) AS theses,
+            (SELECT count(*) FROM topic WHERE th_num IN (SELECT th_num FROM affected)) AS topics,
+            (SELECT count(*) FROM keyword WHERE th_num IN (SELECT th_num FROM affected)) AS keywords,
+            (SELECT count(*) FROM supervisor WHERE th_num IN (SELECT th_num FROM affected))
+            + (SELECT count(*) FROM cosupervisor WHERE th_num IN (SELECT th_num FROM affected)) AS supervisions{extra}
+    """, {"ids": ids})
+    return dict(cur.fetchone())
+
+def blocking_dependents(impact):
+    # Konu/anahtar kelime/danışman satırları tezlerle birlikte gider; kendi başlarına engel değil
+    return {k: v for k, v in impact.items() if k in ("theses", "institutes", "supervising") and v}
+
+def blocked_ids(cur, target, ids):
+    # id -> engelleyen referans adları; her referans için tek index sorgusu
+    blocked = {}
+    for name, table, column in DELETE_TARGETS[target]["blockers"]:
+        cur.execute(f"SELECT DISTINCT {column} AS id FROM {table} WHERE {column} = ANY(%s)", (ids,))
+        for row in cur.fetchall():
+            reasons = blocked.setdefault(row["id"], [])
+            if name not in reasons:
+                reasons.append(name)
+    return blocked
+
+def reject_deleted_references(conn, target, ids, allowed=()):
+    # Soft-delete edilmiş kayda yeni referans verilmez; allowed zaten var olan
+    # referanslardır (düzenlenen tezin eski yazarı gibi). FOR SHARE: eşzamanlı
+    # soft delete bu transaction bitene kadar bekler.
+    values = []
+    for value in ids:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue  # geçersiz id INSERT/UPDATE'te hata verir
+        if value not in allowed and value not in values:
+            values.append(value)
+    if not values:
+        return
+    spec = DELETE_TARGETS[target]
     cur = conn.cursor()
     try:
-        cur.execute("DELETE FROM institute WHERE ins_id = %s", (ins_id,))
+        cur.execute(f"""
+            SELECT {spec["key"]}, deleted_at IS NOT NULL
+            FROM {spec["table"]}
+            WHERE {spec["key"]} = ANY(%s)
+            ORDER BY {spec["key"]}
+            FOR SHARE
+        """, (values,))
+        deleted = [row[0] for row in cur.fetchall() if row[1]]
+    finally:
+        cur.close()
+    if deleted:
+        raise ApiError(f"{spec['label']} {deleted[0]} is deleted")
+
+def delete_theses(conn, condition, params):
+    # Tezler bağlı satırlarıyla tek statement'ta silinir; silinen tezlerin
+    # (th_num, author_id, uni_id, ins_id) satırları döner
+    lock_similar(conn)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT T.th_num FROM thesis T WHERE {condition} FOR UPDATE", params)
+        th_nums = [row[0] for row in cur.fetchall()]
+        if not th_nums:
+            return []
+        forget_theses(conn, th_nums)
+        cur.execute("""
+            WITH topics AS (
+                DELETE FROM topic WHERE th_num = ANY(%(th_nums)s)
+            ),
+            keywords AS (
+                DELETE FROM keyword WHERE th_num = ANY(%(th_nums)s)
+            ),
+            supervisors AS (
+                DELETE FROM supervisor WHERE th_num = ANY(%(th_nums)s)
+            ),
+            cosupervisors AS (
+                DELETE FROM cosupervisor WHERE th_num = ANY(%(th_nums)s)
+            )
+            DELETE FROM thesis
+            WHERE th_num = ANY(%(th_nums)s)
+            RETURNING th_num, author_id, uni_id, ins_id
+        """, {"th_nums": th_nums})
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+def parse_delete_mode(values):
+    # values: tekil silmede query string, toplu silmede JSON gövdesi
+    mode = str(values.get("mode") or "restrict").strip().lower()
+    if mode not in DELETE_MODES:
+        raise ApiError("Invalid mode")
+    to = None
+    if mode == "reassign":
+        try:
+            to = int(values.get("to") or "")
+        except (TypeError, ValueError):
+            raise ApiError("reassign mode requires a numeric to")
+    return mode, to
+
+def delete_entities(conn, cur, target, ids, mode, to):
+    # Kayıtlar FOR UPDATE ile kilitlenir: onlara referans ekleyen yazmalar
+    # (FK kontrolü FOR KEY SHARE alır) bitene kadar bekler, sayımlar değişmez.
+    # Commit/rollback çağırana kalır. (id -> sonuç, etki özeti, cache tag'leri) döner;
+    # sonuç "deleted", "not_found" ya da restrict'te engelleyen referans listesi.
+    spec = DELETE_TARGETS[target]
+    table, key = spec["table"], spec["key"]
+    cur.execute(f"SELECT * FROM {table} WHERE {key} = ANY(%s) ORDER BY {key} FOR UPDATE", (ids,))
+    rows = {row[key]: row for row in cur.fetchall()}
+    results = {i: ("deleted" if i in rows else "not_found") for i in ids}
+    found = list(rows)
+    tags = [spec["list_tag"], *(f"{target}:{i}" for i in found)]
+    if target == "institute":
+        tags.extend({f"university:{row['uni_id']}:institutes" for row in rows.values()})
+    elif target == "university":
+        # Taşınan / silinen enstitüler eski üniversitenin alt listesinden düşer
+        tags.extend(f"university:{i}:institutes" for i in found)
+    if not found:
+        return results, None, tags
+
+    if mode == "soft":
+        cur.execute(
+            f"UPDATE {table} SET deleted_at = now() WHERE {key} = ANY(%s) AND deleted_at IS NULL",
+            (found,),
+        )
+        return results, None, tags
+
+    impact = delete_impact(cur, target, found)
+    if mode == "restrict":
+        for i, reasons in blocked_ids(cur, target, found).items():
+            results[i] = reasons
+        found = [i for i in found if results[i] == "deleted"]
+    elif mode == "reassign":
+        if to in rows:
+            raise ApiError("Cannot reassign to the same record")
+        cur.execute(f"SELECT 1 FROM {table} WHERE {key} = %s AND deleted_at IS NULL FOR SHARE", (to,))
+        if cur.fetchone() is None:
+            raise ApiError(f"Target {spec['label'].lower()} not found", 404)
+        tags.append(f"{target}:{to}")
+        if target == "university":
+            tags.append(f"university:{to}:institutes")
+
+    statements = []
+    if mode == "reassign":
+        statements = spec["reassign"]
+    elif mode == "cascade":
+        for th_num, author_id, uni_id, ins_id in delete_theses(conn, spec["theses"], {"ids": found}):
+            tags.extend(thesis_tags(th_num, author_id, uni_id, ins_id))
+        statements = spec["cascade"]
+
+    # Dönen id'ler (tez / enstitü) cache'ten düşürülür
+    for statement in statements:
+        cur.execute(statement, {"ids": found, "to": to})
+        for moved in cur.fetchall():
+            if "th_num" in moved:
+                tags.append(f"thesis:{moved['th_num']}")
+            else:
+                tags.append(f"institute:{moved['ins_id']}")
+
+    if found:
+        cur.execute(f"DELETE FROM {table} WHERE {key} = ANY(%s)", (found,))
+    if mode != "restrict" and blocking_dependents(impact):
+        tags.extend(["theses", "thesis-sublists", "similar", "persons", "universities", "institutes"])
+    return results, impact, tags
+
+def delete_entity(target, entity_id):
+    spec = DELETE_TARGETS[target]
+    mode, to = parse_delete_mode(request.args)
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        results, impact, tags = delete_entities(conn, cur, target, [entity_id], mode, to)
+        status = results[entity_id]
+        if status != "deleted":
+            conn.rollback()
+            if status == "not_found":
+                return jsonify({"error": f"{spec['label']} not found"}), 404
+            return jsonify({
+                "error": f"{spec['label']} has dependent records; use mode=cascade, reassign or soft",
+                "impact": impact,
+            }), 409
         conn.commit()
-        if cur.rowcount == 0:
-            return jsonify({"error": "Institute not found"}), 404
+    except ApiError:
+        conn.rollback()
+        raise
+    except errors.ForeignKeyViolation as exc:
+        # Kilitten önce açılmış bir transaction'ın eklediği referans
+        conn.rollback()
+        return jsonify({"error": str(exc).strip()}), 409
+    except Exception as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cur.close()
+        conn.close()
+
+    invalidate(*tags)
+    result = {"ok": True, "mode": mode}
+    if impact is not None:
+        result["impact"] = impact
+    return jsonify(result)
+
+# --- BULK HELPERS ---
+# Toplu işlemler id listesiyle (ya da tezlerde liste filtreleriyle) seçilen
+# kayıtlara tek transaction'da set-based uygulanır. "dryRun": true aynı
+# statement'ları çalıştırıp rollback eder; sayılar ve id başına sonuçlar gerçek
+# çalıştırmayla aynıdır, cache'e dokunulmaz.
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "10000"))
+
+def bulk_ids(body):
+    ids = body.get("ids")
+    if not isinstance(ids, list) or not ids:
+        raise ApiError("ids must be a non-empty list")
+    if len(ids) > BULK_MAX_IDS:
+        raise ApiError(f"At most {BULK_MAX_IDS} ids per request")
+    try:
+        return list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        raise ApiError("Invalid ids")
+
+def bulk_results(results):
+    # id -> durum; restrict'te engellenen kayıtlar engelleyen referanslarıyla döner
+    return [
+        {"id": i, "status": status} if isinstance(status, str)
+        else {"id": i, "status": "blocked", "blocking": status}
+        for i, status in results.items()
+    ]
+
+def bulk_delete_entities(target):
+    # {"ids": [...], "mode": "reassign", "to": 3, "dryRun": false}; restrict'te
+    # bağlı kaydı olanlar atlanır, diğerleri silinir
+    body = request.get_json(silent=True) or {}
+    ids = bulk_ids(body)
+    mode, to = parse_delete_mode(body)
+    dry_run = bool(body.get("dryRun"))
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        results, impact, tags = delete_entities(conn, cur, target, ids, mode, to)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except ApiError:
+        conn.rollback()
+        raise
+    except errors.ForeignKeyViolation as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc).strip()}), 409
     except Exception as exc:
         conn.rollback()
         return jsonify({"error": str(exc)}), 400
@@ -383,8 +1402,111 @@ def api_institute_delete(ins_id: int):
         cur.close()
         conn.close()
 
+    if not dry_run:
+        invalidate(*tags)
+    return jsonify({
+        "dryRun": dry_run,
+        "mode": mode,
+        "deleted": sum(status == "deleted" for status in results.values()),
+        "impact": impact,
+        "results": bulk_results(results),
+    })
+
+def entity_impact_response(target, entity_id):
+    # Silme öncesi önizleme: cache'lenmez, her zaman güncel sayımlar
+    spec = DELETE_TARGETS[target]
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    cur.execute(f"SELECT deleted_at FROM {spec['table']} WHERE {spec['key']} = %s", (entity_id,))
+    row = cur.fetchone()
+    impact = delete_impact(cur, target, [entity_id]) if row is not None else None
+
+    cur.close()
+    conn.close()
+
+    if row is None:
+        return jsonify({"error": f"{spec['label']} not found"}), 404
+
+    return jsonify({
+        **impact,
+        "deleted": row["deleted_at"] is not None,
+        "blocking": sorted(blocking_dependents(impact)),
+    })
+
+def restore_entity(target, entity_id):
+    spec = DELETE_TARGETS[target]
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Silinmiş üniversitenin enstitüsü geri gelmez; önce üst kayıt geri getirilir
+        for parent, column in spec.get("parents", ()):
+            cur.execute(f"SELECT {column} FROM {spec['table']} WHERE {spec['key']} = %s", (entity_id,))
+            found = cur.fetchone()
+            if found:
+                reject_deleted_references(conn, parent, [found[column]])
+        cur.execute(
+            f"UPDATE {spec['table']} SET deleted_at = NULL WHERE {spec['key']} = %s RETURNING *",
+            (entity_id,),
+        )
+        row = cur.fetchone()
+        conn.commit()
+    except ApiError as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 409
+    except Exception as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cur.close()
+        conn.close()
+
+    if row is None:
+        return jsonify({"error": f"{spec['label']} not found"}), 404
+    tags = [spec["list_tag"], f"{target}:{entity_id}"]
+    if target == "institute":
+        tags.append(f"university:{row['uni_id']}:institutes")
+    invalidate(*tags)
     return jsonify({"ok": True})
 
+# --- API: DELETE IMPACT / RESTORE / BULK DELETE ---
+@app.get("/api/persons/<int:per_id>/impact")
+def api_person_impact(per_id: int):
+    return entity_impact_response("person", per_id)
+
+@app.get("/api/universities/<int:uni_id>/impact")
+def api_university_impact(uni_id: int):
+    return entity_impact_response("university", uni_id)
+
+@app.get("/api/institutes/<int:ins_id>/impact")
+def api_institute_impact(ins_id: int):
+    return entity_impact_response("institute", ins_id)
+
+@app.post("/api/persons/<int:per_id>/restore")
+def api_person_restore(per_id: int):
+    return restore_entity("person", per_id)
+
+@app.post("/api/universities/<int:uni_id>/restore")
+def api_university_restore(uni_id: int):
+    return restore_entity("university", uni_id)
+
+@app.post("/api/institutes/<int:ins_id>/restore")
+def api_institute_restore(ins_id: int):
+    return restore_entity("institute", ins_id)
+
+# Yinelenen kişileri birleştirmek: {"ids": [7, 8], "mode": "reassign", "to": 3}
+@app.delete("/api/persons")
+def api_persons_bulk_delete():
+    return bulk_delete_entities("person")
+
+@app.delete("/api/universities")
+def api_universities_bulk_delete():
+    return bulk_delete_entities("university")
+
+@app.delete("/api/institutes")
+def api_institutes_bulk_delete():
+    return bulk_delete_entities("institute")
+
 # --- API: CREATE THESIS ---
 @app.post("/api/theses")
 def api_thesis_create():
@@ -401,6 +1523,7 @@ def api_thesis_create():
     submission_date = body.get("submissionDate")
     topics = body.get("topics") or []
     keywords = body.get("keywords") or []
+    advisors = {role: advisor_ids(body, role) for role in ADVISOR_ROLES}
 
     if not title or not abstract or not author_id or not thesis_type or not university_id or not institute_id or not language:
         return jsonify({"error": "Missing required fields"}), 400
@@ -412,6 +1535,11 @@ def api_thesis_create():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     try:
+        reject_deleted_references(
+            conn, "person", [author_id, *(i for ids in advisors.values() if ids for i in ids)]
+        )
+        reject_deleted_references(conn, "university", [university_id])
+        reject_deleted_references(conn, "institute", [institute_id])
         cur.execute("""
             INSERT INTO thesis (
                 title, abstract, author_id, th_year, th_type, uni_id, ins_id,
@@ -433,10 +1561,12 @@ def api_thesis_create():
         ))
         new_id = cur.fetchone()["id"]
 
-        for topic in [t.strip() for t in topics if str(t).strip()]:
-            cur.execute("INSERT INTO topic (th_num, topic_name) VALUES (%s, %s)", (new_id, topic))
-        for keyword in [k.strip() for k in keywords if str(k).strip()]:
-            cur.execute("INSERT INTO keyword (th_num, keyword) VALUES (%s, %s)", (new_id, keyword))
+        insert_terms(cur, "topic", new_id, clean_terms(topics))
+        insert_terms(cur, "keyword", new_id, clean_terms(keywords))
+        for role, ids in advisors.items():
+            if ids:
+                sync_advisors(cur, role, new_id, ids)
+        similar_changed = refresh_similar(conn, new_id)
 
         conn.commit()
     except Exception as exc:
@@ -446,8 +1576,167 @@ def api_thesis_create():
         cur.close()
         conn.close()
 
+    advisor_per_ids = [i for ids in advisors.values() if ids for i in ids]
+    invalidate(
+        *thesis_tags(new_id, author_id, university_id, institute_id),
+        *advisor_change_tags(new_id, advisor_per_ids),
+        *(["similar"] if similar_changed else []),
+    )
     return jsonify({"id": new_id}), 201
 
+# --- API: BULK IMPORT THESES (NDJSON / CSV) ---
+# Gövde COPY ile staging tablosuna akıtılır; bkz. importer.py
+@app.post("/api/theses/import")
+def api_thesis_import():
+    fmt = (request.args.get("format") or "").strip().lower()
+    if not fmt:
+        fmt = "csv" if request.mimetype == "text/csv" else "ndjson"
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": "Invalid format"}), 400
+    dry_run = request.args.get("dryRun", "").lower() in ("1", "true")
+
+    conn = get_db_connection()
+    try:
+        result = import_theses(conn, request.stream, fmt, dry_run=dry_run)
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        conn.close()
+
+    if result["imported"] and not dry_run:
+        invalidate("theses", "thesis-sublists", "persons")
+    return jsonify(result), 200 if dry_run else 201
+
+# --- API: EXPORT THESES (streaming NDJSON / CSV) ---
+# Server-side (named) cursor ile parça parça okunur; bellek kullanımı katalog
+# büyüklüğünden bağımsızdır. Alan adları importer.py ile uyumludur.
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+EXPORT_COLUMNS = [
+    "T.th_num AS id",
+    "T.title",
+    "T.abstract",
+    'T.author_id AS "authorId"',
+    'EXTRACT(YEAR FROM T.th_year)::int AS "thesisYear"',
+    'T.th_type AS "thesisType"',
+    'T.uni_id AS "universityId"',
+    'T.ins_id AS "instituteId"',
+    'T.page_num AS "pageCount"',
+    'T.th_language AS "language"',
+    'T.submission_date AS "submissionDate"',
+]
+EXPORT_INCLUDES = {
+    "names": [
+        'P.first_name AS "authorFirstName"',
+        'P.second_name AS "authorSecondName"',
+        'U.uni_name AS "universityName"',
+        'I.ins_name AS "instituteName"',
+    ],
+    "topics": [
+        "ARRAY(SELECT TP.topic_name FROM topic TP WHERE TP.th_num = T.th_num ORDER BY TP.topic_id) AS topics",
+    ],
+    "keywords": [
+        "ARRAY(SELECT K.keyword FROM keyword K WHERE K.th_num = T.th_num ORDER BY K.keyword_id) AS keywords",
+    ],
+    "supervisors": [
+        'ARRAY(SELECT S.per_id FROM supervisor S WHERE S.th_num = T.th_num ORDER BY S.per_id) AS "supervisorIds"',
+        'ARRAY(SELECT C.per_id FROM cosupervisor C WHERE C.th_num = T.th_num ORDER BY C.per_id) AS "cosupervisorIds"',
+    ],
+}
+# include'a göre okunabilecek tüm tablolar (ETag için)
+EXPORT_TABLES = (
+    "thesis", "person", "university", "institute", "topic", "keyword", "supervisor", "cosupervisor",
+)
+EXPORT_NAME_JOINS = """
+        JOIN person P ON T.author_id = P.per_id
+        JOIN university U ON T.uni_id = U.uni_id
+        JOIN institute I ON T.ins_id = I.ins_id"""
+
+def build_export_query():
+    include = [i.strip() for i in (request.args.get("include") or "").split(",") if i.strip()]
+    if include == ["all"]:
+        include = list(EXPORT_INCLUDES)
+    unknown = [i for i in include if i not in EXPORT_INCLUDES]
+    if unknown:
+        raise ApiError(f"Unknown include: {', '.join(unknown)}")
+
+    columns = list(EXPORT_COLUMNS)
+    for name in EXPORT_INCLUDES:
+        if name in include:
+            columns.extend(EXPORT_INCLUDES[name])
+
+    filters = thesis_filters().values()
+    where = [condition for condition, _ in filters]
+    params = [value for _, values in filters for value in values]
+
+    query = "SELECT\n            " + ",\n            ".join(columns)
+    query += "\n        FROM thesis T"
+    if "names" in include:
+        query += EXPORT_NAME_JOINS
+    if where:
+        query += "\n        WHERE " + "\n          AND ".join(where)
+    query += "\n        ORDER BY T.th_num"
+    return query, params
+
+def export_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    return value
+
+def stream_export(query, params, fmt, replicas=None):
+    # Bağlantı generator içinde alınır; istek bittikten sonra da akış sürdüğü için
+    # g üzerinden değil doğrudan havuzdan yönetilir. Replica seçimi istekte yapılır.
+    conn = None
+    if replicas is not None:
+        _, conn = replicas.getconn()
+    if conn is None:
+        conn = get_pool().getconn()
+    cur = conn.cursor(name="thesis_export", cursor_factory=RealDictCursor)
+    cur.itersize = EXPORT_BATCH_SIZE
+    try:
+        cur.execute(query, params)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+        header_written = False
+        count = 0
+        for row in cur:
+            if writer is not None:
+                if not header_written:
+                    writer.writerow(row.keys())
+                    header_written = True
+                writer.writerow([export_value(v) for v in row.values()])
+            else:
+                buffer.write(export_json_line(row))
+            count += 1
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if writer is not None and not header_written and cur.description:
+            writer.writerow([col.name for col in cur.description])
+        yield buffer.getvalue()
+    finally:
+        cur.close()
+        conn.close()
+
+@app.get("/api/theses/export")
+@conditional(*EXPORT_TABLES)
+def api_thesis_export():
+    fmt = (request.args.get("format") or "ndjson").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Invalid format"}), 400
+    query, params = build_export_query()
+
+    replicas = get_replicas() if reads_from_replica() else None
+    response = Response(stream_export(query, params, fmt, replicas), mimetype=EXPORT_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="theses.{fmt}"'
+    return response
+
 # --- API: UPDATE THESIS ---
 @app.put("/api/theses/<int:th_num>")
 def api_thesis_update(th_num: int):
@@ -464,6 +1753,7 @@ def api_thesis_update(th_num: int):
     submission_date = body.get("submissionDate")
     topics = body.get("topics") or []
     keywords = body.get("keywords") or []
+    advisors = {role: advisor_ids(body, role) for role in ADVISOR_ROLES}
 
     if not title or not abstract or not author_id or not thesis_type or not university_id or not institute_id or not language:
         return jsonify({"error": "Missing required fields"}), 400
@@ -475,8 +1765,11 @@ def api_thesis_update(th_num: int):
     conn = get_db_connection()
     cur = conn.cursor()
     try:
+        # Tez satırı kilitlenmeden önce; refresh_similar sonradan beklerse silmelerle kilitlenir
+        lock_similar(conn)
+        # O: güncelleme öncesi satır; eski yazar/üniversite/enstitü cache'i de temizlenir
         cur.execute("""
-            UPDATE thesis
+            UPDATE thesis T
             SET title = %s,
                 abstract = %s,
                 author_id = %s,
@@ -487,7 +1780,9 @@ def api_thesis_update(th_num: int):
                 page_num = %s,
                 th_language = %s,
                 submission_date = %s
-            WHERE th_num = %s
+            FROM thesis O
+            WHERE T.th_num = %s AND O.th_num = T.th_num
+            RETURNING O.author_id, O.uni_id, O.ins_id
         """, (
             title,
             abstract,
@@ -501,16 +1796,26 @@ def api_thesis_update(th_num: int):
             submission_date or None,
             th_num,
         ))
-        if cur.rowcount == 0:
+        old = cur.fetchone()
+        if old is None:
             conn.rollback()
             return jsonify({"error": "Thesis not found"}), 404
 
-        cur.execute("DELETE FROM topic WHERE th_num = %s", (th_num,))
-        cur.execute("DELETE FROM keyword WHERE th_num = %s", (th_num,))
-        for topic in [t.strip() for t in topics if str(t).strip()]:
-            cur.execute("INSERT INTO topic (th_num, topic_name) VALUES (%s, %s)", (th_num, topic))
-        for keyword in [k.strip() for k in keywords if str(k).strip()]:
-            cur.execute("INSERT INTO keyword (th_num, keyword) VALUES (%s, %s)", (th_num, keyword))
+        # Tezin zaten referans verdiği kayıtlar silinmiş olsa da düzenlenebilir
+        assigned = thesis_advisor_ids(cur, th_num)
+        reject_deleted_references(
+            conn, "person", [author_id, *(i for ids in advisors.values() if ids for i in ids)],
+            allowed={old[0], *assigned},
+        )
+        reject_deleted_references(conn, "university", [university_id], allowed={old[1]})
+        reject_deleted_references(conn, "institute", [institute_id], allowed={old[2]})
+
+        sync_terms(cur, "topic", th_num, clean_terms(topics))
+        sync_terms(cur, "keyword", th_num, clean_terms(keywords))
+        for role, ids in advisors.items():
+            if ids is not None:
+                sync_advisors(cur, role, th_num, ids)
+        similar_changed = refresh_similar(conn, th_num)
 
         conn.commit()
     except Exception as exc:
@@ -520,37 +1825,256 @@ def api_thesis_update(th_num: int):
         cur.close()
         conn.close()
 
+    advisor_per_ids = [i for ids in advisors.values() if ids for i in ids]
+    invalidate(
+        *thesis_tags(th_num, *old),
+        *thesis_tags(th_num, author_id, university_id, institute_id),
+        *advisor_change_tags(th_num, advisor_per_ids),
+        *(["similar"] if similar_changed else []),
+    )
     return jsonify({"ok": True})
 
 # --- API: DELETE THESIS ---
 @app.delete("/api/theses/<int:th_num>")
 def api_thesis_delete(th_num: int):
     conn = get_db_connection()
-    cur = conn.cursor()
     try:
-        cur.execute("DELETE FROM keyword WHERE th_num = %s", (th_num,))
-        cur.execute("DELETE FROM topic WHERE th_num = %s", (th_num,))
-        cur.execute("DELETE FROM thesis WHERE th_num = %s", (th_num,))
+        deleted = delete_theses(conn, "T.th_num = %(id)s", {"id": th_num})
         conn.commit()
-        if cur.rowcount == 0:
+        if not deleted:
             return jsonify({"error": "Thesis not found"}), 404
     except Exception as exc:
         conn.rollback()
         return jsonify({"error": str(exc)}), 400
     finally:
-        cur.close()
         conn.close()
 
+    invalidate(*thesis_tags(*deleted[0]), "similar")
     return jsonify({"ok": True})
 
-# --- API: THESIS DETAIL ---
-@app.get("/api/theses/<int:th_num>")
-def api_thesis_detail(th_num: int):
+# --- API: BULK UPDATE / DELETE THESES ---
+# PATCH /api/theses  {"ids": [1, 2] | "filter": {...}, "set": {...},
+#                     "addTopics": [...], "removeTopics": [...],
+#                     "addKeywords": [...], "removeKeywords": [...], "dryRun": false}
+# DELETE /api/theses {"ids": [1, 2] | "filter": {...}, "dryRun": false}
+# filter, liste endpoint'inin parametreleridir: {"university": [3], "yearTo": 2010}
+THESIS_BULK_FIELDS = {
+    # gövde alanı -> (thesis kolonu, tip)
+    "authorId": ("author_id", int),
+    "thesisYear": ("th_year", "year"),
+    "thesisType": ("th_type", str),
+    "universityId": ("uni_id", int),
+    "instituteId": ("ins_id", int),
+    "pageCount": ("page_num", int),
+    "language": ("th_language", str),
+}
+THESIS_BULK_TERMS = {
+    "topic": ("addTopics", "removeTopics"),
+    "keyword": ("addKeywords", "removeKeywords"),
+}
+
+def bulk_thesis_selection(body):
+    # (istenen id'ler ya da None, koşul, parametreler)
+    if ("ids" in body) == ("filter" in body):
+        raise ApiError("Provide either ids or filter")
+    if "ids" in body:
+        ids = bulk_ids(body)
+        return ids, "T.th_num = ANY(%s)", [ids]
+
+    criteria = body.get("filter")
+    if not isinstance(criteria, dict):
+        raise ApiError("filter must be an object")
+    args = MultiDict([
+        (name, str(value))
+        for name, values in criteria.items()
+        for value in (values if isinstance(values, list) else [values])
+    ])
+    filters = thesis_filters(args).values()
+    if not filters:
+        # Yanlışlıkla tüm tezlere uygulanmasın
+        raise ApiError("filter must not be empty")
+    return None, " AND ".join(f"({sql})" for sql, _ in filters), [p for _, params in filters for p in params]
+
+def lock_bulk_theses(cur, body):
+    # Seçilen tezler kilitlenir; (istenen id'ler, [(th_num, author_id, uni_id, ins_id)]) döner
+    ids, condition, params = bulk_thesis_selection(body)
+    cur.execute(f"""
+        SELECT T.th_num, T.author_id, T.uni_id, T.ins_id
+        FROM thesis T
+        WHERE {condition}
+        ORDER BY T.th_num
+        LIMIT %s
+        FOR UPDATE
+    """, [*params, BULK_MAX_IDS + 1])
+    rows = cur.fetchall()
+    if len(rows) > BULK_MAX_IDS:
+        raise ApiError(f"filter matches more than {BULK_MAX_IDS} theses")
+    return ids, rows
+
+def bulk_thesis_results(ids, th_nums, status):
+    done = set(th_nums)
+    return bulk_results({
+        i: status if i in done else "not_found"
+        for i in (sorted(done) if ids is None else ids)
+    })
+
+def parse_bulk_set(body):
+    # Kolon -> değer; tez başına değişen alanlar (başlık, özet) toplu güncellenmez
+    values = body.get("set") or {}
+    if not isinstance(values, dict):
+        raise ApiError("set must be an object")
+    assignments = {}
+    for name, value in values.items():
+        if name not in THESIS_BULK_FIELDS:
+            raise ApiError(f"Cannot bulk update {name}")
+        column, kind = THESIS_BULK_FIELDS[name]
+        if kind == "year":
+            assignments[column] = parse_date_from_year(value)
+            if value not in (None, "") and assignments[column] is None:
+                raise ApiError("Invalid thesisYear")
+        elif kind is int:
+            try:
+                assignments[column] = int(value)
+            except (TypeError, ValueError):
+                raise ApiError(f"Invalid {name}")
+        else:
+            assignments[column] = str(value or "").strip()
+            if not assignments[column]:
+                raise ApiError(f"Missing {name}")
+    return assignments
+
+@app.patch("/api/theses")
+def api_theses_bulk_update():
+    body = request.get_json(silent=True) or {}
+    assignments = parse_bulk_set(body)
+    terms = {
+        term_type: (clean_terms(body.get(add) or []), clean_terms(body.get(remove) or []))
+        for term_type, (add, remove) in THESIS_BULK_TERMS.items()
+    }
+    if not assignments and not any(add or remove for add, remove in terms.values()):
+        raise ApiError("Nothing to update")
+    dry_run = bool(body.get("dryRun"))
+
     conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur = conn.cursor()
+    counts = {}
+    try:
+        if any(add or remove for add, remove in terms.values()):
+            lock_similar(conn)
+        ids, rows = lock_bulk_theses(cur, body)
+        th_nums = [row[0] for row in rows]
+        tags = [tag for row in rows for tag in thesis_tags(*row)]
+
+        if th_nums and assignments:
+            for column, target in (("author_id", "person"), ("uni_id", "university"), ("ins_id", "institute")):
+                if column in assignments:
+                    reject_deleted_references(conn, target, [assignments[column]])
+            sets = [f"{column} = %({column})s" for column in assignments]
+            # Enstitü verilip üniversite verilmezse tez enstitünün üniversitesine geçer
+            if "ins_id" in assignments and "uni_id" not in assignments:
+                sets.append("uni_id = (SELECT uni_id FROM institute WHERE ins_id = %(ins_id)s)")
+            cur.execute(f"""
+                UPDATE thesis
+                SET {", ".join(sets)}
+                WHERE th_num = ANY(%(th_nums)s)
+                RETURNING th_num, author_id, uni_id, ins_id
+            """, {**assignments, "th_nums": th_nums})
+            tags.extend(tag for row in cur.fetchall() for tag in thesis_tags(*row))
+
+        term_changed = set()
+        for term_type, (add, remove) in terms.items():
+            table, column = TERM_COLUMNS[term_type]
+            added = removed = 0
+            if th_nums and remove:
+                cur.execute(
+                    f"DELETE FROM {table} WHERE th_num = ANY(%s) AND {column} = ANY(%s) RETURNING th_num",
+                    (th_nums, remove),
+                )
+                removed = cur.rowcount
+                term_changed.update(row[0] for row in cur.fetchall())
+            if th_nums and add:
+                cur.execute(f"""
+                    INSERT INTO {table} (th_num, {column})
+                    SELECT T.th_num, N.name
+                    FROM unnest(%(th_nums)s::int[]) AS T(th_num)
+                    CROSS JOIN unnest(%(names)s::text[]) WITH ORDINALITY AS N(name, ord)
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM {table} X
+                        WHERE X.th_num = T.th_num AND X.{column} = N.name
+                    )
+                    ORDER BY T.th_num, N.ord
+                    RETURNING th_num
+                """, {"th_nums": th_nums, "names": add})
+                added = cur.rowcount
+                term_changed.update(row[0] for row in cur.fetchall())
+            counts[f"{term_type}sAdded"] = added
+            counts[f"{term_type}sRemoved"] = removed
+
+        # Terimi değişen tezlerin benzerlik index'i aynı transaction'da güncellenir
+        similar_changed = False
+        for th_num in sorted(term_changed):
+            similar_changed = refresh_similar(conn, th_num) or similar_changed
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except ApiError:
+        conn.rollback()
+        raise
+    except Exception as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cur.close()
+        conn.close()
 
-    cur.execute("""
-        SELECT
+    if not dry_run:
+        invalidate(*tags, *(["similar"] if similar_changed else []))
+    return jsonify({
+        "dryRun": dry_run,
+        "updated": len(th_nums),
+        **counts,
+        "results": bulk_thesis_results(ids, th_nums, "updated"),
+    })
+
+@app.delete("/api/theses")
+def api_theses_bulk_delete():
+    body = request.get_json(silent=True) or {}
+    dry_run = bool(body.get("dryRun"))
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        lock_similar(conn)
+        ids, rows = lock_bulk_theses(cur, body)
+        deleted = delete_theses(conn, "T.th_num = ANY(%(ids)s)", {"ids": [row[0] for row in rows]})
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except ApiError:
+        conn.rollback()
+        raise
+    except Exception as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cur.close()
+        conn.close()
+
+    if not dry_run and deleted:
+        invalidate(*{tag for row in deleted for tag in thesis_tags(*row)}, "similar")
+    return jsonify({
+        "dryRun": dry_run,
+        "deleted": len(deleted),
+        "results": bulk_thesis_results(ids, [row[0] for row in deleted], "deleted"),
+    })
+
+# --- API: THESIS DETAIL ---
+# Konu, anahtar kelime ve danışmanlar ilişkili alt sorgularla toplanır: iki LEFT JOIN
+# + GROUP BY konu × anahtar kelime çarpımı kadar satır üretip sonra tekrarları atıyordu
+THESIS_DETAIL_COLUMNS = f"""
             T.th_num AS id,
             T.title,
             T.abstract,
@@ -565,98 +2089,500 @@ def api_thesis_detail(th_num: int):
             T.page_num AS "pageCount",
             T.th_language AS "language",
             T.submission_date AS "submissionDate",
-            COALESCE(
-                array_agg(DISTINCT TP.topic_name) FILTER (WHERE TP.topic_name IS NOT NULL),
-                ARRAY[]::text[]
+            ARRAY(
+                SELECT DISTINCT TP.topic_name FROM topic TP
+                WHERE TP.th_num = T.th_num ORDER BY 1
             ) AS topics,
-            COALESCE(
-                array_agg(DISTINCT K.keyword) FILTER (WHERE K.keyword IS NOT NULL),
-                ARRAY[]::text[]
-            ) AS keywords
-        FROM thesis T
+            ARRAY(
+                SELECT DISTINCT K.keyword FROM keyword K
+                WHERE K.th_num = T.th_num AND K.keyword IS NOT NULL ORDER BY 1
+            ) AS keywords,
+            {advisors_sql("supervisor")} AS supervisors,
+            {advisors_sql("cosupervisor")} AS cosupervisors"""
+
+def fetch_thesis_details(cur, th_nums):
+    # Tek sorgu; sonuç istenen id sırasıyla döner, olmayan id'ler atlanır
+    cur.execute(f"""
+        SELECT{THESIS_DETAIL_COLUMNS}
+        FROM unnest(%s::int[]) WITH ORDINALITY AS R(th_num, ord)
+        JOIN thesis T ON T.th_num = R.th_num
         JOIN person P ON T.author_id = P.per_id
         JOIN university U ON T.uni_id = U.uni_id
         JOIN institute I ON T.ins_id = I.ins_id
-        LEFT JOIN topic TP ON TP.th_num = T.th_num
-        LEFT JOIN keyword K ON K.th_num = T.th_num
+        ORDER BY R.ord
+    """, (list(th_nums),))
+    return cur.fetchall()
+
+def thesis_detail_tags(t):
+    return [
+        f"thesis:{t['id']}",
+        f"person:{t['authorId']}",
+        f"university:{t['universityId']}",
+        f"institute:{t['instituteId']}",
+        *advisor_tags(t),
+    ]
+
+@app.get("/api/theses/<int:th_num>")
+@conditional("thesis", "person", "university", "institute", "topic", "keyword", "supervisor", "cosupervisor")
+@cached("thesis:{th_num}", dynamic_tags=thesis_detail_tags)
+def api_thesis_detail(th_num: int):
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    rows = fetch_thesis_details(cur, [th_num])
+
+    cur.close()
+    conn.close()
+
+    if not rows:
+        return jsonify({"error": "Thesis not found"}), 404
+
+    return jsonify(rows[0])
+
+# --- API: THESIS ADVISORS ---
+@app.get("/api/theses/<int:th_num>/supervisors")
+@conditional("thesis", "person", "supervisor", "cosupervisor")
+@cached("thesis:{th_num}", dynamic_tags=advisor_tags)
+def api_thesis_advisors(th_num: int):
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    cur.execute(f"""
+        SELECT
+            {advisors_sql("supervisor")} AS supervisors,
+            {advisors_sql("cosupervisor")} AS cosupervisors
+        FROM thesis T
         WHERE T.th_num = %s
-        GROUP BY
-            T.th_num,
-            P.first_name,
-            P.second_name,
-            U.uni_name,
-            I.ins_name
     """, (th_num,))
-    thesis = cur.fetchone()
+    advisors = cur.fetchone()
 
     cur.close()
     conn.close()
 
-    if thesis is None:
+    if advisors is None:
         return jsonify({"error": "Thesis not found"}), 404
 
-    return jsonify(thesis)
+    return jsonify(advisors)
 
-# --- API: SEARCH (title/abstract) ---
-@app.post("/api/search")
-def api_search():
-    body = request.get_json(silent=True) or {}
-    keyword = (body.get("keyword") or "").strip()
-    search_type = (body.get("type") or "").strip().lower()
-    param = f"%{keyword}%"
+# --- API: SIMILAR THESES ---
+# similarity.py'nin önceden hesapladığı listeden okunur; istek başına katalog
+# taranmaz. Toplu import edilen tezler bir sonraki "similarity.py build" ile girer.
+def similar_tags(data):
+    return [tag for t in data for tag in (f"thesis:{t['id']}", f"person:{t['authorId']}")]
+
+@app.get("/api/theses/<int:th_num>/similar")
+@conditional("thesis", "person", "similar_thesis")
+@cached("thesis:{th_num}", "similar", dynamic_tags=similar_tags)
+def api_thesis_similar(th_num: int):
+    try:
+        limit = int(request.args.get("limit") or 10)
+    except ValueError:
+        raise ApiError("Invalid limit")
+    if limit < 1:
+        raise ApiError("Invalid limit")
 
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    if search_type == "topic":
-        cur.execute("""
-            SELECT DISTINCT
+    cur.execute("""
+        SELECT COALESCE((
+            SELECT json_agg(R ORDER BY R.score DESC, R.id)
+            FROM (
+                SELECT
+                    T.th_num AS id,
+                    T.title,
+                    T.author_id AS "authorId",
+                    P.first_name || ' ' || P.second_name AS "authorName",
+                    EXTRACT(YEAR FROM T.th_year)::int AS "thesisYear",
+                    T.th_type AS "thesisType",
+                    round(S.score::numeric, 4)::float8 AS score
+                FROM similar_thesis S
+                JOIN thesis T ON T.th_num = S.similar_th_num
+                JOIN person P ON P.per_id = T.author_id
+                WHERE S.th_num = X.th_num
+                ORDER BY S.score DESC, S.similar_th_num
+                LIMIT %s
+            ) R
+        ), '[]') AS similar
+        FROM thesis X
+        WHERE X.th_num = %s
+    """, (min(limit, SIMILAR_K), th_num))
+    row = cur.fetchone()
+
+    cur.close()
+    conn.close()
+
+    if row is None:
+        return jsonify({"error": "Thesis not found"}), 404
+
+    return jsonify(row["similar"])
+
+@app.put("/api/theses/<int:th_num>/supervisors")
+def api_thesis_advisors_update(th_num: int):
+    # Gönderilen rol listeleri tamamen değiştirilir; gönderilmeyen rol olduğu gibi kalır
+    body = request.get_json(silent=True) or {}
+    roles = {role: advisor_ids(body, role) for role in ADVISOR_ROLES}
+    roles = {role: ids for role, ids in roles.items() if ids is not None}
+    if not roles:
+        return jsonify({"error": "supervisorIds or cosupervisorIds is required"}), 400
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT 1 FROM thesis WHERE th_num = %s FOR UPDATE", (th_num,))
+        if cur.fetchone() is None:
+            conn.rollback()
+            return jsonify({"error": "Thesis not found"}), 404
+        reject_deleted_references(
+            conn, "person", [i for ids in roles.values() for i in ids],
+            allowed=set(thesis_advisor_ids(cur, th_num)),
+        )
+        for role, ids in roles.items():
+            sync_advisors(cur, role, th_num, ids)
+        conn.commit()
+    except Exception as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cur.close()
+        conn.close()
+
+    invalidate(*advisor_change_tags(th_num, [i for ids in roles.values() for i in ids]))
+    return jsonify({"ok": True})
+
+# --- API: BULK ASSIGN ADVISORS ---
+@app.post("/api/supervisors")
+def api_advisors_assign():
+    # {"assignments": [{"thesisId": 1, "personId": 2, "role": "supervisor"}, ...]}
+    # Var olan atamalar atlanır; her rol tek INSERT ile yazılır
+    body = request.get_json(silent=True) or {}
+    assignments = body.get("assignments")
+    if not isinstance(assignments, list) or not assignments:
+        return jsonify({"error": "assignments must be a non-empty list"}), 400
+
+    pairs = {role: [] for role in ADVISOR_ROLES}
+    for index, item in enumerate(assignments):
+        role = (item.get("role") or "supervisor") if isinstance(item, dict) else None
+        try:
+            pairs[role].append((int(item["thesisId"]), int(item["personId"])))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": f"Invalid assignment at index {index}"}), 400
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    assigned = 0
+    try:
+        reject_deleted_references(conn, "person", [per_id for rows in pairs.values() for _, per_id in rows])
+        for role, rows in pairs.items():
+            if not rows:
+                continue
+            th_nums, per_ids = zip(*rows)
+            cur.execute(f"""
+                INSERT INTO {role} (per_id, th_num)
+                SELECT N.per_id, N.th_num
+                FROM unnest(%s::int[], %s::int[]) AS N(th_num, per_id)
+                ON CONFLICT DO NOTHING
+            """, (list(th_nums), list(per_ids)))
+            assigned += cur.rowcount
+        conn.commit()
+    except Exception as exc:
+        conn.rollback()
+        return jsonify({"error": str(exc)}), 400
+    finally:
+        cur.close()
+        conn.close()
+
+    invalidate(*{
+        tag
+        for rows in pairs.values()
+        for th_num, per_id in rows
+        for tag in advisor_change_tags(th_num, [per_id])
+    })
+    return jsonify({"assigned": assigned})
+
+# --- FULL-TEXT SEARCH HELPERS ---
+# migrations/0001_fulltext_search içindeki thesis_ts_config() ile aynı diller
+SEARCH_CONFIGS = {
+    "english": "english",
+    "turkish": "turkish",
+    "german": "german",
+    "french": "french",
+    "spanish": "spanish",
+    "italian": "italian",
+}
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+def build_tsquery(text):
+    # "tam ifade" -> phrase (a <-> b), kelime* -> prefix (kelime:*), gerisi AND
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        words = re.findall(r"\w+", phrase or word)
+        if not words:
+            continue
+        if word and word.endswith("*"):
+            words[-1] += ":*"
+        parts.append(words[0] if len(words) == 1 else "(" + " <-> ".join(words) + ")")
+    return " & ".join(parts)
+
+def fulltext_statement(text, language, limit):
+    tsquery = build_tsquery(text)
+    if not tsquery:
+        return None
+
+    # Dil verilmezse sorgu tüm dillerin config'leriyle OR'lanır; tek bir sabit
+    # tsquery olduğu için GIN index kullanılabilir
+    if language:
+        configs = [SEARCH_CONFIGS.get(language.lower(), "simple")]
+    else:
+        configs = list(dict.fromkeys(SEARCH_CONFIGS.values())) + ["simple"]
+    query_sql = " || ".join(f"to_tsquery('{c}', %(q)s)" for c in configs)
+    # Büyük/küçük harf duyarsız eşitlik; ILIKE "%" ve "_" karakterlerini joker sayardı
+    language_sql = "AND lower(T.th_language) = lower(%(language)s)" if language else ""
+
+    return f"""
+        WITH Q AS (SELECT {query_sql} AS query)
+        SELECT
+            T.th_num,
+            T.title,
+            EXTRACT(YEAR FROM T.th_year)::int AS th_year,
+            T.th_type,
+            P.first_name || ' ' || P.second_name AS author,
+            R.rank,
+            ts_headline(thesis_ts_config(T.th_language), T.abstract, Q.query,
+                        %(headline)s) AS snippet
+        FROM (
+            SELECT T.th_num, ts_rank(T.search_vector, Q.query) AS rank
+            FROM thesis T, Q
+            WHERE T.search_vector @@ Q.query
+            {language_sql}
+            ORDER BY rank DESC, T.th_num
+            LIMIT %(limit)s
+        ) R
+        JOIN thesis T ON T.th_num = R.th_num
+        JOIN person P ON T.author_id = P.per_id
+        CROSS JOIN Q
+        ORDER BY R.rank DESC, T.th_num
+    """, {
+        "q": tsquery,
+        "language": language,
+        "limit": limit,
+        "headline": SEARCH_HEADLINE_OPTIONS,
+    }
+
+# --- FUZZY (TRIGRAM) SEARCH HELPERS ---
+# migrations/0002_trigram_search içindeki pg_trgm index'lerini kullanır
+TERM_COLUMNS = {
+    "topic": ("topic", "topic_name"),
+    "keyword": ("keyword", "keyword"),
+}
+SEARCH_FUZZY_THRESHOLD = float(os.getenv("SEARCH_FUZZY_THRESHOLD", "0.3"))
+SUGGEST_LIMIT_MAX = 50
+
+def like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def fuzzy_threshold_statement(threshold):
+    # Sadece bu transaction için; bağlantı havuza dönerken rollback ile sıfırlanır
+    return (
+        "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+        (str(threshold),),
+    )
+
+def fuzzy_statement(search_type, text, limit):
+    table, column = TERM_COLUMNS[search_type]
+    return f"""
+        SELECT
+            T.th_num,
+            T.title,
+            EXTRACT(YEAR FROM T.th_year)::int AS th_year,
+            T.th_type,
+            P.first_name || ' ' || P.second_name AS author,
+            M.score
+        FROM (
+            SELECT
+                X.th_num,
+                max(CASE WHEN X.{column} ILIKE %(like)s THEN 1
+                         ELSE word_similarity(%(q)s, X.{column}) END) AS score
+            FROM {table} X
+            WHERE X.{column} ILIKE %(like)s OR X.{column} %%> %(q)s
+            GROUP BY X.th_num
+            ORDER BY score DESC, X.th_num
+            LIMIT %(limit)s
+        ) M
+        JOIN thesis T ON T.th_num = M.th_num
+        JOIN person P ON T.author_id = P.per_id
+        ORDER BY M.score DESC, T.th_num
+    """, {
+        "q": text,
+        "like": f"%{like_escape(text)}%",
+        "limit": limit,
+    }
+
+def parse_search_limit(value):
+    try:
+        limit = min(int(value or API_PAGE_SIZE), API_PAGE_MAX)
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1:
+        raise ApiError("Invalid limit")
+    return limit
+
+def parse_fuzzy_threshold(value):
+    if value in (None, ""):
+        return SEARCH_FUZZY_THRESHOLD
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        threshold = -1
+    if not 0 <= threshold <= 1:
+        raise ApiError("Invalid threshold")
+    return threshold
+
+# --- API: SEARCH (title/abstract) ---
+# mode=fulltext: başlık/özet için tsvector + GIN, ts_rank sıralı ve snippet'li sonuç
+# mode=fuzzy: topic/keyword için trigram benzerliği, yazım hatalarını tolere eder
+SEARCH_RESULT_COLUMNS = """
                 T.th_num,
                 T.title,
                 EXTRACT(YEAR FROM T.th_year)::int AS th_year,
                 T.th_type,
-                P.first_name || ' ' || P.second_name AS author
+                P.first_name || ' ' || P.second_name AS author"""
+
+def search_statements(body):
+    # İstekten sıradaki SQL'leri üretir; sonuncusunun satırları cevaptır.
+    # Boş liste boş sonuç demektir. asgi.py aynı statement'ları async çalıştırır.
+    keyword = (body.get("keyword") or "").strip()
+    search_type = (body.get("type") or "").strip().lower()
+    mode = (body.get("mode") or "").strip().lower()
+    param = f"%{keyword}%"
+
+    if mode not in ("", "substring", "fulltext", "fuzzy"):
+        raise ApiError("Invalid mode")
+
+    if mode == "fuzzy":
+        if search_type not in TERM_COLUMNS:
+            raise ApiError("Fuzzy mode is only available for topic and keyword")
+        limit = parse_search_limit(body.get("limit"))
+        threshold = parse_fuzzy_threshold(body.get("threshold"))
+        if not keyword:
+            return []
+        return [
+            fuzzy_threshold_statement(threshold),
+            fuzzy_statement(search_type, keyword, limit),
+        ]
+
+    if mode == "fulltext" and search_type not in TERM_COLUMNS:
+        limit = parse_search_limit(body.get("limit"))
+        language = (body.get("language") or "").strip()
+        statement = fulltext_statement(keyword, language, limit)
+        return [statement] if statement else []
+
+    if search_type == "topic":
+        return [(f"""
+            SELECT DISTINCT{SEARCH_RESULT_COLUMNS}
             FROM thesis T
             JOIN person P ON T.author_id = P.per_id
             JOIN topic TP ON TP.th_num = T.th_num
             WHERE TP.topic_name ILIKE %s
             ORDER BY T.th_num
-        """, (param,))
-    elif search_type == "keyword":
-        cur.execute("""
-            SELECT DISTINCT
-                T.th_num,
-                T.title,
-                EXTRACT(YEAR FROM T.th_year)::int AS th_year,
-                T.th_type,
-                P.first_name || ' ' || P.second_name AS author
+        """, (param,))]
+    if search_type == "keyword":
+        return [(f"""
+            SELECT DISTINCT{SEARCH_RESULT_COLUMNS}
             FROM thesis T
             JOIN person P ON T.author_id = P.per_id
             JOIN keyword K ON K.th_num = T.th_num
             WHERE K.keyword ILIKE %s
             ORDER BY T.th_num
-        """, (param,))
-    else:
-        cur.execute("""
-            SELECT
-                T.th_num,
-                T.title,
-                EXTRACT(YEAR FROM T.th_year)::int AS th_year,
-                T.th_type,
-                P.first_name || ' ' || P.second_name AS author
+        """, (param,))]
+    return [(f"""
+            SELECT{SEARCH_RESULT_COLUMNS}
             FROM thesis T
             JOIN person P ON T.author_id = P.per_id
             WHERE T.title ILIKE %s OR T.abstract ILIKE %s
             ORDER BY T.th_num
-        """, (param, param))
+        """, (param, param))]
+
+@app.post("/api/search")
+def api_search():
+    statements = search_statements(request.get_json(silent=True) or {})
+    if not statements:
+        return jsonify([])
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    for query, params in statements:
+        cur.execute(query, params)
     rows = cur.fetchall()
 
     cur.close()
     conn.close()
     return jsonify(rows)
 
+# --- API: TOPIC / KEYWORD AUTOCOMPLETE ---
+def suggest_statements(search_type, args):
+    q = (args.get("q") or "").strip()
+    try:
+        limit = int(args.get("limit") or 10)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ApiError("Invalid limit")
+    limit = min(limit, SUGGEST_LIMIT_MAX)
+    threshold = parse_fuzzy_threshold(args.get("threshold"))
+    if not q:
+        return []
+
+    table, column = TERM_COLUMNS[search_type]
+    # Önce prefix eşleşmeleri, sonra benzerliğe ve kullanım sayısına göre
+    return [fuzzy_threshold_statement(threshold), (f"""
+        SELECT
+            X.{column} AS term,
+            count(*) AS "thesisCount",
+            max(CASE WHEN lower(X.{column}) LIKE %(prefix)s THEN 1
+                     ELSE word_similarity(%(q)s, X.{column}) END) AS score
+        FROM {table} X
+        WHERE lower(X.{column}) LIKE %(prefix)s OR X.{column} %%> %(q)s
+        GROUP BY X.{column}
+        ORDER BY score DESC, "thesisCount" DESC, term
+        LIMIT %(limit)s
+    """, {
+        "q": q,
+        "prefix": f"{like_escape(q.lower())}%",
+        "limit": limit,
+    })]
+
+def suggest_terms(search_type):
+    statements = suggest_statements(search_type, request.args)
+    if not statements:
+        return jsonify([])
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    for query, params in statements:
+        cur.execute(query, params)
+    rows = cur.fetchall()
+
+    cur.close()
+    conn.close()
+    return jsonify(rows)
+
+@app.get("/api/topics/suggest")
+@conditional("topic")
+@cached("theses")
+def api_topics_suggest():
+    return suggest_terms("topic")
+
+@app.get("/api/keywords/suggest")
+@conditional("keyword")
+@cached("theses")
+def api_keywords_suggest():
+    return suggest_terms("keyword")
+
 # --- API: PERSON DETAIL ---
 @app.get("/api/persons/<int:per_id>")
+@conditional("person")
+@cached("person:{per_id}")
 def api_person_detail(per_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -668,7 +2594,7 @@ def api_person_detail(per_id: int):
             second_name AS "secondName",
             phone_num AS "phoneNumber"
         FROM person
-        WHERE per_id = %s
+        WHERE per_id = %s AND deleted_at IS NULL
     """, (per_id,))
     person = cur.fetchone()
 
@@ -682,6 +2608,8 @@ def api_person_detail(per_id: int):
 
 # --- API: PERSON THESES ---
 @app.get("/api/persons/<int:per_id>/theses")
+@conditional("thesis")
+@cached("person:{per_id}:theses", "thesis-sublists")
 def api_person_theses(per_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -703,8 +2631,41 @@ def api_person_theses(per_id: int):
     conn.close()
     return jsonify(rows)
 
+# --- API: PERSON SUPERVISED THESES ---
+@app.get("/api/persons/<int:per_id>/supervised")
+@conditional("thesis", "supervisor", "cosupervisor")
+@cached("person:{per_id}:supervised", "thesis-sublists",
+        dynamic_tags=lambda rows: [f"thesis:{r['id']}" for r in rows])
+def api_person_supervised(per_id: int):
+    # İki rol tek sorguda; (per_id, th_num) birincil anahtarları kullanılır
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    cur.execute("""
+        SELECT
+            T.th_num AS id,
+            T.title,
+            EXTRACT(YEAR FROM T.th_year)::int AS "thesisYear",
+            T.th_type AS "thesisType",
+            R.role
+        FROM (
+            SELECT th_num, 'supervisor' AS role FROM supervisor WHERE per_id = %(per_id)s
+            UNION ALL
+            SELECT th_num, 'cosupervisor' AS role FROM cosupervisor WHERE per_id = %(per_id)s
+        ) R
+        JOIN thesis T ON T.th_num = R.th_num
+        ORDER BY T.th_num, R.role DESC
+    """, {"per_id": per_id})
+    rows = cur.fetchall()
+
+    cur.close()
+    conn.close()
+    return jsonify(rows)
+
 # --- API: UNIVERSITY DETAIL ---
 @app.get("/api/universities/<int:uni_id>")
+@conditional("university")
+@cached("university:{uni_id}")
 def api_university_detail(uni_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -715,7 +2676,7 @@ def api_university_detail(uni_id: int):
             uni_name AS "universityName",
             uni_location AS "location"
         FROM university
-        WHERE uni_id = %s
+        WHERE uni_id = %s AND deleted_at IS NULL
     """, (uni_id,))
     university = cur.fetchone()
 
@@ -729,6 +2690,8 @@ def api_university_detail(uni_id: int):
 
 # --- API: UNIVERSITY INSTITUTES ---
 @app.get("/api/universities/<int:uni_id>/institutes")
+@conditional("institute")
+@cached("university:{uni_id}:institutes")
 def api_university_institutes(uni_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -739,7 +2702,7 @@ def api_university_institutes(uni_id: int):
             I.ins_name AS "instituteName",
             I.uni_id AS "universityId"
         FROM institute I
-        WHERE I.uni_id = %s
+        WHERE I.uni_id = %s AND I.deleted_at IS NULL
         ORDER BY I.ins_id
     """, (uni_id,))
     rows = cur.fetchall()
@@ -750,6 +2713,8 @@ def api_university_institutes(uni_id: int):
 
 # --- API: UNIVERSITY THESES ---
 @app.get("/api/universities/<int:uni_id>/theses")
+@conditional("thesis")
+@cached("university:{uni_id}:theses", "thesis-sublists")
 def api_university_theses(uni_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -772,6 +2737,8 @@ def api_university_theses(uni_id: int):
 
 # --- API: INSTITUTE DETAIL ---
 @app.get("/api/institutes/<int:ins_id>")
+@conditional("institute", "university")
+@cached("institute:{ins_id}", dynamic_tags=lambda i: [f"university:{i['universityId']}"])
 def api_institute_detail(ins_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -784,7 +2751,7 @@ def api_institute_detail(ins_id: int):
             U.uni_name AS "universityName"
         FROM institute I
         JOIN university U ON I.uni_id = U.uni_id
-        WHERE I.ins_id = %s
+        WHERE I.ins_id = %s AND I.deleted_at IS NULL
     """, (ins_id,))
     institute = cur.fetchone()
 
@@ -798,6 +2765,8 @@ def api_institute_detail(ins_id: int):
 
 # --- API: INSTITUTE THESES ---
 @app.get("/api/institutes/<int:ins_id>/theses")
+@conditional("thesis")
+@cached("institute:{ins_id}:theses", "thesis-sublists")
 def api_institute_theses(ins_id: int):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -819,6 +2788,201 @@ def api_institute_theses(ins_id: int):
     conn.close()
     return jsonify(rows)
 
+# --- API: STATS ---
+# migrations/0005 materialized view'larından okunur (stats.py refresh ile yenilenir);
+# katalog büyüklüğünden bağımsız olarak küçük tablolar/index okumasıdır
+STATS_QUERIES = {
+    "universities": """
+        SELECT uni_id AS id, uni_name AS "universityName", thesis_count AS "thesisCount"
+        FROM stats_university
+        ORDER BY thesis_count DESC, uni_id
+        LIMIT %s
+    """,
+    "institutes": """
+        SELECT ins_id AS id, ins_name AS "instituteName", uni_id AS "universityId",
+               thesis_count AS "thesisCount"
+        FROM stats_institute
+        ORDER BY thesis_count DESC, ins_id
+        LIMIT %s
+    """,
+    "years": """
+        SELECT th_year AS "thesisYear", thesis_count AS "thesisCount"
+        FROM stats_year
+        ORDER BY th_year NULLS LAST
+        LIMIT %s
+    """,
+    "types": """
+        SELECT th_type AS "thesisType", thesis_count AS "thesisCount"
+        FROM stats_type
+        ORDER BY thesis_count DESC, th_type
+        LIMIT %s
+    """,
+    "languages": """
+        SELECT th_language AS "language", thesis_count AS "thesisCount"
+        FROM stats_language
+        ORDER BY thesis_count DESC, th_language
+        LIMIT %s
+    """,
+    "topics": """
+        SELECT topic_name AS "topic", thesis_count AS "thesisCount"
+        FROM stats_topic
+        ORDER BY thesis_count DESC, topic_name
+        LIMIT %s
+    """,
+    "keywords": """
+        SELECT keyword, thesis_count AS "thesisCount"
+        FROM stats_keyword
+        ORDER BY thesis_count DESC, keyword
+        LIMIT %s
+    """,
+}
+STATS_DEFAULT_LIMIT = 20
+
+@app.get("/api/stats")
+@conditional("stats")
+def api_stats():
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+
+    cur.execute("""
+        SELECT
+            O.theses,
+            O.persons,
+            O.universities,
+            O.institutes,
+            O.topics,
+            O.keywords,
+            R.refreshed_at AS "refreshedAt"
+        FROM stats_overview O
+        CROSS JOIN stats_refresh R
+    """)
+    overview = cur.fetchone()
+
+    cur.close()
+    conn.close()
+    return jsonify(overview)
+
+@app.get("/api/stats/<dimension>")
+@conditional("stats")
+def api_stats_dimension(dimension):
+    query = STATS_QUERIES.get(dimension)
+    if query is None:
+        return jsonify({"error": "Unknown statistic"}), 404
+    try:
+        limit = min(int(request.args.get("limit") or STATS_DEFAULT_LIMIT), API_PAGE_MAX)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ApiError("Invalid limit")
+
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(query, (limit,))
+    rows = cur.fetchall()
+
+    cur.close()
+    conn.close()
+    return jsonify(rows)
+
+# --- API: BUNDLE ---
+# Sayfanın ihtiyaç duyduğu GET isteklerini tek istekte, tek bağlantı ve tek
+# read-only snapshot üzerinde çalıştırır:
+#   POST /api/bundle {"requests": {"thesis": "/api/theses/5", "persons": "/api/persons"}}
+#   -> {"thesis": {"status": 200, "body": {...}}, "persons": {"status": 200, "body": [...]}}
+BUNDLE_MAX_REQUESTS = int(os.getenv("BUNDLE_MAX_REQUESTS", "20"))
+# Stream edilen ya da kendini çağıran endpoint'ler bundle'a alınmaz
+BUNDLE_EXCLUDED_ENDPOINTS = {"api_bundle", "api_thesis_export"}
+
+class SharedConnection:
+    # Alt isteklerin conn.close() çağrısı bağlantıyı havuza geri vermez. Her alt
+    # istek kendi savepoint'inde çalışır; hata veren alt istek sadece kendi
+    # statement'larını geri alır, transaction (ve snapshot) diğerleri için açık kalır
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        pass
+
+    def _execute(self, sql):
+        cur = self._conn.cursor()
+        try:
+            cur.execute(sql)
+        finally:
+            cur.close()
+
+    def begin_part(self):
+        self._execute("SAVEPOINT bundle_part")
+
+    def end_part(self):
+        self._execute("RELEASE SAVEPOINT bundle_part")
+
+    def rollback(self):
+        # Route'ların kendi rollback()'i de bundle transaction'ını bitirmez
+        self._execute("ROLLBACK TO SAVEPOINT bundle_part")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+def bundle_part(path):
+    if not isinstance(path, str) or not path.startswith("/api/"):
+        return {"status": 400, "body": {"error": "Path must start with /api/"}}
+
+    url = path.partition("?")[0]
+    try:
+        endpoint, view_args = app.url_map.bind("localhost").match(url, method="GET")
+    except HTTPException as exc:
+        return {"status": exc.code, "body": {"error": exc.description}}
+    if endpoint in BUNDLE_EXCLUDED_ENDPOINTS:
+        return {"status": 400, "body": {"error": f"{url} cannot be bundled"}}
+
+    # Aynı app context içinde açıldığı için g (ve bundle bağlantısı) paylaşılır
+    conn = g.bundle_connection
+    with app.test_request_context(path):
+        conn.begin_part()
+        try:
+            response = app.make_response(app.view_functions[endpoint](**view_args))
+        except ApiError as exc:
+            conn.rollback()
+            response = app.make_response(handle_api_error(exc))
+        except Exception as exc:
+            # Sadece bu alt istek başarısız olur; bundle'ın geri kalanı cevaplanır
+            app.logger.exception("bundle part %s failed", url)
+            conn.rollback()
+            response = app.make_response((jsonify({"error": str(exc)}), 500))
+        conn.end_part()
+
+    part = {
+        "status": response.status_code,
+        "body": response.get_json() if response.is_json else response.get_data(as_text=True),
+    }
+    if "X-Next-Cursor" in response.headers:
+        part["nextCursor"] = response.headers["X-Next-Cursor"]
+    return part
+
+@app.post("/api/bundle")
+def api_bundle():
+    data = request.get_json(silent=True) or {}
+    parts = data.get("requests")
+    if not isinstance(parts, dict) or not parts:
+        raise ApiError("requests must be an object of name -> GET path")
+    if len(parts) > BUNDLE_MAX_REQUESTS:
+        raise ApiError(f"At most {BUNDLE_MAX_REQUESTS} requests per bundle")
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        # Tüm alt istekler aynı tutarlı görüntüyü okur
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        g.bundle_connection = SharedConnection(conn)
+        result = {name: bundle_part(path) for name, path in parts.items()}
+    finally:
+        g.pop("bundle_connection", None)
+        cur.close()
+        conn.rollback()
+        conn.close()
+
+    return jsonify(result)
+
 if __name__ == "__main__":
     # 5001 sende çakışma olmasın diye
     app.run(debug=True, port=5001)
@@ -0,0 +1,248 @@
+import contextlib
+import os
+import time
+
+import psycopg
+from a2wsgi import WSGIMiddleware
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+import db
+import metrics
+import profiling
+from app import ApiError, app as flask_app, pinned_to_primary, search_statements
+
+# Production ASGI girişi: yavaş ve cache'lenmeyen POST /api/search async Postgres
+# sürücüsü (psycopg 3) ve async havuz ile çalışır; bekleyen aramalar thread
+# tutmaz. Diğer tüm route'lar aynı Flask uygulamasına thread havuzu üzerinden
+# köprülenir, böylece route'lar ve JSON cevapları app.py ile birebir aynıdır.
+# DB_REPLICAS ayarlıysa arama, Flask route'larıyla aynı kurallarla (gecikme
+# kontrolü, gts_primary_until cookie'si) replica'ların async havuzlarından okur.
+#
+#   pip install "psycopg[binary]" psycopg_pool starlette a2wsgi uvicorn
+#   uvicorn asgi:app --port 5001
+
+# Async havuz; bekleyen istekler event loop'ta ucuzca sıraya girer
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", str(db.DB_POOL_MIN)))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", str(db.DB_POOL_MAX)))
+# Havuz doluyken bekleyebilecek en fazla istek (0: sınırsız)
+ASYNC_DB_POOL_MAX_WAITING = int(os.getenv("ASYNC_DB_POOL_MAX_WAITING", "0"))
+# Flask route'larını çalıştıran thread sayısı
+ASGI_WSGI_WORKERS = int(os.getenv("ASGI_WSGI_WORKERS", str(db.DB_POOL_MAX)))
+
+
+def new_pool(max_size, **params):
+    # db.connect ile aynı ayarlar; params (replica) DB_* ayarlarını ezer
+    params = {
+        "host": db.DB_HOST,
+        "dbname": db.DB_NAME,
+        "port": db.DB_PORT,
+        "user": db.DB_USER,
+        "password": db.DB_PASSWORD,
+        "options": f"-c statement_timeout={db.DB_STATEMENT_TIMEOUT}" if db.DB_STATEMENT_TIMEOUT else None,
+        **params,
+    }
+    return AsyncConnectionPool(
+        make_conninfo(**params),
+        min_size=min(ASYNC_DB_POOL_MIN, max_size),
+        max_size=max_size,
+        max_waiting=ASYNC_DB_POOL_MAX_WAITING,
+        timeout=db.DB_POOL_TIMEOUT,
+        max_lifetime=db.DB_POOL_MAX_LIFETIME,
+        open=False,
+    )
+
+
+class AsyncReplica:
+    # db.Replica'nın psycopg 3 karşılığı. Havuz açılışta bağlanmayı beklemez;
+    # kapalı bir replica uygulamayı başlatmaya engel olmaz
+    def __init__(self, spec, maxconn):
+        params = db.replica_params(spec)
+        self.name = db.replica_name(params)
+        self.pool = new_pool(maxconn, **params)
+        self.unavailable_until = 0.0
+        self.checked_at = 0.0
+        self.lag = None
+        self.error = None
+
+    def busy(self):
+        stats = self.pool.get_stats()
+        return stats["pool_size"] - stats["pool_available"] + stats.get("requests_waiting", 0)
+
+
+class AsyncReplicaSet(db.ReplicaSet):
+    # Seçim, gecikme ve yeniden deneme kuralları db.ReplicaSet'ten gelir
+    def __init__(self, specs):
+        super().__init__(specs, replica=AsyncReplica)
+
+    async def _check_async(self, replica, conn):
+        if not self._lag_due(replica):
+            return True
+        try:
+            cur = await conn.execute(db.REPLICA_LAG_SQL)
+            lag = float((await cur.fetchone())[0])
+            await conn.rollback()
+        except psycopg.Error as exc:
+            self._mark_unavailable(replica, str(exc).strip(), self.retry_after)
+            return False
+        return self._accept_lag(replica, lag)
+
+    async def getconn(self, preferred=None):
+        # psycopg_pool 0 saniyelik beklemede boşta bağlantı olsa bile zaman aşımı verir
+        timeout = max(self.pool_timeout, 0.001)
+        for replica in self._candidates(preferred):
+            try:
+                conn = await replica.pool.getconn(timeout)
+            except PoolTimeout:
+                # Meşgul (ya da henüz bağlantısı açılmamış) havuz beklenmez
+                continue
+            except psycopg.OperationalError as exc:
+                self._mark_unavailable(replica, str(exc).strip(), self.retry_after)
+                continue
+            if not await self._check_async(replica, conn):
+                await replica.pool.putconn(conn)
+                continue
+            return replica, conn
+        return None, None
+
+    async def open(self):
+        for replica in self.replicas:
+            await replica.pool.open(wait=False)
+
+    async def close(self):
+        for replica in self.replicas:
+            await replica.pool.close()
+
+
+pool = new_pool(ASYNC_DB_POOL_MAX)
+replicas = AsyncReplicaSet(db.DB_REPLICAS) if db.DB_REPLICAS else None
+
+
+@contextlib.asynccontextmanager
+async def read_connection(request):
+    # app.get_db_connection'ın async karşılığı: (replica, conn); uygun replica yoksa
+    # ya da istemci son yazmasından beri sticky süresi içindeyse primary (None, conn)
+    replica = conn = None
+    if replicas is not None and not pinned_to_primary(request.cookies):
+        replica, conn = await replicas.getconn()
+    if conn is None:
+        async with pool.connection() as conn:
+            yield None, conn
+        return
+    try:
+        yield replica, conn
+    finally:
+        # Sadece okundu; transaction kapatılıp havuza verilir (kopuksa havuz atar)
+        with contextlib.suppress(psycopg.Error):
+            await conn.rollback()
+        await replica.pool.putconn(conn)
+
+
+def json_response(data, status=200):
+    # jsonify ile aynı çıktı: sıralı anahtarlar, aynı tarih formatı, kompakt ayraçlar
+    body = flask_app.json.dumps(data, separators=(",", ":")) + "\n"
+    return Response(body, status_code=status, media_type="application/json")
+
+
+async def fetch_rows(request, statements):
+    # (satırlar, okunan replica ya da None)
+    started = time.perf_counter()
+    async with read_connection(request) as (replica, conn):
+        if metrics.METRICS_ENABLED:
+            metrics.POOL_ACQUIRE.observe(time.perf_counter() - started)
+        async with conn.cursor(row_factory=dict_row) as cur:
+            for query, params in statements:
+                started = time.perf_counter()
+                await cur.execute(query, params)
+                elapsed = time.perf_counter() - started
+                if metrics.METRICS_ENABLED:
+                    statement = metrics.statement_id(query)
+                    metrics.QUERY_DURATION.observe(elapsed, "/api/search", statement)
+                    metrics.QUERY_ROWS.observe(max(cur.rowcount, 0), "/api/search", statement)
+                if profiling.PROFILE_ENABLED and profiling.note_statement(query, elapsed):
+                    await log_slow_query(conn, query, params, elapsed)
+            return await cur.fetchall(), replica
+
+
+async def log_slow_query(conn, query, params, elapsed):
+    # profiling.record_statement'ın async karşılığı; EXPLAIN savepoint içinde çalışır
+    plan = None
+    if profiling.SLOW_QUERY_EXPLAIN and profiling.is_explainable(query):
+        try:
+            async with conn.transaction():
+                explain = await conn.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+                plan = [row[0] for row in await explain.fetchall()]
+        except Exception as exc:
+            plan = [f"EXPLAIN failed: {exc}"]
+    profiling.log_slow_query("/api/search", query, params, elapsed, plan)
+
+
+async def api_search(request):
+    started = time.perf_counter()
+    metrics.current_route.set("/api/search")
+    profile = None
+    if profiling.profile_requested(request.headers.get("X-Profile"), request.query_params.get("profile")):
+        profile = profiling.start_profile()
+    response = await search(request)
+    if metrics.METRICS_ENABLED:
+        metrics.REQUEST_DURATION.observe(
+            time.perf_counter() - started, "POST", "/api/search", str(response.status_code)
+        )
+    if profile is not None:
+        response.headers["Server-Timing"] = profiling.finish_profile(
+            profile, "/api/search", time.perf_counter() - started
+        )
+    return response
+
+
+async def search(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    try:
+        statements = search_statements(body if isinstance(body, dict) else {})
+        rows, replica = await fetch_rows(request, statements) if statements else ([], None)
+    except ApiError as exc:
+        return json_response({"error": str(exc)}, exc.status)
+    except PoolTimeout as exc:
+        if metrics.METRICS_ENABLED:
+            metrics.POOL_TIMEOUTS.inc()
+        return json_response({"error": str(exc)}, 503)
+    response = json_response(rows)
+    if replica is not None:
+        response.headers["X-DB-Replica"] = replica.name
+    return response
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    await pool.open(wait=False)
+    if replicas is not None:
+        await replicas.open()
+    try:
+        yield
+    finally:
+        await pool.close()
+        if replicas is not None:
+            await replicas.close()
+        db.close_pool()
+
+
+app = Starlette(
+    routes=[
+        Route("/api/search", api_search, methods=["POST"]),
+        Mount("/", app=WSGIMiddleware(flask_app, workers=ASGI_WSGI_WORKERS)),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, port=5001)
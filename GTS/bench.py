@@ -0,0 +1,591 @@
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+import db
+from migrate import migrate_up
+from seed import seed
+
+# Yük testi: seed edilmiş bir scratch veritabanında her endpoint grubunu eşzamanlı
+# isteklerle çalıştırır; senaryo başına throughput ve p50/p95/p99 gecikmesini
+# raporlar. --save ile sonuçlar saklanır, --compare ile önceki koşuya göre p95
+# gerilemesi varsa hata kodu ile çıkar.
+#
+#   DB_NAME=gtsdb_scratch python bench.py --seed 100000 --writes
+#   DB_NAME=gtsdb_scratch python bench.py --save before.json
+#   DB_NAME=gtsdb_scratch python bench.py --compare before.json
+#   python bench.py --url http://localhost:5001 --concurrency 32   # çalışan sunucuya karşı
+#
+# Varsayılan olarak sadece okuyan senaryolar çalışır ve şemaya dokunulmaz. Yazan
+# senaryolar (tez/kişi/üniversite/enstitü CRUD, import, toplu PATCH/DELETE)
+# --writes ile açılır; sadece kendi oluşturdukları kayıtlara yazarlar ve kalanları
+# koşu sonunda silerler. Migration'lar --migrate (ya da --seed) ile uygulanır.
+#
+# --url verilmezse istekler süreç içinde Flask test client ile gönderilir; cache'i
+# değil veritabanı yolunu ölçmek için CACHE_BACKEND=none ile çalıştırın.
+
+SAMPLE_SIZE = 500
+# Import isteği başına tez sayısı
+IMPORT_ROWS = 20
+# Toplu silme isteği başına kayıt sayısı
+BULK_DELETE_IDS = 5
+# Oluşturulan kayıt türü -> koleksiyon URL'i (POST ile oluşturulur, DELETE ile toplu silinir)
+COLLECTION_URLS = {
+    "thesis": "/api/theses",
+    "person": "/api/persons",
+    "university": "/api/universities",
+    "institute": "/api/institutes",
+}
+CREATED_KINDS = {url: kind for kind, url in COLLECTION_URLS.items()}
+
+
+class Samples:
+    # Her istek rastgele bir örnek id ile doldurulur; hep aynı satır ölçülmesin
+    def __init__(self, cur):
+        def column(query):
+            cur.execute(query)
+            return [row[0] for row in cur.fetchall()]
+
+        # Silinmiş (soft delete) kayıtlara yazma reddedilir; örneklere alınmaz
+        self.th_nums = column(f"SELECT th_num FROM thesis ORDER BY random() LIMIT {SAMPLE_SIZE}")
+        self.per_ids = column(
+            f"SELECT per_id FROM person WHERE deleted_at IS NULL ORDER BY random() LIMIT {SAMPLE_SIZE}"
+        )
+        self.advisor_ids = column(f"""
+            SELECT S.per_id FROM supervisor S JOIN person P ON P.per_id = S.per_id
+            WHERE P.deleted_at IS NULL ORDER BY random() LIMIT {SAMPLE_SIZE}
+        """)
+        self.uni_ids = column("SELECT uni_id FROM university WHERE deleted_at IS NULL")
+        cur.execute(f"""
+            SELECT I.ins_id, I.uni_id FROM institute I JOIN university U ON U.uni_id = I.uni_id
+            WHERE I.deleted_at IS NULL AND U.deleted_at IS NULL
+            ORDER BY random() LIMIT {SAMPLE_SIZE}
+        """)
+        self.institutes = cur.fetchall()
+        self.topics = column("SELECT DISTINCT topic_name FROM topic LIMIT 200")
+        self.keywords = column("SELECT keyword FROM keyword GROUP BY keyword ORDER BY count(*) DESC LIMIT 200")
+        self.languages = column("SELECT DISTINCT th_language FROM thesis")
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        self.has_trgm = cur.fetchone() is not None
+        # Yazma senaryolarının oluşturduğu kayıtlar (tür -> id'ler); update/delete
+        # bunları kullanır. Tekil ve toplu silme birbirinin kayıtlarını tüketmesin
+        # diye id'ler iki listeye dönüşümlü dağıtılır.
+        self.created = {kind: [] for kind in COLLECTION_URLS}
+        self.bulk_created = {kind: [] for kind in COLLECTION_URLS}
+        # Koşu sonu temizliği silme senaryolarına güvenmez: başarısız silinen
+        # kayıtlar da kalmasın diye oluşturulan her id burada tutulur
+        self.all_created = {kind: [] for kind in COLLECTION_URLS}
+        self.created_lock = threading.Lock()
+        # Import id döndürmez; her import isteğinin tezleri kendi konusuyla
+        # (run_topic + sıra no) bulunup silinir
+        self.run_topic = f"Benchmark {os.getpid()}.{int(time.time())}"
+        self.import_batches = []
+        self.import_topics = []
+        self.import_counter = itertools.count(1)
+
+        if not (self.th_nums and self.per_ids and self.institutes):
+            raise SystemExit("the database is empty; seed it first (--seed)")
+
+    def th_num(self):
+        return random.choice(self.th_nums)
+
+    def per_id(self):
+        return random.choice(self.per_ids)
+
+    def advisor_id(self):
+        return random.choice(self.advisor_ids or self.per_ids)
+
+    def uni_id(self):
+        return random.choice(self.uni_ids)
+
+    def institute(self):
+        return random.choice(self.institutes)
+
+    def topic(self):
+        return random.choice(self.topics or ["Artificial Intelligence"])
+
+    def keyword(self):
+        return random.choice(self.keywords or ["analysis"])
+
+    def language(self):
+        return random.choice(self.languages or ["English"])
+
+    def thesis_body(self):
+        ins_id, uni_id = self.institute()
+        return {
+            "title": f"Benchmark {self.keyword()} {self.keyword()}",
+            "abstract": " ".join(self.keyword() for _ in range(40)),
+            "authorId": self.per_id(),
+            "thesisYear": random.randint(1990, 2024),
+            "thesisType": random.choice(["Master", "PhD"]),
+            "universityId": uni_id,
+            "instituteId": ins_id,
+            "pageCount": random.randint(40, 300),
+            "language": self.language(),
+            "topics": [self.topic()],
+            "keywords": [self.keyword(), self.keyword()],
+            "supervisorIds": [self.advisor_id()],
+        }
+
+    def person_body(self):
+        return {
+            "firstName": "Benchmark",
+            "secondName": f"P{random.randint(0, 10**8)}",
+            "phoneNumber": f"05{random.randint(0, 10**9 - 1):09d}",
+        }
+
+    def university_body(self):
+        return {"universityName": f"Benchmark University {random.randint(0, 10**8)}", "location": "Ankara"}
+
+    def institute_body(self):
+        return {"instituteName": f"Benchmark Institute {random.randint(0, 10**8)}", "universityId": self.uni_id()}
+
+    def import_body(self):
+        # NDJSON; satırlar bu isteğe özel konuyla işaretlenir
+        batch = next(self.import_counter)
+        topic = f"{self.run_topic} {batch}"
+        with self.created_lock:
+            self.import_batches.append(topic)
+            self.import_topics.append(topic)
+        lines = []
+        for _ in range(IMPORT_ROWS):
+            record = self.thesis_body()
+            del record["supervisorIds"]
+            record["topics"].append(topic)
+            lines.append(json.dumps(record))
+        return ("\n".join(lines) + "\n").encode()
+
+    def add_created(self, kind, id_):
+        with self.created_lock:
+            self.all_created[kind].append(id_)
+            single, bulk = self.created[kind], self.bulk_created[kind]
+            (single if len(single) <= len(bulk) else bulk).append(id_)
+
+    def created_id(self, kind="thesis", pop=False):
+        with self.created_lock:
+            ids = self.created[kind]
+            if not ids:
+                return None
+            return ids.pop() if pop else random.choice(ids)
+
+    def created_ids(self, kind, count):
+        # Toplu güncelleme için örnek id'ler (listeden çıkarılmaz)
+        with self.created_lock:
+            ids = self.created[kind]
+            return random.sample(ids, min(count, len(ids)))
+
+    def pop_bulk(self, kind, count=BULK_DELETE_IDS):
+        with self.created_lock:
+            ids = self.bulk_created[kind]
+            taken = ids[-count:]
+            del ids[-count:]
+            return taken
+
+    def pop_import_batch(self):
+        with self.created_lock:
+            return self.import_batches.pop() if self.import_batches else None
+
+    def leftovers(self):
+        # Koşu sonunda silinecekler: tür -> id'ler, import konuları. Silme
+        # senaryolarının sildikleri "not_found" döner.
+        with self.created_lock:
+            return {kind: list(ids) for kind, ids in self.all_created.items()}, list(self.import_topics)
+
+
+# Senaryo: (ad, yazma mı, istek üreten fonksiyon). Fonksiyon (method, url, body) döner;
+# None dönerse istek atlanır (ör. silinecek tez kalmadı)
+def list_scenarios():
+    return [
+        ("theses page", False, lambda s: ("GET", f"/api/theses?limit=50&cursor={s.th_num()}", None)),
+        ("theses filtered", False, lambda s: (
+            "GET", f"/api/theses?limit=50&language={quote(s.language())}&yearFrom={random.randint(1990, 2020)}", None)),
+        ("theses by topic", False, lambda s: ("GET", f"/api/theses?limit=50&topic={quote(s.topic())}", None)),
+        ("theses facets", False, lambda s: (
+            "GET", f"/api/theses?limit=20&facets=all&university={s.uni_id()}", None)),
+        ("theses batch ids", False, lambda s: (
+            "GET", "/api/theses?ids=" + ",".join(str(s.th_num()) for _ in range(20)), None)),
+        ("persons page", False, lambda s: ("GET", f"/api/persons?limit=50&cursor={s.per_id()}", None)),
+        ("universities", False, lambda s: ("GET", "/api/universities", None)),
+        ("institutes page", False, lambda s: ("GET", "/api/institutes?limit=50", None)),
+        ("thesis detail", False, lambda s: ("GET", f"/api/theses/{s.th_num()}", None)),
+        ("thesis advisors", False, lambda s: ("GET", f"/api/theses/{s.th_num()}/supervisors", None)),
+        ("similar theses", False, lambda s: ("GET", f"/api/theses/{s.th_num()}/similar", None)),
+        ("person detail", False, lambda s: ("GET", f"/api/persons/{s.per_id()}", None)),
+        ("person theses", False, lambda s: ("GET", f"/api/persons/{s.per_id()}/theses", None)),
+        ("person supervised", False, lambda s: ("GET", f"/api/persons/{s.advisor_id()}/supervised", None)),
+        ("university detail", False, lambda s: ("GET", f"/api/universities/{s.uni_id()}", None)),
+        ("university institutes", False, lambda s: ("GET", f"/api/universities/{s.uni_id()}/institutes", None)),
+        ("university theses", False, lambda s: ("GET", f"/api/universities/{s.uni_id()}/theses", None)),
+        ("institute detail", False, lambda s: ("GET", f"/api/institutes/{s.institute()[0]}", None)),
+        ("institute theses", False, lambda s: ("GET", f"/api/institutes/{s.institute()[0]}/theses", None)),
+        ("stats", False, lambda s: ("GET", "/api/stats", None)),
+        ("stats topics", False, lambda s: ("GET", "/api/stats/topics", None)),
+        ("bundle", False, lambda s: ("POST", "/api/bundle", {"requests": {
+            "thesis": f"/api/theses/{s.th_num()}",
+            "universities": "/api/universities",
+            "institutes": "/api/institutes?limit=50",
+        }})),
+        ("search title", False, lambda s: ("POST", "/api/search", {"keyword": s.keyword()})),
+        ("search topic", False, lambda s: ("POST", "/api/search", {"keyword": s.topic(), "type": "topic"})),
+        ("search keyword", False, lambda s: ("POST", "/api/search", {"keyword": s.keyword(), "type": "keyword"})),
+        ("search fulltext", False, lambda s: (
+            "POST", "/api/search", {"keyword": f"{s.keyword()} {s.keyword()[:3]}*", "mode": "fulltext"})),
+        ("search fuzzy", False, lambda s: (
+            "POST", "/api/search", {"keyword": s.topic()[:-1], "mode": "fuzzy", "type": "topic"})
+            if s.has_trgm else None),
+        ("topics suggest", False, lambda s: ("GET", f"/api/topics/suggest?q={quote(s.topic()[:3])}", None)
+            if s.has_trgm else None),
+        ("thesis export", False, lambda s: (
+            "GET", f"/api/theses/export?university={s.uni_id()}&yearFrom={random.randint(2000, 2020)}", None)),
+        ("thesis create", True, lambda s: ("POST", "/api/theses", s.thesis_body())),
+        ("thesis update", True, lambda s: (
+            ("PUT", f"/api/theses/{th_num}", s.thesis_body()) if (th_num := s.created_id()) else None)),
+        # Sadece benchmark'ın oluşturduğu tezlere; atamalar tezle birlikte silinir
+        ("advisors assign", True, lambda s: (
+            ("POST", "/api/supervisors", {"assignments": [
+                {"thesisId": s.created_id(), "personId": s.advisor_id(), "role": "cosupervisor"}
+                for _ in range(10)
+            ]}) if s.created_id() else None)),
+        ("theses bulk update", True, lambda s: (
+            ("PATCH", "/api/theses", {
+                "ids": ids,
+                "set": {"pageCount": random.randint(40, 300)},
+                "addKeywords": [s.keyword()],
+            }) if (ids := s.created_ids("thesis", 10)) else None)),
+        ("thesis import", True, lambda s: ("POST", "/api/theses/import?format=ndjson", s.import_body())),
+        ("person create", True, lambda s: ("POST", "/api/persons", s.person_body())),
+        ("person update", True, lambda s: (
+            ("PUT", f"/api/persons/{per_id}", s.person_body()) if (per_id := s.created_id("person")) else None)),
+        ("university create", True, lambda s: ("POST", "/api/universities", s.university_body())),
+        ("university update", True, lambda s: (
+            ("PUT", f"/api/universities/{uni_id}", s.university_body())
+            if (uni_id := s.created_id("university")) else None)),
+        ("institute create", True, lambda s: ("POST", "/api/institutes", s.institute_body())),
+        ("institute update", True, lambda s: (
+            ("PUT", f"/api/institutes/{ins_id}", s.institute_body())
+            if (ins_id := s.created_id("institute")) else None)),
+        ("thesis delete", True, lambda s: (
+            ("DELETE", f"/api/theses/{th_num}", None) if (th_num := s.created_id(pop=True)) else None)),
+        # Filtreyle: bir import isteğinin tezleri
+        ("theses bulk delete", True, lambda s: (
+            ("DELETE", "/api/theses", {"filter": {"topic": [topic]}}) if (topic := s.pop_import_batch()) else None)),
+        ("person delete", True, lambda s: (
+            ("DELETE", f"/api/persons/{per_id}", None) if (per_id := s.created_id("person", pop=True)) else None)),
+        ("persons bulk delete", True, lambda s: (
+            ("DELETE", "/api/persons", {"ids": ids}) if (ids := s.pop_bulk("person")) else None)),
+        ("institute delete", True, lambda s: (
+            ("DELETE", f"/api/institutes/{ins_id}", None)
+            if (ins_id := s.created_id("institute", pop=True)) else None)),
+        ("institutes bulk delete", True, lambda s: (
+            ("DELETE", "/api/institutes", {"ids": ids}) if (ids := s.pop_bulk("institute")) else None)),
+        ("university delete", True, lambda s: (
+            ("DELETE", f"/api/universities/{uni_id}", None)
+            if (uni_id := s.created_id("university", pop=True)) else None)),
+        ("universities bulk delete", True, lambda s: (
+            ("DELETE", "/api/universities", {"ids": ids}) if (ids := s.pop_bulk("university")) else None)),
+    ]
+
+
+# bytes gövde (import) NDJSON olarak, diğerleri JSON olarak gönderilir
+class LocalClient:
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, url, body):
+        if isinstance(body, bytes):
+            response = self._client.open(url, method=method, data=body, content_type="application/x-ndjson")
+        else:
+            response = self._client.open(url, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    # Thread başına tek keep-alive bağlantı
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self._connection_args = (parts.hostname, parts.port or 80)
+        self._prefix = parts.path.rstrip("/")
+        self._conn = None
+
+    def request(self, method, url, body):
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(*self._connection_args, timeout=60)
+        if isinstance(body, bytes):
+            payload, headers = body, {"Content-Type": "application/x-ndjson"}
+        elif body is not None:
+            payload, headers = json.dumps(body), {"Content-Type": "application/json"}
+        else:
+            payload, headers = None, {}
+        try:
+            self._conn.request(method, self._prefix + url, body=payload, headers=headers)
+            response = self._conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self._conn.close()
+            self._conn = None
+            raise
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+def delete_created(client, samples, batch=1000, out=print):
+    # Yazma senaryolarının geride bıraktığı kayıtlar toplu silme ile temizlenir.
+    # Tezler önce: benchmark kişi/üniversite/enstitüleri tezlerde kullanılmaz ama
+    # restrict modunda bağlı kaydı olan silinmez.
+    def delete(url, bodies):
+        failed = 0
+        for body in bodies:
+            try:
+                status, data = client.request("DELETE", url, body)
+            except Exception:
+                status, data = None, None
+            if status != 200:
+                failed += len(body.get("ids") or body["filter"]["topic"])
+                continue
+            failed += sum(1 for r in data["results"] if r["status"] not in ("deleted", "not_found"))
+        return failed
+
+    failed = 0
+    leftovers, topics = samples.leftovers()
+    # Konu başına en fazla IMPORT_ROWS tez; filtre BULK_MAX_IDS'i aşmasın
+    failed += delete("/api/theses", (
+        {"filter": {"topic": topics[start:start + 100]}} for start in range(0, len(topics), 100)
+    ))
+    for kind, ids in leftovers.items():
+        failed += delete(COLLECTION_URLS[kind], (
+            {"ids": ids[start:start + batch]} for start in range(0, len(ids), batch)
+        ))
+    if failed:
+        out(f"could not delete {failed} benchmark records (run topic {samples.run_topic!r})")
+    return failed
+
+
+def percentile(sorted_values, p):
+    # En yakın sıra yöntemi
+    if not sorted_values:
+        return 0.0
+    index = math.ceil(p / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(index, len(sorted_values) - 1))]
+
+
+def run_scenario(samples, make_request, make_client, requests, concurrency):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal errors
+        client = make_client()
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            spec = make_request(samples)
+            if spec is None:
+                continue
+            method, url, body = spec
+            started = time.perf_counter()
+            try:
+                status, data = client.request(method, url, body)
+            except Exception:
+                status, data = None, None
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if status is None or status >= 400:
+                    errors += 1
+            if method == "POST" and status == 201 and url in CREATED_KINDS:
+                samples.add_created(CREATED_KINDS[url], data["id"])
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        "p50": round(percentile(latencies, 50) * 1000, 2),
+        "p95": round(percentile(latencies, 95) * 1000, 2),
+        "p99": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def compare(results, baseline, max_regression, out=print):
+    # Her iki koşuda da olan senaryoların p95'i karşılaştırılır
+    failures = 0
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("p95") or not result["requests"]:
+            continue
+        change = result["p95"] / before["p95"] - 1
+        if change > max_regression:
+            failures += 1
+            out(f"REGRESSION {name}: p95 {before['p95']} ms -> {result['p95']} ms ({change:+.0%})")
+    return failures
+
+
+def time_best(func, rounds):
+    # En iyi tur: GC ve diğer yük gürültüsünü azaltır
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_serializers(rows=5000, details=500, rounds=5, out=print):
+    # Aynı veriyi her JSON backend'i ve şekli ile kodlar; veritabanı süresi hariç
+    # (encode) ve dahil (fetch + encode) ayrı raporlanır
+    from psycopg2.extras import RealDictCursor
+
+    from app import THESIS_LIST_COLUMNS, THESIS_LIST_JOINS, app, fetch_thesis_details
+    from serializers import create_json_provider, orjson
+
+    fields = list(THESIS_LIST_COLUMNS)
+    select_sql = ", ".join(f'{THESIS_LIST_COLUMNS[f]} AS "{f}"' for f in fields)
+    join_sql = " ".join(dict.fromkeys(THESIS_LIST_JOINS.values()))
+    list_query = f"SELECT {select_sql} FROM thesis T {join_sql} ORDER BY T.th_num LIMIT %s"
+
+    conn = db.connect()
+    try:
+        def fetch_dicts():
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(list_query, (rows,))
+                return cur.fetchall()
+
+        def fetch_tuples():
+            with conn.cursor() as cur:
+                cur.execute(list_query, (rows,))
+                return cur.fetchall()
+
+        dict_rows = fetch_dicts()
+        tuple_rows = fetch_tuples()
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT th_num FROM thesis ORDER BY th_num LIMIT %s", (details,))
+            detail_rows = fetch_thesis_details(cur, [r["th_num"] for r in cur.fetchall()])
+
+        backends = ["stdlib"] + (["orjson"] if orjson is not None else [])
+        out(f"{'case':<36} {'encode ms':>10} {'fetch+encode ms':>16} {'KiB':>8}")
+        with app.app_context():
+            for backend in backends:
+                provider = create_json_provider(app, backend)
+                cases = [
+                    (f"{backend} list objects ({len(dict_rows)})",
+                     lambda: provider.response(dict_rows),
+                     lambda: provider.response(fetch_dicts())),
+                    (f"{backend} list columns ({len(tuple_rows)})",
+                     lambda: provider.response({"columns": fields, "rows": tuple_rows}),
+                     lambda: provider.response({"columns": fields, "rows": fetch_tuples()})),
+                    (f"{backend} details ({len(detail_rows)})",
+                     lambda: provider.response(detail_rows),
+                     None),
+                ]
+                for name, encode, fetch_encode in cases:
+                    size = len(encode().get_data()) / 1024
+                    encode_ms = time_best(encode, rounds) * 1000
+                    total = f"{time_best(fetch_encode, rounds) * 1000:.2f}" if fetch_encode else "-"
+                    out(f"{name:<36} {encode_ms:>10.2f} {total:>16} {size:>8.0f}")
+        conn.rollback()
+    finally:
+        conn.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the GTS API and report latency percentiles")
+    parser.add_argument("--seed", type=int, metavar="THESES",
+                        help="seed this many synthetic theses first (scratch databases only)")
+    parser.add_argument("--skew", type=float, default=2.0,
+                        help="institute size skew for --seed (see seed.py, default 2)")
+    parser.add_argument("--migrate", action="store_true",
+                        help="apply pending migrations first (always done with --seed)")
+    parser.add_argument("--url", help="benchmark a running server instead of an in-process client")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--only", help="comma-separated scenario names (or name prefixes) to run")
+    parser.add_argument("--writes", action="store_true",
+                        help="also run the scenarios that write (scratch databases only)")
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="fail if p95 regressed against a saved run")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed p95 increase for --compare (default 0.25 = 25%%)")
+    parser.add_argument("--serializers", action="store_true",
+                        help="only compare the JSON backends (JSON_BACKEND) on real rows and exit")
+    args = parser.parse_args(argv)
+
+    if args.serializers:
+        return bench_serializers()
+
+    conn = db.connect()
+    try:
+        if args.migrate or args.seed:
+            migrate_up(conn)
+        if args.seed:
+            seed(conn, theses=args.seed, skew=args.skew)
+        cur = conn.cursor()
+        samples = Samples(cur)
+        cur.close()
+        conn.rollback()
+    finally:
+        conn.close()
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        from app import app
+        make_client = lambda: LocalClient(app)
+
+    scenarios = list_scenarios()
+    if not args.writes:
+        scenarios = [s for s in scenarios if not s[1]]
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(",") if w.strip()]
+        scenarios = [s for s in scenarios if any(s[0].startswith(w) for w in wanted)]
+
+    print(f"{'scenario':<24} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    results = {}
+    for name, _writes, make_request in scenarios:
+        result = run_scenario(samples, make_request, make_client, args.requests, args.concurrency)
+        if not result["requests"]:
+            continue
+        results[name] = result
+        print(f"{name:<24} {result['requests']:>8} {result['errors']:>6} {result['rps']:>8} "
+              f"{result['p50']:>8} {result['p95']:>8} {result['p99']:>8}")
+
+    leftover = delete_created(make_client(), samples) if args.writes else 0
+
+    if not args.url:
+        db.close_pool()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failures = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failures = compare(results, json.load(f), args.max_regression)
+        print(f"{len(results)} scenarios compared, {failures} regression(s)")
+    return 1 if failures or leftover else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # sadece CACHE_BACKEND=redis için gerekli
+    redis = None
+
+# CACHE CONFIG
+# memory: süreç içi LRU (tek süreçli kurulumlar için); redis: süreçler arası paylaşılır; none: kapalı
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "gts:cache:")
+
+# Geçersiz kılma tag'ler üzerinden yapılır: her kayıt, yazıldığı andaki tag
+# versiyonlarını saklar; invalidate() versiyonu artırır ve eski kayıtlar okunurken
+# düşer. epoch her invalidate'te artar; cevap hesaplanırken bir invalidate olduysa
+# kayıt hiç yazılmaz (okuma/yazma yarışında eski veri cache'e girmesin diye).
+# invalidated_within(): son invalidate'ten beri geçen süre; replica'dan okunan bir
+# cevap, replica yazmayı henüz görmemiş olabileceği için bu pencerede yazılmaz.
+
+
+class MemoryCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, tags, versions)
+        self._versions = {}
+        self._epoch = 0
+        self._invalidated_at = 0.0
+        self._hits = 0
+        self._misses = 0
+
+    def epoch(self):
+        with self._lock:
+            return self._epoch
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, tags, versions = entry
+                current = tuple(self._versions.get(tag, 0) for tag in tags)
+                if expires_at > time.monotonic() and versions == current:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def set(self, key, value, tags, epoch, ttl=None):
+        with self._lock:
+            if epoch != self._epoch:
+                return False
+            versions = tuple(self._versions.get(tag, 0) for tag in tags)
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (value, expires_at, tuple(tags), versions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, tags):
+        with self._lock:
+            self._epoch += 1
+            self._invalidated_at = time.time()
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def invalidated_within(self, seconds):
+        with self._lock:
+            return time.time() - self._invalidated_at < seconds
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+class RedisCache:
+    # Boyut sınırı Redis'in maxmemory/eviction ayarına bırakılır
+    def __init__(self, url=CACHE_REDIS_URL, ttl=CACHE_TTL, prefix=CACHE_PREFIX):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._hits = 0
+        self._misses = 0
+
+    def _tag_keys(self, tags):
+        return [f"{self.prefix}tag:{tag}" for tag in tags]
+
+    def _versions(self, tags):
+        if not tags:
+            return ()
+        return tuple(int(v or 0) for v in self._client.mget(self._tag_keys(tags)))
+
+    def epoch(self):
+        return int(self._client.get(f"{self.prefix}epoch") or 0)
+
+    def get(self, key):
+        raw = self._client.get(f"{self.prefix}entry:{key}")
+        if raw is not None:
+            value, tags, versions = pickle.loads(raw)
+            if self._versions(tags) == versions:
+                self._hits += 1
+                return value
+        self._misses += 1
+        return None
+
+    def set(self, key, value, tags, epoch, ttl=None):
+        if epoch != self.epoch():
+            return False
+        payload = pickle.dumps((value, tuple(tags), self._versions(tags)))
+        ttl = self.ttl if ttl is None else ttl
+        self._client.set(f"{self.prefix}entry:{key}", payload, px=max(int(ttl * 1000), 1))
+        return True
+
+    def invalidate(self, tags):
+        pipe = self._client.pipeline()
+        pipe.incr(f"{self.prefix}epoch")
+        pipe.set(f"{self.prefix}invalidated_at", repr(time.time()))
+        for tag_key in self._tag_keys(tags):
+            pipe.incr(tag_key)
+        pipe.execute()
+
+    def invalidated_within(self, seconds):
+        # Süreçler arası karşılaştırıldığı için duvar saati kullanılır
+        invalidated_at = float(self._client.get(f"{self.prefix}invalidated_at") or 0)
+        return time.time() - invalidated_at < seconds
+
+    def clear(self):
+        self._client.incr(f"{self.prefix}epoch")
+        for key in self._client.scan_iter(f"{self.prefix}entry:*"):
+            self._client.delete(key)
+
+    def stats(self):
+        return {
+            "backend": "redis",
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # Worker süreçleri boş bir cache ve yeni Redis bağlantısı ile başlar
+    global _cache, _cache_lock
+    _cache = None
+    _cache_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def create_cache(backend=CACHE_BACKEND):
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "redis":
+        return RedisCache()
+    if backend in ("none", "off", ""):
+        return None
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache() or False
+    return _cache or None
+
+
+def set_cache(cache):
+    global _cache
+    with _cache_lock:
+        _cache = cache or False
@@ -0,0 +1,534 @@
+import itertools
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+import metrics
+
+# DB CONFIG
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_NAME = os.getenv("DB_NAME", "gtsdb")
+DB_PORT = int(os.getenv("DB_PORT", "5432"))
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+
+# POOL CONFIG
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Havuz doluysa bir bağlantı için en fazla bu kadar saniye beklenir
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# Bu kadar saniye boşta kalan bağlantı verilmeden önce SELECT 1 ile kontrol edilir
+DB_POOL_CHECK_IDLE = float(os.getenv("DB_POOL_CHECK_IDLE", "30"))
+# Bu kadar saniyeden eski bağlantılar kapatılıp yenisi açılır (0 = sınırsız)
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+# Tek bir SQL statement'ın çalışabileceği en uzun süre, milisaniye (0 = sınırsız)
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
+
+# READ REPLICA CONFIG
+# Virgülle ayrılmış replica listesi; her eleman "host", "host:port" ya da tam bir
+# DSN ("host=... port=5433" / "postgresql://...") olabilir. Verilmeyen alanlar
+# DB_* ayarlarından gelir. Boşsa tüm istekler DB_HOST'a gider.
+DB_REPLICAS = [spec.strip() for spec in os.getenv("DB_REPLICAS", "").split(",") if spec.strip()]
+# round_robin: sırayla; least_busy: havuzunda en az bağlantısı kullanımda olan
+DB_REPLICA_SELECTION = os.getenv("DB_REPLICA_SELECTION", "round_robin").lower()
+DB_REPLICA_POOL_MAX = int(os.getenv("DB_REPLICA_POOL_MAX", str(DB_POOL_MAX)))
+# Replikasyon gecikmesi bu kadar saniyeyi aşan replica'ya okuma gönderilmez
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+# Gecikme kontrolü her replica için en fazla bu sıklıkla yapılır (saniye)
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+# Bağlanılamayan replica bu kadar saniye boyunca atlanır
+DB_REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", "10"))
+# Havuzu dolu replica'dan bağlantı için beklenecek süre (saniye); dolmuşsa sıradaki
+# replica'ya, o da yoksa primary'ye geçilir. 0: hiç beklenmez
+DB_REPLICA_POOL_TIMEOUT = float(os.getenv("DB_REPLICA_POOL_TIMEOUT", "0"))
+# Rotasyondaki bir replica'nın en fazla geride olabileceği süre: gecikme ancak
+# kontrol aralığında bir ölçülür, iki ölçüm arasında max_lag'i aşmış olabilir
+DB_REPLICA_STALE_WINDOW = DB_REPLICA_MAX_LAG + DB_REPLICA_CHECK_INTERVAL
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def connect(**params):
+    # params DB_* ayarlarını ezer (replica bağlantıları, bkz. replica_params)
+    params = {
+        "host": DB_HOST,
+        "dbname": DB_NAME,
+        "port": DB_PORT,
+        "user": DB_USER,
+        "password": DB_PASSWORD,
+        "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}" if DB_STATEMENT_TIMEOUT else None,
+        **params,
+    }
+    started = time.perf_counter()
+    conn = psycopg2.connect(
+        # Metrics/profiling açıksa her statement'ın süresi ve satır sayısı ölçülür
+        connection_factory=metrics.InstrumentedConnection if metrics.statement_observers else None,
+        **params,
+    )
+    if metrics.METRICS_ENABLED:
+        metrics.POOL_CONNECT.observe(time.perf_counter() - started)
+    return conn
+
+
+class PooledConnection:
+    # psycopg2 bağlantısını sarar; close() bağlantıyı kapatmak yerine havuza geri verir.
+    # Böylece route'lardaki conn.close() çağrıları aynen çalışmaya devam eder.
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.putconn(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        self._raw.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw.__exit__(exc_type, exc, tb)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        minconn=DB_POOL_MIN,
+        maxconn=DB_POOL_MAX,
+        timeout=DB_POOL_TIMEOUT,
+        check_idle=DB_POOL_CHECK_IDLE,
+        max_lifetime=DB_POOL_MAX_LIFETIME,
+        connect=connect,
+    ):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError("Invalid pool size")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_lifetime = max_lifetime
+        self._connect = connect
+        self._cond = threading.Condition()
+        self._idle = []  # (conn, created_at, released_at)
+        self._created_at = {}  # id(conn) -> created_at
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "stale_discarded": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+        for _ in range(minconn):
+            conn = self._open()
+            self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+
+    def _open(self):
+        conn = self._connect()
+        self._created_at[id(conn)] = time.monotonic()
+        self._size += 1
+        self._stats["connections_opened"] += 1
+        return conn
+
+    # Sayaçlar kilit altında güncellenir; bağlantının kapatılması (_close) kilit
+    # dışında yapılır ki ağ I/O'su diğer thread'leri bekletmesin
+    def _forget(self, conn):
+        self._created_at.pop(id(conn), None)
+        self._size -= 1
+        self._stats["connections_closed"] += 1
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn, created_at, released_at):
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - released_at > self.check_idle:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT 1;")
+                cur.close()
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _reserve(self, timeout, deadline):
+        # Kilit altında ya bir idle bağlantı alır ya da yeni bağlantı için yer ayırır
+        # (None); ikisi de yoksa deadline'a kadar bekler
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.maxconn:
+                    # Yer ayrılır, bağlantı kilit dışında açılır
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    if metrics.METRICS_ENABLED:
+                        metrics.POOL_TIMEOUTS.inc()
+                    raise PoolTimeout(
+                        f"No database connection available within {timeout:g}s"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            idle = self._reserve(timeout, deadline)
+            if idle is None:
+                conn = None
+                break
+            # Idle'dan alınan bağlantı artık bu thread'in; SELECT 1 kilit dışında
+            conn, created_at, released_at = idle
+            if self._is_usable(conn, created_at, released_at):
+                break
+            with self._cond:
+                self._stats["stale_discarded"] += 1
+                self._forget(conn)
+                self._cond.notify()
+            self._close(conn)
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created_at[id(conn)] = time.monotonic()
+                self._stats["connections_opened"] += 1
+
+        with self._cond:
+            waited = time.monotonic() - started
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+        if metrics.METRICS_ENABLED:
+            metrics.POOL_ACQUIRE.observe(waited)
+
+        return PooledConnection(self, conn)
+
+    def putconn(self, conn):
+        if isinstance(conn, PooledConnection):
+            conn.close()
+            return
+        with self._cond:
+            if id(conn) not in self._created_at:
+                return
+        # Okuma route'ları commit etmez; açık kalan transaction'ı geri al. Bağlantı
+        # hâlâ çağıranın, rollback kilit dışında yapılır
+        if not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                self._close(conn)
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    self._close(conn)
+        with self._cond:
+            discard = conn.closed or self._closed
+            if discard:
+                self._forget(conn)
+            else:
+                self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self._close(conn)
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for conn, _, _ in idle:
+                self._forget(conn)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": self._size,
+                "idle": len(self._idle),
+                "inUse": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "connectionsOpened": self._stats["connections_opened"],
+                "connectionsClosed": self._stats["connections_closed"],
+                "checkouts": checkouts,
+                "timeouts": self._stats["timeouts"],
+                "staleDiscarded": self._stats["stale_discarded"],
+                "waitTimeAvgMs": round(
+                    self._stats["wait_time_total"] * 1000 / checkouts, 3
+                ) if checkouts else 0.0,
+                "waitTimeMaxMs": round(self._stats["wait_time_max"] * 1000, 3),
+            }
+
+
+# Replica'nın primary'nin ne kadar gerisinde olduğu (saniye). Replay edilecek WAL
+# yoksa gecikme 0'dır; primary uzun süre yazmasa da son replay zamanı eskimiş görünmez.
+# Recovery'de olmayan bir sunucu (ör. lokal test için ikinci bir instance) için 0 döner.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_params(spec):
+    if "=" in spec or "://" in spec:
+        return extensions.parse_dsn(spec)
+    host, _, port = spec.partition(":")
+    return {"host": host, "port": int(port)} if port else {"host": host}
+
+
+def replica_name(params):
+    # Parola stats'ta görünmesin diye isim host:port'tan üretilir
+    return f"{params.get('host', DB_HOST)}:{params.get('port', DB_PORT)}"
+
+
+class Replica:
+    def __init__(self, spec, maxconn=DB_REPLICA_POOL_MAX):
+        params = replica_params(spec)
+        self.name = replica_name(params)
+        # minconn=0: açılışta kapalı olan bir replica uygulamayı başlatmaya engel olmaz
+        self.pool = ConnectionPool(minconn=0, maxconn=maxconn, connect=lambda: connect(**params))
+        self.unavailable_until = 0.0
+        self.checked_at = 0.0
+        self.lag = None
+        self.error = None
+
+    def busy(self):
+        stats = self.pool.stats()
+        return stats["inUse"] + stats["waiting"]
+
+    def stats(self, now):
+        return {
+            "name": self.name,
+            "available": self.unavailable_until <= now,
+            "lagSeconds": round(self.lag, 3) if self.lag is not None else None,
+            "error": self.error,
+            "pool": self.pool.stats(),
+        }
+
+
+class ReplicaSet:
+    # Okuma bağlantılarını sağlıklı replica'lar arasında dağıtır. getconn() uygun
+    # replica yoksa (None, None) döner; çağıran primary havuzuna düşer.
+
+    def __init__(
+        self,
+        specs,
+        selection=DB_REPLICA_SELECTION,
+        max_lag=DB_REPLICA_MAX_LAG,
+        check_interval=DB_REPLICA_CHECK_INTERVAL,
+        retry_after=DB_REPLICA_RETRY_AFTER,
+        maxconn=DB_REPLICA_POOL_MAX,
+        pool_timeout=DB_REPLICA_POOL_TIMEOUT,
+        replica=Replica,
+    ):
+        if selection not in ("round_robin", "least_busy"):
+            raise ValueError(f"Unknown DB_REPLICA_SELECTION: {selection}")
+        if not specs:
+            raise ValueError("At least one replica is required")
+        self.selection = selection
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.pool_timeout = pool_timeout
+        # replica: havuzu kuran sınıf (asgi.py async havuzlu bir tane verir)
+        self.replicas = [replica(spec, maxconn) for spec in specs]
+        self._next = itertools.count()
+
+    def _candidates(self, preferred):
+        now = time.monotonic()
+        # Sırayla dönülür; least_busy'de eşitlikler de böylece dağılır
+        start = next(self._next) % len(self.replicas)
+        candidates = [
+            replica for replica in self.replicas[start:] + self.replicas[:start]
+            if replica.unavailable_until <= now
+        ]
+        if self.selection == "least_busy":
+            candidates.sort(key=lambda replica: replica.busy())
+        # Aynı istekteki sonraki sorgular aynı replica'yı okur (ETag ile veri tutarlı kalsın)
+        if preferred in candidates:
+            candidates.remove(preferred)
+            candidates.insert(0, preferred)
+        return candidates
+
+    def _mark_unavailable(self, replica, error, seconds):
+        replica.unavailable_until = time.monotonic() + seconds
+        replica.error = error
+
+    def _lag_due(self, replica):
+        # Gecikme en fazla check_interval'da bir ölçülür; arada son ölçüm geçerlidir
+        now = time.monotonic()
+        if now - replica.checked_at < self.check_interval:
+            return False
+        replica.checked_at = now
+        return True
+
+    def _accept_lag(self, replica, lag):
+        replica.lag = lag
+        if lag > self.max_lag:
+            self._mark_unavailable(replica, f"Replication lag {lag:.1f}s", self.check_interval)
+            return False
+        replica.error = None
+        return True
+
+    def _check(self, replica, conn):
+        if not self._lag_due(replica):
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute(REPLICA_LAG_SQL)
+            lag = float(cur.fetchone()[0])
+            cur.close()
+            conn.rollback()
+        except psycopg2.Error as exc:
+            self._mark_unavailable(replica, str(exc).strip(), self.retry_after)
+            return False
+        return self._accept_lag(replica, lag)
+
+    def getconn(self, preferred=None):
+        for replica in self._candidates(preferred):
+            try:
+                conn = replica.pool.getconn(self.pool_timeout)
+            except PoolTimeout:
+                # Replica sağlıklı ama meşgul; işaretlenmeden sıradakine geçilir
+                continue
+            except psycopg2.OperationalError as exc:
+                self._mark_unavailable(replica, str(exc).strip(), self.retry_after)
+                continue
+            if not self._check(replica, conn):
+                conn.close()
+                continue
+            return replica, conn
+        return None, None
+
+    def closeall(self):
+        for replica in self.replicas:
+            replica.pool.closeall()
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            "selection": self.selection,
+            "maxLagSeconds": self.max_lag,
+            "replicas": [replica.stats(now) for replica in self.replicas],
+        }
+
+
+_pool = None
+_replicas = None
+_pool_lock = threading.Lock()
+# Fork öncesinden kalan havuzlar; child'da kapatılırsa ebeveynin oturumları da
+# sonlanır, bu yüzden sadece referansı tutulur
+_inherited_pools = []
+
+
+def _reset_after_fork():
+    # Her worker süreci kendi havuzunu açar (bkz. gunicorn.conf.py)
+    global _pool, _replicas, _pool_lock
+    if _pool is not None:
+        _inherited_pools.append(_pool)
+    if _replicas is not None:
+        _inherited_pools.append(_replicas)
+    _pool = None
+    _replicas = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def set_pool(pool):
+    # Testler/araçlar için havuzu değiştirir; eskisi kapatılır
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool = pool
+
+
+def get_replicas():
+    # DB_REPLICAS boşsa None
+    global _replicas
+    if _replicas is None and DB_REPLICAS:
+        with _pool_lock:
+            if _replicas is None:
+                _replicas = ReplicaSet(DB_REPLICAS)
+    return _replicas
+
+
+def set_replicas(replicas):
+    global _replicas
+    with _pool_lock:
+        if _replicas is not None:
+            _replicas.closeall()
+        _replicas = replicas
+
+
+def close_pool():
+    global _pool, _replicas
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+        if _replicas is not None:
+            _replicas.closeall()
+            _replicas = None
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+
+# Production sunucu ayarları; GTS klasöründe sadece `gunicorn` ile çalıştırılır.
+#
+#   gunicorn                     # Flask (WSGI), thread'li worker'lar
+#   SERVER_MODE=asgi gunicorn    # asgi.py, uvicorn worker'ları
+#
+# kill -HUP <master pid>   yeni worker'ları başlatır, eskileri işlerini bitirip kapanır
+# kill -TERM <master pid>  yeni istek almaz, devam edenleri SERVER_GRACEFUL_TIMEOUT kadar bekler
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").lower()
+
+bind = os.getenv("SERVER_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("SERVER_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+# memory cache süreç içidir: bir worker'daki invalidate diğerlerine ulaşmaz ve
+# onlar eski cevabı yeni ETag ile döner. Birden fazla worker redis ya da none ister.
+# CACHE_BACKEND verilmemişse cache kapatılır: worker'lar cache.py'yi fork'tan sonra
+# bu ortamla yükler (bu yüzden burada cache import edilmez). Açıkça memory
+# verilmişse başlatılmaz.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "").lower()
+cache_defaulted_to_none = False
+if workers > 1:
+    if CACHE_BACKEND == "memory":
+        raise ValueError(
+            "CACHE_BACKEND=memory is per process; use CACHE_BACKEND=redis or none "
+            "with more than one worker (or SERVER_WORKERS=1)"
+        )
+    if not CACHE_BACKEND:
+        os.environ["CACHE_BACKEND"] = "none"
+        cache_defaulted_to_none = True
+# Her worker'ın havuzu (DB_POOL_MAX) en az thread sayısı kadar olmalı;
+# toplam bağlantı = workers * DB_POOL_MAX
+threads = int(os.getenv("SERVER_THREADS", "4"))
+# Bu kadar saniye cevap vermeyen worker yeniden başlatılır
+timeout = int(os.getenv("SERVER_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("SERVER_KEEPALIVE", "5"))
+# Bellek sızıntılarına karşı worker'lar bu kadar istekten sonra yenilenir (0 = kapalı)
+max_requests = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "asgi:app"
+    worker_class = "uvicorn_worker.UvicornWorker"
+elif SERVER_MODE == "wsgi":
+    wsgi_app = "app:app"
+    worker_class = "gthread"
+else:
+    raise ValueError(f"Unknown SERVER_MODE: {SERVER_MODE}")
+
+# Uygulama her worker'da fork'tan sonra yüklenir; havuzlar ve cache böylece
+# süreçler arasında paylaşılmaz ve SIGHUP kodu da yeniden yükler
+preload_app = False
+
+accesslog = os.getenv("SERVER_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("SERVER_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    if cache_defaulted_to_none:
+        server.log.warning(
+            "CACHE_BACKEND is not set; response cache disabled for %d workers "
+            "(set CACHE_BACKEND=redis to share it)", workers
+        )
+
+
+def worker_exit(server, worker):
+    # Worker kapanırken havuzdaki bağlantılar düzgünce kapatılır
+    import db
+
+    db.close_pool()
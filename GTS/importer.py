@@ -0,0 +1,447 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date
+
+from db import connect
+
+# Toplu tez yükleme: NDJSON veya CSV satırları doğrulanır, COPY ile geçici bir
+# staging tablosuna akıtılır; yazar/üniversite/enstitü eşleştirmesi ve insert'ler
+# set-based SQL ile tek transaction'da yapılır. Hatalı satırlar raporlanır,
+# geçerli satırlar yüklenir.
+#
+#   python importer.py theses.ndjson
+#   python importer.py theses.csv --format csv --dry-run
+#
+# Alanlar (API ile aynı isimler): title, abstract, thesisType, language, pageCount,
+# thesisYear, submissionDate, authorId veya authorFirstName + authorSecondName,
+# universityId veya universityName, instituteId veya instituteName, topics, keywords.
+# CSV'de topics/keywords ";" ile ayrılır.
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_MAX_ERRORS = 1000
+
+STAGE_COLUMNS = [
+    "row_num", "title", "abstract", "author_id", "author_first", "author_second",
+    "th_year", "th_type", "uni_id", "university_name", "ins_id", "institute_name",
+    "page_num", "th_language", "submission_date", "topics", "keywords",
+]
+
+# Şemadaki varchar sınırları
+MAX_LENGTHS = {
+    "title": 500,
+    "abstract": 5000,
+    "thesisType": 30,
+    "language": 20,
+    "authorFirstName": 20,
+    "authorSecondName": 15,
+    "universityName": 100,
+    "instituteName": 100,
+}
+TOPIC_MAX_LENGTH = 100
+KEYWORD_MAX_LENGTH = 500
+# Staging kolonları integer/date; aralık dışı değerler COPY'yi (tüm import'u)
+# düşürmesin diye satır hatası olarak raporlanır
+INT4_MIN, INT4_MAX = -2**31, 2**31 - 1
+THESIS_YEAR_RANGE = (1, 9999)
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+class ImportRowError(Exception):
+    pass
+
+
+def read_records(stream, fmt):
+    # (satır no, dict) üretir; bozuk satırlar dict yerine ImportRowError taşır
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            return
+        for row_num, row in enumerate(reader, start=1):
+            yield row_num, row
+    elif fmt == "ndjson":
+        row_num = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row_num += 1
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row_num, ImportRowError(f"Invalid JSON: {exc}")
+                continue
+            if not isinstance(record, dict):
+                yield row_num, ImportRowError("Each line must be a JSON object")
+                continue
+            yield row_num, record
+    else:
+        raise ImportFormatError(f"Unsupported format: {fmt}")
+
+
+def _text(record, key, required=False):
+    value = str(record.get(key) or "").strip()
+    if required and not value:
+        raise ImportRowError(f"Missing {key}")
+    if key in MAX_LENGTHS and len(value) > MAX_LENGTHS[key]:
+        raise ImportRowError(f"{key} is longer than {MAX_LENGTHS[key]} characters")
+    return value or None
+
+
+def _int(record, key, required=False, minimum=INT4_MIN, maximum=INT4_MAX):
+    value = record.get(key)
+    if value in (None, ""):
+        if required:
+            raise ImportRowError(f"Missing {key}")
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"Invalid {key}")
+    if not minimum <= value <= maximum:
+        raise ImportRowError(f"{key} must be between {minimum} and {maximum}")
+    return value
+
+
+def _terms(record, key, max_length):
+    value = record.get(key) or []
+    if isinstance(value, str):
+        value = value.split(";")
+    if not isinstance(value, list):
+        raise ImportRowError(f"Invalid {key}")
+    terms = list(dict.fromkeys(str(v).strip() for v in value if str(v).strip()))
+    for term in terms:
+        if len(term) > max_length:
+            raise ImportRowError(f"{key} entries must be at most {max_length} characters")
+    return terms
+
+
+def _array_literal(values):
+    # text[] literal; COPY CSV içinde tek alan olarak yazılır
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'"{v}"' for v in escaped) + "}"
+
+
+def normalize_record(row_num, record):
+    title = _text(record, "title", required=True)
+    abstract = _text(record, "abstract", required=True)
+    thesis_type = _text(record, "thesisType", required=True)
+    language = _text(record, "language", required=True)
+    page_count = _int(record, "pageCount", required=True, minimum=1)
+
+    thesis_year = _int(record, "thesisYear", minimum=THESIS_YEAR_RANGE[0],
+                       maximum=THESIS_YEAR_RANGE[1])
+    # Dört hane: "5-01-01" date olarak okunmaz
+    th_year = f"{thesis_year:04d}-01-01" if thesis_year else None
+
+    submission_date = _text(record, "submissionDate")
+    if submission_date:
+        try:
+            submission_date = date.fromisoformat(submission_date).isoformat()
+        except ValueError:
+            raise ImportRowError("Invalid submissionDate")
+
+    author_id = _int(record, "authorId")
+    author_first = _text(record, "authorFirstName")
+    author_second = _text(record, "authorSecondName")
+    if author_id is None and not (author_first and author_second):
+        raise ImportRowError("Missing authorId or authorFirstName/authorSecondName")
+
+    uni_id = _int(record, "universityId")
+    university_name = _text(record, "universityName")
+    if uni_id is None and not university_name:
+        raise ImportRowError("Missing universityId or universityName")
+
+    ins_id = _int(record, "instituteId")
+    institute_name = _text(record, "instituteName")
+    if ins_id is None and not institute_name:
+        raise ImportRowError("Missing instituteId or instituteName")
+
+    topics = _terms(record, "topics", TOPIC_MAX_LENGTH)
+    keywords = _terms(record, "keywords", KEYWORD_MAX_LENGTH)
+
+    return [
+        row_num, title, abstract, author_id, author_first, author_second,
+        th_year, thesis_type, uni_id, university_name, ins_id, institute_name,
+        page_count, language, submission_date,
+        _array_literal(topics), _array_literal(keywords),
+    ]
+
+
+class IteratorFile(io.TextIOBase):
+    # copy_expert için: satırları bellekte biriktirmeden read() ile verir
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size is None or size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size is None or size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _stage_lines(records, errors):
+    buffer = io.StringIO()
+    # None boş ve tırnaksız yazılır; COPY CSV bunu NULL olarak okur
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row_num, record in records:
+        try:
+            if isinstance(record, ImportRowError):
+                raise record
+            row = normalize_record(row_num, record)
+        except ImportRowError as exc:
+            errors.append({"row": row_num, "error": str(exc)})
+            continue
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+# Staging satırlarını çözümleyen adımlar; her biri sadece henüz hatasız satırlara dokunur.
+# Soft-delete edilmiş kayıtlar (migrations/0008) bilinmiyor sayılır
+RESOLVE_STATEMENTS = [
+    # Üniversite: id verildiyse var mı, yoksa isimle (büyük/küçük harf duyarsız)
+    """
+    UPDATE import_thesis S SET error = 'Unknown universityId'
+    WHERE S.error IS NULL AND S.uni_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM university U WHERE U.uni_id = S.uni_id AND U.deleted_at IS NULL)
+    """,
+    """
+    UPDATE import_thesis S SET uni_id = U.uni_id
+    FROM (
+        SELECT DISTINCT ON (lower(uni_name)) uni_id, lower(uni_name) AS name
+        FROM university
+        WHERE deleted_at IS NULL
+          AND lower(uni_name) IN (SELECT lower(university_name) FROM import_thesis WHERE uni_id IS NULL)
+        ORDER BY lower(uni_name), uni_id
+    ) U
+    WHERE S.error IS NULL AND S.uni_id IS NULL AND lower(S.university_name) = U.name
+    """,
+    """
+    UPDATE import_thesis SET error = 'Unknown universityName'
+    WHERE error IS NULL AND uni_id IS NULL
+    """,
+    # Enstitü: isimle aranırken tezin üniversitesi içinde aranır
+    """
+    UPDATE import_thesis S SET error = 'Unknown instituteId'
+    WHERE S.error IS NULL AND S.ins_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM institute I WHERE I.ins_id = S.ins_id AND I.deleted_at IS NULL)
+    """,
+    """
+    UPDATE import_thesis S SET ins_id = I.ins_id
+    FROM (
+        SELECT DISTINCT ON (uni_id, lower(ins_name)) ins_id, uni_id, lower(ins_name) AS name
+        FROM institute
+        WHERE deleted_at IS NULL
+          AND lower(ins_name) IN (SELECT lower(institute_name) FROM import_thesis WHERE ins_id IS NULL)
+        ORDER BY uni_id, lower(ins_name), ins_id
+    ) I
+    WHERE S.error IS NULL AND S.ins_id IS NULL
+      AND I.uni_id = S.uni_id AND lower(S.institute_name) = I.name
+    """,
+    """
+    UPDATE import_thesis SET error = 'Unknown instituteName'
+    WHERE error IS NULL AND ins_id IS NULL
+    """,
+    """
+    UPDATE import_thesis S SET error = 'Institute does not belong to the university'
+    WHERE S.error IS NULL
+      AND NOT EXISTS (SELECT 1 FROM institute I WHERE I.ins_id = S.ins_id AND I.uni_id = S.uni_id)
+    """,
+    # Yazar: id verildiyse var mı; isimle bulunamayanlar person'a eklenir
+    """
+    UPDATE import_thesis S SET error = 'Unknown authorId'
+    WHERE S.error IS NULL AND S.author_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM person P WHERE P.per_id = S.author_id AND P.deleted_at IS NULL)
+    """,
+    """
+    UPDATE import_thesis S SET author_id = P.per_id
+    FROM (
+        SELECT DISTINCT ON (first_name, second_name) per_id, first_name, second_name
+        FROM person
+        WHERE deleted_at IS NULL
+          AND (first_name, second_name) IN (
+            SELECT author_first, author_second FROM import_thesis WHERE author_id IS NULL
+        )
+        ORDER BY first_name, second_name, per_id
+    ) P
+    WHERE S.error IS NULL AND S.author_id IS NULL
+      AND P.first_name = S.author_first AND P.second_name = S.author_second
+    """,
+    """
+    INSERT INTO person (first_name, second_name)
+    SELECT DISTINCT author_first, author_second
+    FROM import_thesis
+    WHERE error IS NULL AND author_id IS NULL
+    """,
+    """
+    UPDATE import_thesis S SET author_id = P.per_id
+    FROM (
+        SELECT DISTINCT ON (first_name, second_name) per_id, first_name, second_name
+        FROM person
+        WHERE deleted_at IS NULL
+          AND (first_name, second_name) IN (
+            SELECT author_first, author_second FROM import_thesis WHERE author_id IS NULL
+        )
+        ORDER BY first_name, second_name, per_id
+    ) P
+    WHERE S.error IS NULL AND S.author_id IS NULL
+      AND P.first_name = S.author_first AND P.second_name = S.author_second
+    """,
+]
+
+LOAD_STATEMENTS = [
+    # th_num önceden ayrılır; böylece topic/keyword'ler staging satırından bağlanır
+    """
+    UPDATE import_thesis S SET th_num = N.th_num
+    FROM (
+        SELECT row_num, nextval(pg_get_serial_sequence('public.thesis', 'th_num')) AS th_num
+        FROM import_thesis
+        WHERE error IS NULL
+        ORDER BY row_num
+    ) N
+    WHERE S.row_num = N.row_num
+    """,
+    """
+    INSERT INTO thesis (
+        th_num, title, abstract, author_id, th_year, th_type, uni_id, ins_id,
+        page_num, th_language, submission_date
+    )
+    SELECT
+        th_num, title, abstract, author_id, th_year, th_type, uni_id, ins_id,
+        page_num, th_language, submission_date
+    FROM import_thesis
+    WHERE error IS NULL
+    ORDER BY row_num
+    """,
+    """
+    INSERT INTO topic (th_num, topic_name)
+    SELECT S.th_num, T.name
+    FROM import_thesis S, unnest(S.topics) WITH ORDINALITY AS T(name, ord)
+    WHERE S.error IS NULL
+    ORDER BY S.row_num, T.ord
+    """,
+    """
+    INSERT INTO keyword (th_num, keyword)
+    SELECT S.th_num, K.name
+    FROM import_thesis S, unnest(S.keywords) WITH ORDINALITY AS K(name, ord)
+    WHERE S.error IS NULL
+    ORDER BY S.row_num, K.ord
+    """,
+]
+
+
+def import_theses(conn, stream, fmt="ndjson", dry_run=False, max_errors=IMPORT_MAX_ERRORS):
+    if fmt not in IMPORT_FORMATS:
+        raise ImportFormatError(f"Unsupported format: {fmt}")
+
+    errors = []
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE TEMP TABLE import_thesis (
+                row_num integer PRIMARY KEY,
+                title text,
+                abstract text,
+                author_id integer,
+                author_first text,
+                author_second text,
+                th_year date,
+                th_type text,
+                uni_id integer,
+                university_name text,
+                ins_id integer,
+                institute_name text,
+                page_num integer,
+                th_language text,
+                submission_date date,
+                topics text[],
+                keywords text[],
+                th_num integer,
+                error text
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert(
+            f"COPY import_thesis ({', '.join(STAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            IteratorFile(_stage_lines(read_records(stream, fmt), errors)),
+        )
+        # Geçici tablolar autovacuum tarafından analiz edilmez
+        cur.execute("ANALYZE import_thesis")
+
+        for statement in RESOLVE_STATEMENTS + LOAD_STATEMENTS:
+            cur.execute(statement)
+
+        cur.execute("SELECT count(*) FROM import_thesis WHERE error IS NULL")
+        imported = cur.fetchone()[0]
+        cur.execute("SELECT row_num, error FROM import_thesis WHERE error IS NOT NULL")
+        errors.extend({"row": row_num, "error": error} for row_num, error in cur.fetchall())
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "imported": imported,
+        "failed": len(errors),
+        "dryRun": dry_run,
+        "errors": errors[:max_errors],
+        "errorsTruncated": len(errors) > max_errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import theses from NDJSON or CSV")
+    parser.add_argument("file", help="input file, or - for stdin")
+    parser.add_argument("--format", choices=IMPORT_FORMATS,
+                        help="input format (default: from the file extension, else ndjson)")
+    parser.add_argument("--dry-run", action="store_true", help="validate and resolve without committing")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8", newline="")
+    conn = connect()
+    try:
+        result = import_theses(conn, stream, fmt, dry_run=args.dry_run, max_errors=sys.maxsize)
+    except ImportFormatError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    for error in result["errors"]:
+        print(f"row {error['row']}: {error['error']}", file=sys.stderr)
+    print(f"imported {result['imported']} theses, {result['failed']} failed"
+          + (" (dry run)" if args.dry_run else ""))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import bisect
+import contextvars
+import hashlib
+import os
+import re
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+# METRICS CONFIG
+# Açıkken route, SQL statement, bağlantı bekleme ve JSON süreleri ölçülür ve
+# /metrics Prometheus text formatında döner. Sayaçlar süreç içidir: gunicorn ile
+# her worker kendi değerlerini tutar.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+
+# Saniye cinsinden histogram sınırları
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+# SQL'i çalıştıran route; cursor'lar Flask'a bağımlı olmadan etiketi buradan okur
+current_route = contextvars.ContextVar("current_route", default="none")
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}  # label değerleri -> [kova sayıları..., toplam, adet]
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(float(series[-2]))}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Info:
+    # Sabit 1 değerli gauge; statement id -> SQL eşlemesi için
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = set()
+
+    def set(self, *label_values):
+        if label_values in self._values:
+            return
+        with self._lock:
+            self._values.add(label_values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values)
+        for label_values in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} 1")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "gts_http_request_duration_seconds", "Time spent handling a request",
+    ("method", "route", "status"),
+)
+REQUEST_EXCEPTIONS = Counter(
+    "gts_http_request_exceptions_total", "Unhandled exceptions raised by a route",
+    ("route", "exception"),
+)
+JSON_SERIALIZE = Histogram(
+    "gts_json_serialize_seconds", "Time spent serialising JSON response bodies",
+    ("route",),
+)
+QUERY_DURATION = Histogram(
+    "gts_db_query_duration_seconds", "Time spent executing a SQL statement",
+    ("route", "statement"),
+)
+QUERY_ROWS = Histogram(
+    "gts_db_query_rows", "Rows returned or affected by a SQL statement",
+    ("route", "statement"), buckets=ROW_BUCKETS,
+)
+QUERY_ERRORS = Counter(
+    "gts_db_query_errors_total", "SQL statements that raised a database error",
+    ("route", "statement", "error"),
+)
+QUERY_INFO = Info(
+    "gts_db_statement_info", "SQL text (truncated) of each statement id",
+    ("statement", "sql"),
+)
+POOL_ACQUIRE = Histogram(
+    "gts_db_pool_acquire_seconds", "Time spent waiting for a pooled connection (including opening it)",
+)
+POOL_CONNECT = Histogram(
+    "gts_db_connect_seconds", "Time spent opening a new database connection",
+)
+POOL_TIMEOUTS = Counter(
+    "gts_db_pool_timeouts_total", "Requests that found no free connection in time",
+)
+
+REGISTRY = [
+    REQUEST_DURATION,
+    REQUEST_EXCEPTIONS,
+    JSON_SERIALIZE,
+    QUERY_DURATION,
+    QUERY_ROWS,
+    QUERY_ERRORS,
+    QUERY_INFO,
+    POOL_ACQUIRE,
+    POOL_CONNECT,
+    POOL_TIMEOUTS,
+]
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- SQL statement etiketi ---
+# Parametreler %s olarak kaldığı için aynı koddan gelen statement'lar aynı metni
+# üretir; etiket olarak bu metnin kısa hash'i kullanılır (kardinalite sınırlı kalır)
+_WHITESPACE = re.compile(r"\s+")
+_statement_ids = {}
+
+
+def statement_id(query):
+    key = query if isinstance(query, str) else str(query)
+    cached = _statement_ids.get(key)
+    if cached is not None:
+        return cached
+    sql = _WHITESPACE.sub(" ", key).strip()
+    digest = hashlib.sha1(sql.encode("utf-8")).hexdigest()[:10]
+    verb = sql.split(" ", 1)[0].upper() if sql else "EMPTY"
+    cached = f"{verb}:{digest}"
+    QUERY_INFO.set(cached, sql[:200])
+    _statement_ids[key] = cached
+    return cached
+
+
+def record_statement(cursor, query, vars, elapsed, error):
+    route = current_route.get()
+    statement = statement_id(query)
+    QUERY_DURATION.observe(elapsed, route, statement)
+    if error is not None:
+        QUERY_ERRORS.inc(route, statement, type(error).__name__)
+    # Named (server-side) cursor'larda satır sayısı fetch sırasında belli olur
+    elif cursor.rowcount >= 0:
+        QUERY_ROWS.observe(cursor.rowcount, route, statement)
+
+
+# Her execute sonrası observer(cursor, query, vars, elapsed, error) çağrılır
+# (bkz. profiling.py). Liste boşsa bağlantılar sarılmaz, ek maliyet olmaz.
+statement_observers = [record_statement] if METRICS_ENABLED else []
+
+_timed_cursors = {}
+
+
+def timed_cursor(factory):
+    if factory not in _timed_cursors:
+        class TimedCursor(factory):
+            def execute(self, query, vars=None):
+                error = None
+                started = time.perf_counter()
+                try:
+                    return super().execute(query, vars)
+                except psycopg2.Error as exc:
+                    error = exc
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - started
+                    for observer in statement_observers:
+                        observer(self, query, vars, elapsed, error)
+        _timed_cursors[factory] = TimedCursor
+    return _timed_cursors[factory]
+
+
+class InstrumentedConnection(extensions.connection):
+    # cursor_factory route'lardan gelse bile her execute observer'lara bildirilir
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or extensions.cursor
+        kwargs["cursor_factory"] = timed_cursor(factory)
+        return super().cursor(*args, **kwargs)
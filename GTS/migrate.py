@@ -0,0 +1,175 @@
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from db import connect
+
+# Şema değişiklikleri migrations/NNNN_isim.up.sql (+ .down.sql) dosyalarında tutulur.
+# Uygulananlar schema_migrations tablosunda kayıtlıdır.
+#
+#   python migrate.py status
+#   python migrate.py up [--to 0003]
+#   python migrate.py down [--to 0001]   (varsayılan: son migration geri alınır)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.up\.sql$")
+# Aynı anda iki migrate çalışmasın diye
+MIGRATION_LOCK_ID = 4747001
+
+
+class MigrationError(Exception):
+    pass
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for path in sorted(directory.glob("*.up.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            raise MigrationError(f"Invalid migration file name: {path.name}")
+        version, name = match.groups()
+        down = path.with_name(f"{version}_{name}.down.sql")
+        migrations.append({
+            "version": version,
+            "name": name,
+            "up": path,
+            "down": down if down.exists() else None,
+        })
+    versions = [m["version"] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError("Duplicate migration version")
+    return migrations
+
+
+def ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS public.schema_migrations (
+            version varchar(4) PRIMARY KEY,
+            name varchar(100) NOT NULL,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def applied_versions(cur):
+    cur.execute("SELECT version FROM public.schema_migrations ORDER BY version")
+    return [row[0] for row in cur.fetchall()]
+
+
+def migrate_up(conn, target=None, migrations=None, log=print):
+    migrations = load_migrations() if migrations is None else migrations
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        ensure_migrations_table(cur)
+        conn.commit()
+        applied = set(applied_versions(cur))
+        done = []
+        for migration in migrations:
+            if target is not None and migration["version"] > target:
+                break
+            if migration["version"] in applied:
+                continue
+            # Her migration kendi transaction'ında; hata olursa sadece o geri alınır
+            try:
+                cur.execute(migration["up"].read_text(encoding="utf-8"))
+                cur.execute(
+                    "INSERT INTO public.schema_migrations (version, name) VALUES (%s, %s)",
+                    (migration["version"], migration["name"]),
+                )
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                raise MigrationError(
+                    f"{migration['version']}_{migration['name']} failed: {exc}"
+                ) from exc
+            log(f"applied {migration['version']}_{migration['name']}")
+            done.append(migration["version"])
+        return done
+    finally:
+        conn.rollback()
+        cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        cur.close()
+
+
+def migrate_down(conn, target=None, migrations=None, log=print):
+    # target verilirse ondan sonraki tüm migration'lar, verilmezse sadece sonuncusu geri alınır
+    migrations = load_migrations() if migrations is None else migrations
+    by_version = {m["version"]: m for m in migrations}
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        ensure_migrations_table(cur)
+        conn.commit()
+        applied = applied_versions(cur)
+        if target is None:
+            to_revert = applied[-1:]
+        else:
+            to_revert = [v for v in applied if v > target]
+        done = []
+        for version in reversed(to_revert):
+            migration = by_version.get(version)
+            if migration is None or migration["down"] is None:
+                raise MigrationError(f"No down migration for {version}")
+            try:
+                cur.execute(migration["down"].read_text(encoding="utf-8"))
+                cur.execute("DELETE FROM public.schema_migrations WHERE version = %s", (version,))
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                raise MigrationError(
+                    f"{version}_{migration['name']} rollback failed: {exc}"
+                ) from exc
+            log(f"reverted {version}_{migration['name']}")
+            done.append(version)
+        return done
+    finally:
+        conn.rollback()
+        cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        cur.close()
+
+
+def migration_status(conn, migrations=None):
+    migrations = load_migrations() if migrations is None else migrations
+    cur = conn.cursor()
+    ensure_migrations_table(cur)
+    conn.commit()
+    applied = set(applied_versions(cur))
+    cur.close()
+    return [(m["version"], m["name"], m["version"] in applied) for m in migrations]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GTS database migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="list migrations and whether they are applied")
+    up = sub.add_parser("up", help="apply pending migrations")
+    up.add_argument("--to", metavar="VERSION", help="stop after this version")
+    down = sub.add_parser("down", help="roll back migrations")
+    down.add_argument("--to", metavar="VERSION", help="roll back everything after this version")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    try:
+        if args.command == "status":
+            for version, name, applied in migration_status(conn):
+                print(f"{'[x]' if applied else '[ ]'} {version}_{name}")
+        elif args.command == "up":
+            if not migrate_up(conn, target=args.to):
+                print("nothing to apply")
+        else:
+            if not migrate_down(conn, target=args.to):
+                print("nothing to roll back")
+    except MigrationError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
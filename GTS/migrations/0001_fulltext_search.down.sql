@@ -0,0 +1,5 @@
+DROP INDEX IF EXISTS public.thesis_search_vector_idx;
+
+ALTER TABLE public.thesis DROP COLUMN IF EXISTS search_vector;
+
+DROP FUNCTION IF EXISTS public.thesis_ts_config(text);
@@ -0,0 +1,29 @@
+--
+-- Full-text search for thesis title/abstract (POST /api/search, mode=fulltext)
+--
+
+-- th_language -> text search config. Bilinmeyen diller 'simple' ile indekslenir.
+CREATE OR REPLACE FUNCTION public.thesis_ts_config(lang text) RETURNS regconfig
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$
+    SELECT CASE lower(coalesce(lang, ''))
+        WHEN 'english' THEN 'pg_catalog.english'::regconfig
+        WHEN 'turkish' THEN 'pg_catalog.turkish'::regconfig
+        WHEN 'german' THEN 'pg_catalog.german'::regconfig
+        WHEN 'french' THEN 'pg_catalog.french'::regconfig
+        WHEN 'spanish' THEN 'pg_catalog.spanish'::regconfig
+        WHEN 'italian' THEN 'pg_catalog.italian'::regconfig
+        ELSE 'pg_catalog.simple'::regconfig
+    END
+$$;
+
+-- Başlık (A) özetten (B) daha yüksek ağırlıklı; kolon insert/update'te otomatik güncellenir
+ALTER TABLE public.thesis
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector(public.thesis_ts_config(th_language), coalesce(title, '')), 'A') ||
+        setweight(to_tsvector(public.thesis_ts_config(th_language), coalesce(abstract, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS thesis_search_vector_idx
+    ON public.thesis USING gin (search_vector);
@@ -0,0 +1,6 @@
+DROP INDEX IF EXISTS public.keyword_keyword_prefix_idx;
+DROP INDEX IF EXISTS public.topic_topic_name_prefix_idx;
+DROP INDEX IF EXISTS public.keyword_keyword_trgm_idx;
+DROP INDEX IF EXISTS public.topic_topic_name_trgm_idx;
+
+DROP EXTENSION IF EXISTS pg_trgm;
@@ -0,0 +1,20 @@
+--
+-- Trigram indexes for fuzzy topic/keyword search (POST /api/search, mode=fuzzy)
+-- and /api/topics/suggest, /api/keywords/suggest
+--
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+
+-- ILIKE '%..%', ILIKE '..%', similarity (%) ve word_similarity (%>) sorgularını destekler
+CREATE INDEX IF NOT EXISTS topic_topic_name_trgm_idx
+    ON public.topic USING gin (topic_name public.gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS keyword_keyword_trgm_idx
+    ON public.keyword USING gin (keyword public.gin_trgm_ops);
+
+-- Autocomplete prefix araması (lower(col) LIKE 'abc%') için; kısa prefix'lerde trigram yetersiz kalır
+CREATE INDEX IF NOT EXISTS topic_topic_name_prefix_idx
+    ON public.topic (lower(topic_name) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS keyword_keyword_prefix_idx
+    ON public.keyword (lower(keyword) text_pattern_ops);
@@ -0,0 +1,8 @@
+DROP INDEX IF EXISTS public.cosupervisor_th_num_idx;
+DROP INDEX IF EXISTS public.supervisor_th_num_idx;
+DROP INDEX IF EXISTS public.keyword_th_num_idx;
+DROP INDEX IF EXISTS public.topic_th_num_idx;
+DROP INDEX IF EXISTS public.institute_uni_id_idx;
+DROP INDEX IF EXISTS public.thesis_ins_id_idx;
+DROP INDEX IF EXISTS public.thesis_uni_id_idx;
+DROP INDEX IF EXISTS public.thesis_author_id_idx;
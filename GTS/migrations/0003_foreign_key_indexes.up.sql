@@ -0,0 +1,17 @@
+--
+-- Indexes for the foreign keys used by detail/list routes and thesis deletes
+--
+
+-- (fk, th_num): hem FK aramaları hem de "WHERE fk = %s ORDER BY th_num" listeleri için
+CREATE INDEX IF NOT EXISTS thesis_author_id_idx ON public.thesis (author_id, th_num);
+CREATE INDEX IF NOT EXISTS thesis_uni_id_idx ON public.thesis (uni_id, th_num);
+CREATE INDEX IF NOT EXISTS thesis_ins_id_idx ON public.thesis (ins_id, th_num);
+
+CREATE INDEX IF NOT EXISTS institute_uni_id_idx ON public.institute (uni_id, ins_id);
+
+CREATE INDEX IF NOT EXISTS topic_th_num_idx ON public.topic (th_num);
+CREATE INDEX IF NOT EXISTS keyword_th_num_idx ON public.keyword (th_num);
+
+-- Birincil anahtar (per_id, th_num) olduğu için th_num tek başına ayrıca indekslenir
+CREATE INDEX IF NOT EXISTS supervisor_th_num_idx ON public.supervisor (th_num);
+CREATE INDEX IF NOT EXISTS cosupervisor_th_num_idx ON public.cosupervisor (th_num);
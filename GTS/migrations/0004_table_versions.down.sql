@@ -0,0 +1,10 @@
+DROP TRIGGER IF EXISTS cosupervisor_version_trg ON public.cosupervisor;
+DROP TRIGGER IF EXISTS supervisor_version_trg ON public.supervisor;
+DROP TRIGGER IF EXISTS keyword_version_trg ON public.keyword;
+DROP TRIGGER IF EXISTS topic_version_trg ON public.topic;
+DROP TRIGGER IF EXISTS institute_version_trg ON public.institute;
+DROP TRIGGER IF EXISTS university_version_trg ON public.university;
+DROP TRIGGER IF EXISTS person_version_trg ON public.person;
+DROP TRIGGER IF EXISTS thesis_version_trg ON public.thesis;
+DROP FUNCTION IF EXISTS public.bump_table_version();
+DROP TABLE IF EXISTS public.table_version;
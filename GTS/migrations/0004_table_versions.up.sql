@@ -0,0 +1,51 @@
+--
+-- Per-table change versions for ETag / conditional GET
+--
+
+-- Her tablo için bir satır; yazma statement'ları trigger ile versiyonu artırır.
+-- Artış yazan transaction ile birlikte commit edilir, böylece yeni versiyon
+-- yeni veriden önce görünmez.
+CREATE TABLE IF NOT EXISTS public.table_version (
+    table_name varchar(63) PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0
+);
+
+INSERT INTO public.table_version (table_name)
+VALUES ('thesis'), ('person'), ('university'), ('institute'),
+       ('topic'), ('keyword'), ('supervisor'), ('cosupervisor')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.bump_table_version() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE public.table_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$;
+
+-- Statement seviyesinde: toplu import/silme de tek artış yapar
+DROP TRIGGER IF EXISTS thesis_version_trg ON public.thesis;
+CREATE TRIGGER thesis_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.thesis
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS person_version_trg ON public.person;
+CREATE TRIGGER person_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.person
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS university_version_trg ON public.university;
+CREATE TRIGGER university_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.university
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS institute_version_trg ON public.institute;
+CREATE TRIGGER institute_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.institute
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS topic_version_trg ON public.topic;
+CREATE TRIGGER topic_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.topic
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS keyword_version_trg ON public.keyword;
+CREATE TRIGGER keyword_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.keyword
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS supervisor_version_trg ON public.supervisor;
+CREATE TRIGGER supervisor_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.supervisor
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
+DROP TRIGGER IF EXISTS cosupervisor_version_trg ON public.cosupervisor;
+CREATE TRIGGER cosupervisor_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.cosupervisor
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
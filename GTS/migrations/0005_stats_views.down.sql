@@ -0,0 +1,10 @@
+DELETE FROM public.table_version WHERE table_name = 'stats';
+DROP TABLE IF EXISTS public.stats_refresh;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_keyword;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_topic;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_language;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_type;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_year;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_institute;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_university;
+DROP MATERIALIZED VIEW IF EXISTS public.stats_overview;
@@ -0,0 +1,82 @@
+--
+-- Materialized views behind /api/stats (refreshed by stats.py)
+--
+
+-- REFRESH ... CONCURRENTLY için her view'da tüm satırları kapsayan unique index var
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_overview AS
+SELECT
+    1 AS id,
+    (SELECT count(*) FROM public.thesis) AS theses,
+    (SELECT count(*) FROM public.person) AS persons,
+    (SELECT count(*) FROM public.university) AS universities,
+    (SELECT count(*) FROM public.institute) AS institutes,
+    (SELECT count(DISTINCT topic_name) FROM public.topic) AS topics,
+    (SELECT count(DISTINCT keyword) FROM public.keyword) AS keywords;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_overview_id_idx ON public.stats_overview (id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_university AS
+SELECT U.uni_id, U.uni_name, count(T.th_num) AS thesis_count
+FROM public.university U
+LEFT JOIN public.thesis T ON T.uni_id = U.uni_id
+GROUP BY U.uni_id, U.uni_name;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_university_uni_id_idx ON public.stats_university (uni_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_institute AS
+SELECT I.ins_id, I.ins_name, I.uni_id, count(T.th_num) AS thesis_count
+FROM public.institute I
+LEFT JOIN public.thesis T ON T.ins_id = I.ins_id
+GROUP BY I.ins_id, I.ins_name, I.uni_id;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_institute_ins_id_idx ON public.stats_institute (ins_id);
+
+-- Yılı olmayan tezler th_year = NULL satırında toplanır
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_year AS
+SELECT EXTRACT(YEAR FROM th_year)::int AS th_year, count(*) AS thesis_count
+FROM public.thesis
+GROUP BY 1;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_year_th_year_idx ON public.stats_year (th_year);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_type AS
+SELECT th_type, count(*) AS thesis_count
+FROM public.thesis
+GROUP BY th_type;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_type_th_type_idx ON public.stats_type (th_type);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_language AS
+SELECT th_language, count(*) AS thesis_count
+FROM public.thesis
+GROUP BY th_language;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_language_th_language_idx ON public.stats_language (th_language);
+
+-- En çok kullanılan konu/anahtar kelimeler için (thesis_count DESC) index'i
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_topic AS
+SELECT topic_name, count(DISTINCT th_num) AS thesis_count
+FROM public.topic
+GROUP BY topic_name;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_topic_topic_name_idx ON public.stats_topic (topic_name);
+CREATE INDEX IF NOT EXISTS stats_topic_count_idx ON public.stats_topic (thesis_count DESC, topic_name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.stats_keyword AS
+SELECT keyword, count(DISTINCT th_num) AS thesis_count
+FROM public.keyword
+WHERE keyword IS NOT NULL
+GROUP BY keyword;
+CREATE UNIQUE INDEX IF NOT EXISTS stats_keyword_keyword_idx ON public.stats_keyword (keyword);
+CREATE INDEX IF NOT EXISTS stats_keyword_count_idx ON public.stats_keyword (thesis_count DESC, keyword);
+
+-- Son yenileme zamanı ve o andaki kaynak tablo versiyonlarının toplamı;
+-- versiyonlar değişmediyse stats.py refresh işi atlar
+CREATE TABLE IF NOT EXISTS public.stats_refresh (
+    id boolean PRIMARY KEY DEFAULT true CHECK (id),
+    refreshed_at timestamptz NOT NULL DEFAULT now(),
+    source_version bigint NOT NULL DEFAULT 0
+);
+INSERT INTO public.stats_refresh (id, source_version)
+SELECT true, coalesce(sum(version), 0)
+FROM public.table_version
+WHERE table_name IN ('thesis', 'person', 'university', 'institute', 'topic', 'keyword')
+ON CONFLICT (id) DO NOTHING;
+
+-- /api/stats ETag'i yenilemede artan bu versiyona bağlıdır
+INSERT INTO public.table_version (table_name) VALUES ('stats')
+ON CONFLICT (table_name) DO NOTHING;
@@ -0,0 +1,4 @@
+DROP INDEX IF EXISTS public.topic_topic_name_th_num_idx;
+DROP INDEX IF EXISTS public.thesis_th_year_idx;
+DROP INDEX IF EXISTS public.thesis_language_idx;
+DROP INDEX IF EXISTS public.thesis_facets_idx;
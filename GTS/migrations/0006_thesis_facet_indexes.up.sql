@@ -0,0 +1,15 @@
+--
+-- Indexes for filtered thesis lists and facet counts (GET /api/theses)
+--
+
+-- Facet geçişinin okuduğu tüm kolonlar; thesis yerine bu index okunur (index-only scan).
+-- th_type önde olduğu için type filtresi de bunu kullanır.
+CREATE INDEX IF NOT EXISTS thesis_facets_idx
+    ON public.thesis (th_type, th_language, th_year, uni_id, ins_id, th_num);
+
+-- (filtre, th_num): filtreli keyset sayfaları sıralama yapmadan okunur
+CREATE INDEX IF NOT EXISTS thesis_language_idx ON public.thesis (th_language, th_num);
+CREATE INDEX IF NOT EXISTS thesis_th_year_idx ON public.thesis (th_year, th_num);
+
+-- topic=... filtresi (tam eşleşme) ve konu facet'i
+CREATE INDEX IF NOT EXISTS topic_topic_name_th_num_idx ON public.topic (topic_name, th_num);
@@ -0,0 +1,5 @@
+DELETE FROM public.table_version WHERE table_name = 'similar_thesis';
+DROP TABLE IF EXISTS public.similar_index;
+DROP TABLE IF EXISTS public.similar_thesis;
+DROP TABLE IF EXISTS public.similar_term;
+DROP TABLE IF EXISTS public.thesis_term;
@@ -0,0 +1,44 @@
+--
+-- Precomputed similar-thesis index behind GET /api/theses/<id>/similar
+--
+
+-- Tezlerin konu ve anahtar kelimelerinden çıkan terimler (küçük harf; keyword
+-- satırları virgülle bölünür). similarity.py build ile doldurulur, tez yazan
+-- route'lar kendi tezinin satırlarını günceller.
+CREATE TABLE IF NOT EXISTS public.thesis_term (
+    th_num integer NOT NULL REFERENCES public.thesis (th_num) ON DELETE CASCADE,
+    term text NOT NULL,
+    PRIMARY KEY (th_num, term)
+);
+CREATE INDEX IF NOT EXISTS thesis_term_term_idx ON public.thesis_term (term, th_num);
+
+-- Terim başına tez sayısı (df) ve ağırlık: ln(1 + tez sayısı / df)
+CREATE TABLE IF NOT EXISTS public.similar_term (
+    term text PRIMARY KEY,
+    df integer NOT NULL,
+    weight double precision NOT NULL
+);
+
+-- Her tez için en benzer SIMILAR_K tez; score ağırlıklı Jaccard (0..1)
+CREATE TABLE IF NOT EXISTS public.similar_thesis (
+    th_num integer NOT NULL REFERENCES public.thesis (th_num) ON DELETE CASCADE,
+    similar_th_num integer NOT NULL REFERENCES public.thesis (th_num) ON DELETE CASCADE,
+    score double precision NOT NULL,
+    PRIMARY KEY (th_num, similar_th_num)
+);
+CREATE INDEX IF NOT EXISTS similar_thesis_similar_th_num_idx ON public.similar_thesis (similar_th_num);
+
+-- Son tam oluşturma; ağırlıklar o andaki tez sayısıyla hesaplanır
+CREATE TABLE IF NOT EXISTS public.similar_index (
+    id boolean PRIMARY KEY DEFAULT true CHECK (id),
+    built_at timestamptz,
+    thesis_count integer NOT NULL DEFAULT 0
+);
+INSERT INTO public.similar_index (id) VALUES (true)
+ON CONFLICT (id) DO NOTHING;
+
+INSERT INTO public.table_version (table_name) VALUES ('similar_thesis')
+ON CONFLICT (table_name) DO NOTHING;
+DROP TRIGGER IF EXISTS similar_thesis_version_trg ON public.similar_thesis;
+CREATE TRIGGER similar_thesis_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.similar_thesis
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version();
@@ -0,0 +1,6 @@
+DROP INDEX IF EXISTS public.institute_deleted_idx;
+DROP INDEX IF EXISTS public.university_deleted_idx;
+DROP INDEX IF EXISTS public.person_deleted_idx;
+ALTER TABLE public.institute DROP COLUMN IF EXISTS deleted_at;
+ALTER TABLE public.university DROP COLUMN IF EXISTS deleted_at;
+ALTER TABLE public.person DROP COLUMN IF EXISTS deleted_at;
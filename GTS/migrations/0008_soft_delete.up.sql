@@ -0,0 +1,14 @@
+--
+-- Soft delete for persons, universities and institutes
+--
+
+-- Dolu ise kayıt silinmiş sayılır: listelerde ve detayda görünmez, ama onu
+-- referans veren tezler olduğu gibi kalır. NULL'a çekmek kaydı geri getirir.
+ALTER TABLE public.person ADD COLUMN IF NOT EXISTS deleted_at timestamptz;
+ALTER TABLE public.university ADD COLUMN IF NOT EXISTS deleted_at timestamptz;
+ALTER TABLE public.institute ADD COLUMN IF NOT EXISTS deleted_at timestamptz;
+
+-- ?deleted=only listeleri (geri alma ekranı); silinmiş kayıt az olduğu için küçük kalır
+CREATE INDEX IF NOT EXISTS person_deleted_idx ON public.person (per_id) WHERE deleted_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS university_deleted_idx ON public.university (uni_id) WHERE deleted_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS institute_deleted_idx ON public.institute (ins_id) WHERE deleted_at IS NOT NULL;
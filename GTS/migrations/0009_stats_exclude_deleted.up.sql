@@ -0,0 +1,38 @@
+--
+-- Stats views skip soft-deleted persons, universities and institutes (0008)
+--
+
+-- /api/stats listelerle aynı sayıları göstersin; tezler (ve silinmiş kayda bağlı
+-- tezler) sayılmaya devam eder
+DROP MATERIALIZED VIEW IF EXISTS public.stats_overview;
+CREATE MATERIALIZED VIEW public.stats_overview AS
+SELECT
+    1 AS id,
+    (SELECT count(*) FROM public.thesis) AS theses,
+    (SELECT count(*) FROM public.person WHERE deleted_at IS NULL) AS persons,
+    (SELECT count(*) FROM public.university WHERE deleted_at IS NULL) AS universities,
+    (SELECT count(*) FROM public.institute WHERE deleted_at IS NULL) AS institutes,
+    (SELECT count(DISTINCT topic_name) FROM public.topic) AS topics,
+    (SELECT count(DISTINCT keyword) FROM public.keyword) AS keywords;
+CREATE UNIQUE INDEX stats_overview_id_idx ON public.stats_overview (id);
+
+DROP MATERIALIZED VIEW IF EXISTS public.stats_university;
+CREATE MATERIALIZED VIEW public.stats_university AS
+SELECT U.uni_id, U.uni_name, count(T.th_num) AS thesis_count
+FROM public.university U
+LEFT JOIN public.thesis T ON T.uni_id = U.uni_id
+WHERE U.deleted_at IS NULL
+GROUP BY U.uni_id, U.uni_name;
+CREATE UNIQUE INDEX stats_university_uni_id_idx ON public.stats_university (uni_id);
+
+DROP MATERIALIZED VIEW IF EXISTS public.stats_institute;
+CREATE MATERIALIZED VIEW public.stats_institute AS
+SELECT I.ins_id, I.ins_name, I.uni_id, count(T.th_num) AS thesis_count
+FROM public.institute I
+LEFT JOIN public.thesis T ON T.ins_id = I.ins_id
+WHERE I.deleted_at IS NULL
+GROUP BY I.ins_id, I.ins_name, I.uni_id;
+CREATE UNIQUE INDEX stats_institute_ins_id_idx ON public.stats_institute (ins_id);
+
+-- Yeni view'lar doldurulmuş olarak oluşur; /api/stats ETag'i değişsin
+UPDATE public.table_version SET version = version + 1 WHERE table_name = 'stats';
@@ -0,0 +1,47 @@
+DO $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['thesis', 'person', 'university', 'institute', 'topic', 'keyword',
+                             'supervisor', 'cosupervisor', 'similar_thesis']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_insert_version_trg', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_update_version_trg', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_delete_version_trg', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_truncate_version_trg', t);
+    END LOOP;
+END
+$$;
+
+DROP VIEW IF EXISTS public.table_version;
+CREATE TABLE public.table_version (
+    table_name varchar(63) PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0
+);
+INSERT INTO public.table_version (table_name, version)
+SELECT table_name, sum(changes) FROM public.table_change GROUP BY table_name;
+
+CREATE OR REPLACE FUNCTION public.bump_table_version() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE public.table_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$;
+
+DO $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['thesis', 'person', 'university', 'institute', 'topic', 'keyword',
+                             'supervisor', 'cosupervisor', 'similar_thesis']
+    LOOP
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.%I '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version()', t || '_version_trg', t);
+    END LOOP;
+END
+$$;
+
+DROP FUNCTION IF EXISTS public.compact_table_change(text, bigint);
+DROP TABLE IF EXISTS public.table_change;
@@ -0,0 +1,90 @@
+--
+-- Lock-free table versions: append-only change log instead of one counter row per table
+--
+
+-- 0004'te her yazma statement'ı tablonun tek table_version satırını güncelliyordu;
+-- satır kilidi commit'e kadar tutulduğu için aynı tabloya yazan transaction'lar
+-- (uzun import'lar, toplu PATCH/DELETE) birbirini bekliyordu. Artık her statement
+-- bir satır ekler; INSERT başka yazarı beklemez. Versiyon satırların toplamıdır:
+-- her commit toplamı artırır, commit sırası id sırasından farklı olsa da
+-- (max(id)'nin aksine) yeni veri görünmeden yeni versiyon görünmez.
+CREATE TABLE IF NOT EXISTS public.table_change (
+    table_name varchar(63) NOT NULL,
+    id bigint GENERATED ALWAYS AS IDENTITY,
+    changes bigint NOT NULL DEFAULT 1,
+    PRIMARY KEY (table_name, id)
+);
+
+-- Mevcut versiyonlar taşınır; ETag'ler değişmez
+INSERT INTO public.table_change (table_name, changes)
+SELECT table_name, version FROM public.table_version;
+
+DROP TABLE public.table_version;
+-- Okuyanlar (ETag, stats.py) aynı isim ve kolonlarla okumaya devam eder
+CREATE VIEW public.table_version AS
+SELECT table_name, sum(changes)::bigint AS version
+FROM public.table_change
+GROUP BY table_name;
+
+-- Bir tablonun eski satırları toplamları tek satırda olacak şekilde birleştirilir;
+-- silme ve ekleme aynı transaction'da olduğu için toplam hiçbir anda değişmez.
+-- Aynı tabloyu aynı anda tek transaction birleştirir.
+CREATE OR REPLACE FUNCTION public.compact_table_change(p_table text, p_upto bigint) RETURNS void
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('table_change:' || p_table)) THEN
+        RETURN;
+    END IF;
+    WITH gone AS (
+        DELETE FROM public.table_change
+        WHERE table_name = p_table AND id < p_upto
+        RETURNING changes
+    )
+    INSERT INTO public.table_change (table_name, changes)
+    SELECT p_table, sum(changes) FROM gone HAVING count(*) > 0;
+END
+$$;
+
+-- Satır değiştirmeyen statement'lar (0 satırlık UPDATE/DELETE) versiyonu artırmaz;
+-- changed_rows trigger'ın transition tablosudur (TRUNCATE'te yok)
+CREATE OR REPLACE FUNCTION public.bump_table_version() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    new_id bigint;
+BEGIN
+    IF TG_OP <> 'TRUNCATE' THEN
+        IF NOT EXISTS (SELECT 1 FROM changed_rows) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+    INSERT INTO public.table_change (table_name) VALUES (TG_TABLE_NAME) RETURNING id INTO new_id;
+    -- Okuma (toplam) kısa kalsın diye arada bir birleştirilir
+    IF new_id % 100 = 0 THEN
+        PERFORM public.compact_table_change(TG_TABLE_NAME, new_id);
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+-- Transition tablolu trigger tek olay için tanımlanabilir: tablo başına dört trigger
+DO $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['thesis', 'person', 'university', 'institute', 'topic', 'keyword',
+                             'supervisor', 'cosupervisor', 'similar_thesis']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_version_trg', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON public.%I REFERENCING NEW TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version()', t || '_insert_version_trg', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON public.%I REFERENCING NEW TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version()', t || '_update_version_trg', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON public.%I REFERENCING OLD TABLE AS changed_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version()', t || '_delete_version_trg', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER TRUNCATE ON public.%I '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version()', t || '_truncate_version_trg', t);
+    END LOOP;
+END
+$$;
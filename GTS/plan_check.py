@@ -0,0 +1,221 @@
+import argparse
+import json
+import sys
+
+import psycopg2
+from psycopg2 import extensions
+
+import db
+from migrate import migrate_up
+from seed import seed
+
+# Route'ların çalıştırdığı SQL'i yakalayıp EXPLAIN eder; büyük bir tabloda
+# Seq Scan görürse hata kodu ile çıkar. Seed edilmiş bir scratch veritabanında çalıştırın:
+#
+#   DB_NAME=gtsdb_scratch python plan_check.py --seed 20000
+
+# Sabit parametreli istekler; {th_num} vb. veritabanından seçilen örnek id'lerle doldurulur
+PLAN_CHECK_REQUESTS = [
+    ("GET", "/api/theses?limit=50&cursor={th_num}", None),
+    ("GET", "/api/theses?limit=50&language=Turkish&yearFrom=2010", None),
+    ("GET", "/api/theses?limit=50&topic={topic}", None),
+    ("GET", "/api/theses/{th_num}", None),
+    ("GET", "/api/theses/{th_num}/supervisors", None),
+    ("GET", "/api/theses/{th_num}/similar", None),
+    ("GET", "/api/theses?ids={th_num},{per_id},{uni_id}", None),
+    ("GET", "/api/persons?limit=50&cursor={per_id}", None),
+    ("GET", "/api/persons/{per_id}", None),
+    ("GET", "/api/persons/{per_id}/theses", None),
+    ("GET", "/api/persons/{per_id}/supervised", None),
+    ("GET", "/api/persons/{per_id}/impact", None),
+    ("GET", "/api/universities/{uni_id}", None),
+    ("GET", "/api/universities/{uni_id}/institutes", None),
+    ("GET", "/api/universities/{uni_id}/theses", None),
+    ("GET", "/api/universities/{uni_id}/impact", None),
+    ("GET", "/api/institutes?limit=50", None),
+    ("GET", "/api/institutes/{ins_id}", None),
+    ("GET", "/api/institutes/{ins_id}/theses", None),
+    ("POST", "/api/search", {"keyword": "{word}", "mode": "fulltext"}),
+    ("POST", "/api/search", {"keyword": "{word} {word2}*", "mode": "fulltext"}),
+    ("DELETE", "/api/theses/{delete_th_num}", None),
+]
+# pg_trgm kurulu değilse bu istekler atlanır
+TRGM_REQUESTS = [
+    ("POST", "/api/search", {"keyword": "{topic}", "mode": "fuzzy", "type": "topic"}),
+    ("POST", "/api/search", {"keyword": "{word}", "mode": "fuzzy", "type": "keyword"}),
+    ("GET", "/api/topics/suggest?q={topic_prefix}", None),
+    ("GET", "/api/keywords/suggest?q={word_prefix}", None),
+]
+
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+recorded = []
+_recording_cursors = {}
+
+
+def recording_cursor(factory):
+    if factory not in _recording_cursors:
+        class RecordingCursor(factory):
+            def execute(self, query, vars=None):
+                try:
+                    return super().execute(query, vars)
+                finally:
+                    if self.query:
+                        recorded.append(self.query.decode("utf-8", "replace"))
+        _recording_cursors[factory] = RecordingCursor
+    return _recording_cursors[factory]
+
+
+class RecordingConnection(extensions.connection):
+    # cursor_factory route'lardan gelse bile execute edilen SQL kaydedilir
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or extensions.cursor
+        kwargs["cursor_factory"] = recording_cursor(factory)
+        return super().cursor(*args, **kwargs)
+
+
+def recording_connect():
+    return psycopg2.connect(
+        host=db.DB_HOST,
+        database=db.DB_NAME,
+        port=db.DB_PORT,
+        user=db.DB_USER,
+        password=db.DB_PASSWORD,
+        connection_factory=RecordingConnection,
+    )
+
+
+def sample_values(cur):
+    # Ortadan seçilen id'ler; en küçük/büyük id'ler planı yanıltabilir
+    cur.execute("""
+        SELECT
+            (SELECT th_num FROM thesis ORDER BY th_num OFFSET (SELECT count(*) / 2 FROM thesis) LIMIT 1),
+            (SELECT max(th_num) FROM thesis),
+            (SELECT per_id FROM person ORDER BY per_id OFFSET (SELECT count(*) / 2 FROM person) LIMIT 1),
+            (SELECT uni_id FROM university ORDER BY uni_id OFFSET (SELECT count(*) / 2 FROM university) LIMIT 1),
+            (SELECT ins_id FROM institute ORDER BY ins_id OFFSET (SELECT count(*) / 2 FROM institute) LIMIT 1),
+            (SELECT topic_name FROM topic ORDER BY topic_id LIMIT 1),
+            (SELECT keyword FROM keyword ORDER BY keyword_id DESC LIMIT 1)
+    """)
+    th_num, max_th_num, per_id, uni_id, ins_id, topic, keyword = cur.fetchone()
+    word = (keyword or "model").split(",")[0].split()[0]
+    return {
+        "th_num": th_num,
+        "delete_th_num": max_th_num,
+        "per_id": per_id,
+        "uni_id": uni_id,
+        "ins_id": ins_id,
+        "topic": topic or "Artificial Intelligence",
+        "topic_prefix": (topic or "Art")[:3],
+        "word": word,
+        "word2": word[:3],
+        "word_prefix": word[:2],
+    }
+
+
+def fill(value, values):
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {k: fill(v, values) for k, v in value.items()}
+    return value
+
+
+def large_tables(cur, min_rows):
+    cur.execute("""
+        SELECT C.relname
+        FROM pg_class C
+        JOIN pg_namespace N ON N.oid = C.relnamespace
+        WHERE N.nspname = 'public' AND C.relkind = 'r' AND C.reltuples >= %s
+    """, (min_rows,))
+    return {row[0] for row in cur.fetchall()}
+
+
+def seq_scans(plan, tables):
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in tables:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, tables))
+    return found
+
+
+def explain(cur, statement):
+    cur.execute("EXPLAIN (FORMAT JSON) " + statement)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def check_plans(min_rows=10000, verbose=False, out=print):
+    # app import'u burada; havuz kayıt yapan bağlantılarla değiştirildikten sonra kullanılır
+    from app import app
+
+    db.set_pool(db.ConnectionPool(minconn=0, maxconn=2, connect=recording_connect))
+    conn = db.connect()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        tables = large_tables(cur, min_rows)
+        if not tables:
+            out(f"no table has >= {min_rows} rows; seed the database first (--seed)")
+            return 1
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        requests = PLAN_CHECK_REQUESTS + (TRGM_REQUESTS if cur.fetchone() else [])
+        values = sample_values(cur)
+
+        client = app.test_client()
+        failures = 0
+        for method, url, body in requests:
+            url = fill(url, values)
+            recorded.clear()
+            response = client.open(url, method=method, json=fill(body, values))
+            if response.status_code >= 500:
+                out(f"FAIL {method} {url}: HTTP {response.status_code}")
+                failures += 1
+                continue
+            for statement in list(recorded):
+                if not statement.lstrip().lower().startswith(EXPLAINABLE):
+                    continue
+                plan = explain(cur, statement)
+                scans = seq_scans(plan, tables)
+                if scans:
+                    failures += 1
+                    out(f"FAIL {method} {url}: Seq Scan on {', '.join(sorted(set(scans)))}")
+                    out("    " + " ".join(statement.split()))
+                elif verbose:
+                    out(f"ok   {method} {url}: {' '.join(statement.split())[:100]}")
+        out(f"{len(requests)} requests checked, {failures} plan regression(s)")
+        return 1 if failures else 0
+    finally:
+        cur.close()
+        conn.close()
+        db.close_pool()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if route queries fall back to sequential scans")
+    parser.add_argument("--seed", type=int, metavar="THESES",
+                        help="seed this many synthetic theses first (scratch databases only)")
+    parser.add_argument("--min-rows", type=int, default=10000,
+                        help="tables with at least this many rows count as large")
+    parser.add_argument("--no-migrate", action="store_true", help="do not apply pending migrations")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    conn = db.connect()
+    try:
+        if not args.no_migrate:
+            migrate_up(conn)
+        if args.seed:
+            seed(conn, theses=args.seed)
+    finally:
+        conn.close()
+
+    return check_plans(min_rows=args.min_rows, verbose=args.verbose)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
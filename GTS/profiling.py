@@ -0,0 +1,129 @@
+import contextvars
+import logging
+import os
+import re
+
+from psycopg2 import extensions
+
+import metrics
+
+# PROFILING CONFIG
+# Açıkken SLOW_QUERY_MS'den uzun süren her SQL statement'ı parametreleri, route'u
+# ve EXPLAIN (ANALYZE, BUFFERS) çıktısıyla loglanır; X-Profile header'ı (ya da
+# ?profile=1) gönderilen isteklere Server-Timing ile DB/Python süre dökümü eklenir.
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# EXPLAIN ANALYZE statement'ı tekrar çalıştırır; yük altında kapatılabilir
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1").lower() in ("1", "true", "yes", "on")
+# Boş değilse istek profili sadece X-Profile: <token> ile açılır
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+slow_log = logging.getLogger("gts.slow_query")
+profile_log = logging.getLogger("gts.profile")
+
+# İstek profili açıksa {"db": saniye, "statements": [...]}; değilse None
+current_profile = contextvars.ContextVar("current_profile", default=None)
+
+# Sadece okuma yapan statement'lar EXPLAIN ANALYZE ile tekrar çalıştırılır;
+# yazan bir statement'ı (CTE içindekiler dahil) iki kez çalıştırmak veriyi bozar
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|NEXTVAL|SETVAL)\b", re.IGNORECASE)
+
+
+def query_text(query):
+    return query.decode("utf-8", "replace") if isinstance(query, bytes) else str(query)
+
+
+def is_explainable(sql):
+    return bool(_READ_ONLY.match(sql)) and not _WRITES.search(sql) and "FOR UPDATE" not in sql.upper()
+
+
+def explain_lines(cursor, sql, vars):
+    # Aynı bağlantı ve transaction; düz cursor ile, tekrar observer'a düşmeden.
+    # Savepoint: EXPLAIN hata verirse (ör. statement_timeout) route'un transaction'ı bozulmaz
+    conn = cursor.connection
+    savepoint = not conn.autocommit
+    explain = extensions.cursor(conn)
+    try:
+        if savepoint:
+            explain.execute("SAVEPOINT gts_explain")
+        try:
+            explain.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, vars)
+            lines = [row[0] for row in explain.fetchall()]
+        except Exception:
+            if savepoint:
+                explain.execute("ROLLBACK TO SAVEPOINT gts_explain")
+            raise
+        if savepoint:
+            explain.execute("RELEASE SAVEPOINT gts_explain")
+        return lines
+    finally:
+        explain.close()
+
+
+def log_slow_query(route, sql, vars, elapsed, plan=None):
+    params = repr(vars)
+    if len(params) > 1000:
+        params = params[:1000] + "..."
+    message = [f"slow query {elapsed * 1000:.1f} ms on {route}", sql.strip(), f"params: {params}"]
+    if plan:
+        message.extend(plan)
+    slow_log.warning("\n".join(message))
+
+
+def note_statement(query, elapsed):
+    # Süreyi istek profiline ekler; statement yavaşsa True döner
+    profile = current_profile.get()
+    if profile is not None:
+        profile["db"] += elapsed
+        profile["statements"].append((metrics.statement_id(query), elapsed))
+    return elapsed * 1000 >= SLOW_QUERY_MS
+
+
+def record_statement(cursor, query, vars, elapsed, error):
+    if not note_statement(query, elapsed) or error is not None:
+        return
+    sql = query_text(query)
+    plan = None
+    if SLOW_QUERY_EXPLAIN and is_explainable(sql):
+        try:
+            plan = explain_lines(cursor, sql, vars)
+        except Exception as exc:
+            plan = [f"EXPLAIN failed: {exc}"]
+    log_slow_query(metrics.current_route.get(), sql, vars, elapsed, plan)
+
+
+if PROFILE_ENABLED:
+    metrics.statement_observers.append(record_statement)
+
+
+def profile_requested(header, flag):
+    if not PROFILE_ENABLED:
+        return False
+    value = header or flag
+    if not value:
+        return False
+    return value == PROFILE_TOKEN if PROFILE_TOKEN else value.lower() in ("1", "true", "yes", "on")
+
+
+def start_profile():
+    profile = {"db": 0.0, "statements": []}
+    current_profile.set(profile)
+    return profile
+
+
+def finish_profile(profile, route, total):
+    # Server-Timing tarayıcının geliştirici araçlarında da görünür
+    current_profile.set(None)
+    db = profile["db"]
+    count = len(profile["statements"])
+    profile_log.info(
+        "profile %s total=%.1fms db=%.1fms (%d statements) python=%.1fms %s",
+        route, total * 1000, db * 1000, count, (total - db) * 1000,
+        " ".join(f"{statement}={elapsed * 1000:.1f}ms" for statement, elapsed in profile["statements"]),
+    )
+    return (
+        f'db;dur={db * 1000:.2f};desc="{count} statements", '
+        f"app;dur={(total - db) * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
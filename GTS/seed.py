@@ -0,0 +1,240 @@
+import argparse
+import sys
+
+from db import DB_NAME, connect
+
+# Sentetik veri üretici: plan kontrolleri ve benchmark'lar için boş/scratch bir
+# veritabanını istenen ölçekte doldurur. Tüm insert'ler set-based (generate_series).
+#
+#   DB_NAME=gtsdb_scratch python seed.py --theses 20000
+
+TOPICS = [
+    "Artificial Intelligence", "Machine Learning", "Data Mining", "Computer Vision",
+    "Natural Language Processing", "Renewable Energy", "Energy Storage", "Climate Change",
+    "Marine Biology", "Public Health", "Epidemiology", "Art Therapy", "Cognitive Science",
+    "Urban Mobility", "Smart Cities", "Robotics", "Cyber Security", "Databases",
+    "Distributed Systems", "Software Engineering", "Economics", "Education", "Linguistics",
+    "Sociology", "Materials Science", "Structural Engineering", "Genetics", "Neuroscience",
+]
+WORDS = [
+    "analysis", "model", "design", "prediction", "efficiency", "study", "system", "network",
+    "learning", "data", "health", "climate", "ocean", "battery", "storage", "traffic",
+    "mobility", "forecasting", "cognition", "creativity", "therapy", "diagnosis", "scoring",
+    "speech", "evaluation", "optimization", "simulation", "framework", "approach", "method",
+    "performance", "security", "energy", "urban", "social", "policy", "education", "quality",
+    "signal", "image", "language", "graph", "sensor", "control", "risk", "decision", "algorithm",
+]
+FIRST_NAMES = [
+    "Aylin", "Burak", "Selin", "Eren", "Naz", "Koray", "Zeynep", "Mert", "Elif", "Can",
+    "Deniz", "Ece", "Emre", "Irmak", "Kaan", "Lara", "Mina", "Ozan", "Su", "Yagmur",
+]
+LAST_NAMES = [
+    "Koral", "Temel", "Uslu", "Dumlu", "Ersoy", "Aktas", "Yilmaz", "Demir", "Sahin", "Celik",
+    "Aydin", "Ozdemir", "Arslan", "Dogan", "Kilic", "Korkmaz", "Cakir", "Ozel", "Ozbilgin",
+]
+CITIES = ["Istanbul", "Ankara", "Izmir", "Eskisehir", "Trabzon", "Bursa", "Antalya", "Konya"]
+LANGUAGES = ["English", "English", "English", "Turkish", "Turkish", "German", "French"]
+THESIS_TYPES = ["Master", "Master", "PhD"]
+
+
+def seed(
+    conn,
+    theses=10000,
+    persons=None,
+    universities=50,
+    institutes_per_university=4,
+    topics_per_thesis=3,
+    keywords_per_thesis=5,
+    abstract_words=60,
+    skew=1.0,
+    random_seed=0.42,
+):
+    # skew > 1: tezler az sayıda enstitü/üniversitede yoğunlaşır (gerçek kataloglardaki
+    # gibi büyük ve küçük kurumlar); 1 ise eşit dağılır
+    persons = persons or max(theses // 2, 10)
+    cur = conn.cursor()
+    params = {
+        "theses": theses,
+        "persons": persons,
+        "universities": universities,
+        "ins_per_uni": institutes_per_university,
+        "topics_per_thesis": topics_per_thesis,
+        "keywords_per_thesis": keywords_per_thesis,
+        "abstract_words": abstract_words,
+        "skew": skew,
+        "topics": TOPICS,
+        "words": WORDS,
+        "first_names": FIRST_NAMES,
+        "last_names": LAST_NAMES,
+        "cities": CITIES,
+        "languages": LANGUAGES,
+        "types": THESIS_TYPES,
+    }
+    try:
+        cur.execute("SELECT setseed(%s)", (random_seed,))
+
+        cur.execute("""
+            CREATE TEMP TABLE seed_university ON COMMIT DROP AS
+            WITH ins AS (
+                INSERT INTO university (uni_name, uni_location)
+                SELECT
+                    'Synthetic University ' || g,
+                    (%(cities)s::text[])[1 + g %% cardinality(%(cities)s::text[])]
+                FROM generate_series(1, %(universities)s) g
+                RETURNING uni_id
+            )
+            SELECT uni_id FROM ins
+        """, params)
+
+        cur.execute("""
+            CREATE TEMP TABLE seed_institute ON COMMIT DROP AS
+            WITH ins AS (
+                INSERT INTO institute (ins_name, uni_id)
+                SELECT 'Graduate School ' || i || ' of University ' || U.uni_id, U.uni_id
+                FROM seed_university U, generate_series(1, %(ins_per_uni)s) i
+                RETURNING ins_id, uni_id
+            )
+            SELECT row_number() OVER (ORDER BY ins_id) AS rn, ins_id, uni_id FROM ins
+        """, params)
+
+        cur.execute("""
+            CREATE TEMP TABLE seed_person ON COMMIT DROP AS
+            WITH ins AS (
+                INSERT INTO person (first_name, second_name, phone_num)
+                SELECT
+                    (%(first_names)s::text[])[1 + floor(random() * cardinality(%(first_names)s::text[]))::int],
+                    (%(last_names)s::text[])[1 + floor(random() * cardinality(%(last_names)s::text[]))::int],
+                    '05' || lpad((floor(random() * 1e9))::bigint::text, 9, '0')
+                FROM generate_series(1, %(persons)s) g
+                RETURNING per_id
+            )
+            SELECT row_number() OVER (ORDER BY per_id) AS rn, per_id FROM ins
+        """, params)
+
+        # Yazar/enstitü seçimi rastgele satır numarası üzerinden join ile yapılır
+        cur.execute("""
+            CREATE TEMP TABLE seed_thesis ON COMMIT DROP AS
+            WITH picks AS (
+                SELECT
+                    g,
+                    1 + floor(random() * %(persons)s)::int AS person_rn,
+                    1 + floor(power(random(), %(skew)s) * (SELECT count(*) FROM seed_institute))::int AS institute_rn,
+                    make_date(1990 + floor(random() * 35)::int, 1, 1) AS th_year
+                FROM generate_series(1, %(theses)s) g
+            ),
+            ins AS (
+                INSERT INTO thesis (
+                    title, abstract, author_id, th_year, th_type, uni_id, ins_id,
+                    page_num, th_language, submission_date
+                )
+                SELECT
+                    initcap(array_to_string(ARRAY(
+                        SELECT (%(words)s::text[])[1 + floor(random() * cardinality(%(words)s::text[]))::int]
+                        FROM generate_series(1, 6) w
+                        WHERE w > 0 * X.g
+                    ), ' ')),
+                    array_to_string(ARRAY(
+                        SELECT (%(words)s::text[])[1 + floor(random() * cardinality(%(words)s::text[]))::int]
+                        FROM generate_series(1, %(abstract_words)s) w
+                        WHERE w > 0 * X.g
+                    ), ' '),
+                    P.per_id,
+                    X.th_year,
+                    (%(types)s::text[])[1 + floor(random() * cardinality(%(types)s::text[]))::int],
+                    I.uni_id,
+                    I.ins_id,
+                    40 + floor(random() * 260)::int,
+                    (%(languages)s::text[])[1 + floor(random() * cardinality(%(languages)s::text[]))::int],
+                    X.th_year + (floor(random() * 540))::int
+                FROM picks X
+                JOIN seed_person P ON P.rn = X.person_rn
+                JOIN seed_institute I ON I.rn = X.institute_rn
+                RETURNING th_num, author_id
+            )
+            SELECT th_num, author_id FROM ins
+        """, params)
+
+        # Aynı tezde aynı konu tekrar etmesin diye ardışık offset'ler kullanılır
+        cur.execute("""
+            INSERT INTO topic (th_num, topic_name)
+            SELECT T.th_num, (%(topics)s::text[])[1 + (T.th_num * 7 + i) %% cardinality(%(topics)s::text[])]
+            FROM seed_thesis T, generate_series(1, %(topics_per_thesis)s) i
+        """, params)
+
+        cur.execute("""
+            INSERT INTO keyword (th_num, keyword)
+            SELECT T.th_num, (%(words)s::text[])[1 + (T.th_num * 11 + i) %% cardinality(%(words)s::text[])]
+            FROM seed_thesis T, generate_series(1, %(keywords_per_thesis)s) i
+        """, params)
+
+        # Tezlerin ~%90'ına danışman, ~%50'sine eş danışman
+        cur.execute("""
+            INSERT INTO supervisor (per_id, th_num)
+            SELECT P.per_id, T.th_num
+            FROM seed_thesis T
+            JOIN seed_person P ON P.rn = 1 + (T.th_num * 13) %% %(persons)s
+            WHERE random() < 0.9 AND P.per_id <> T.author_id
+        """, params)
+
+        cur.execute("""
+            INSERT INTO cosupervisor (per_id, th_num)
+            SELECT P.per_id, T.th_num
+            FROM seed_thesis T
+            JOIN seed_person P ON P.rn = 1 + (T.th_num * 17 + 1) %% %(persons)s
+            WHERE random() < 0.5 AND P.per_id <> T.author_id
+        """, params)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    # ANALYZE transaction dışında; planner istatistikleri yeni veriyi görsün
+    old_autocommit = conn.autocommit
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        cur.execute("ANALYZE")
+    finally:
+        cur.close()
+        conn.autocommit = old_autocommit
+
+    return {"theses": theses, "persons": persons, "universities": universities}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the GTS database with synthetic data")
+    parser.add_argument("--theses", type=int, default=10000)
+    parser.add_argument("--persons", type=int, default=None)
+    parser.add_argument("--universities", type=int, default=50)
+    parser.add_argument("--institutes-per-university", type=int, default=4)
+    parser.add_argument("--topics-per-thesis", type=int, default=3)
+    parser.add_argument("--keywords-per-thesis", type=int, default=5)
+    parser.add_argument("--abstract-words", type=int, default=60)
+    parser.add_argument("--skew", type=float, default=1.0,
+                        help="concentrate theses in few institutes (1 = uniform, 2-3 = realistic)")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    try:
+        result = seed(
+            conn,
+            theses=args.theses,
+            persons=args.persons,
+            universities=args.universities,
+            institutes_per_university=args.institutes_per_university,
+            topics_per_thesis=args.topics_per_thesis,
+            keywords_per_thesis=args.keywords_per_thesis,
+            abstract_words=args.abstract_words,
+            skew=args.skew,
+        )
+    finally:
+        conn.close()
+    print(f"seeded {DB_NAME}: {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
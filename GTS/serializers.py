@@ -0,0 +1,57 @@
+import json
+import os
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # sadece JSON_BACKEND=orjson için gerekli
+    orjson = None
+
+# JSON CONFIG
+# stdlib: Flask'ın varsayılan encoder'ı (tarihler HTTP tarihi olarak, ör.
+# "Mon, 12 Jun 2023 00:00:00 GMT"); orjson: C ile yazılmış encoder, cevap gövdesi
+# doğrudan bytes olarak üretilir, tarihler ISO 8601 ("2023-06-12") olarak yazılır
+JSON_BACKEND = os.getenv("JSON_BACKEND", "stdlib").lower()
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Anahtarlar stdlib provider'daki gibi sıralı; orjson'un bilmediği tipler
+    # (Decimal, UUID, ...) Flask'ın default fonksiyonuna düşer
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def dumps(self, obj, **kwargs):
+        # indent/separators gibi argümanlar yok sayılır; çıktı her zaman kompakttır
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def create_json_provider(app, backend=JSON_BACKEND):
+    if backend == "stdlib":
+        return DefaultJSONProvider(app)
+    if backend == "orjson":
+        if orjson is None:
+            raise RuntimeError("JSON_BACKEND=orjson requires the orjson package")
+        return OrjsonProvider(app)
+    raise ValueError(f"Unknown JSON_BACKEND: {backend}")
+
+
+def _export_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def export_json_line(row, backend=JSON_BACKEND):
+    # Export satırı: kolon sırası korunur, tarihler iki backend'de de ISO 8601
+    if backend == "orjson" and orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE).decode()
+    return json.dumps(row, default=_export_default, ensure_ascii=False) + "\n"
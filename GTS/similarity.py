@@ -0,0 +1,296 @@
+import argparse
+import os
+import sys
+import time
+
+from db import connect
+
+# GET /api/theses/<id>/similar için önceden hesaplanmış benzerlik index'i
+# (migrations/0007). Tam oluşturma offline yapılır; tez yazan route'lar sadece
+# kendi tezini refresh_similar() ile günceller:
+#
+#   python similarity.py build           # tüm index'i yeniden oluştur (cron için)
+#
+# Benzerlik ağırlıklı Jaccard'dır: ortak terimlerin ağırlık toplamı / iki tezin
+# terimlerinin birleşiminin ağırlık toplamı. Nadir terim daha çok ağırlık taşır.
+SIMILAR_K = int(os.getenv("SIMILAR_K", "20"))
+# Bu kadar tezden fazlasında geçen terimler ("AI" gibi) tezleri ayırt etmez ve
+# aday çiftleri karesel büyütür; ortak terim olarak sayılmazlar
+SIMILAR_MAX_DF = int(os.getenv("SIMILAR_MAX_DF", "1000"))
+# Aynı anda iki tam oluşturma çalışmasın diye
+SIMILAR_LOCK_ID = 4747003
+# Artımlı güncellemeler ortak satırlara (similar_term sayaçları, diğer tezlerin
+# listeleri) farklı sırayla yazar; similar_thesis FK'leri de diğer tezlerin
+# satırlarına KEY SHARE kilidi alır. Deadlock olmasın diye bu yazmalar sırayla
+# yapılır: mevcut tez satırlarını kilitleyen transaction'lar (güncelleme,
+# silme, toplu PATCH) bu kilidi ilk tez kilidinden önce lock_similar ile alır.
+SIMILAR_WRITE_LOCK_ID = 4747004
+
+# Konu adları olduğu gibi, keyword satırları virgülle bölünerek terim olur
+TERMS_SQL = """
+    SELECT DISTINCT S.th_num, S.term
+    FROM (
+        SELECT P.th_num, lower(btrim(P.topic_name)) AS term
+        FROM public.topic P
+        {topic_filter}
+        UNION ALL
+        SELECT K.th_num, lower(btrim(W.term))
+        FROM public.keyword K
+        CROSS JOIN regexp_split_to_table(K.keyword, ',') AS W(term)
+        {keyword_filter}
+    ) S
+    WHERE S.term <> ''
+"""
+
+WEIGHT_SQL = "ln(1 + (SELECT greatest(thesis_count, 1) FROM public.similar_index)::float8 / greatest({df}, 1))"
+
+
+def build_similar(conn, k=SIMILAR_K, max_df=SIMILAR_MAX_DF, log=print):
+    # Tek transaction: oluşturma sürerken /api/theses/<id>/similar eski index'i okur
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (SIMILAR_LOCK_ID,))
+        if not cur.fetchone()[0]:
+            log("another build is running")
+            conn.rollback()
+            return False
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (SIMILAR_WRITE_LOCK_ID,))
+
+        started = time.monotonic()
+        cur.execute("""
+            UPDATE public.similar_index
+            SET built_at = now(), thesis_count = (SELECT count(*) FROM public.thesis)
+        """)
+        cur.execute("DELETE FROM public.similar_thesis")
+        cur.execute("DELETE FROM public.thesis_term")
+        cur.execute("DELETE FROM public.similar_term")
+        cur.execute(
+            "INSERT INTO public.thesis_term (th_num, term) "
+            + TERMS_SQL.format(topic_filter="", keyword_filter="")
+        )
+        cur.execute(f"""
+            INSERT INTO public.similar_term (term, df, weight)
+            SELECT term, count(*), {WEIGHT_SQL.format(df="count(*)")}
+            FROM public.thesis_term
+            GROUP BY term
+        """)
+        cur.execute("""
+            INSERT INTO public.similar_thesis (th_num, similar_th_num, score)
+            WITH total AS (
+                SELECT T.th_num, sum(V.weight) AS weight
+                FROM public.thesis_term T
+                JOIN public.similar_term V ON V.term = T.term
+                GROUP BY T.th_num
+            ),
+            shared AS (
+                SELECT A.th_num, B.th_num AS other, sum(V.weight) AS weight
+                FROM public.similar_term V
+                JOIN public.thesis_term A ON A.term = V.term
+                JOIN public.thesis_term B ON B.term = V.term AND B.th_num <> A.th_num
+                WHERE V.df BETWEEN 2 AND %(max_df)s
+                GROUP BY A.th_num, B.th_num
+            ),
+            scored AS (
+                SELECT
+                    S.th_num,
+                    S.other,
+                    S.weight / (TA.weight + TB.weight - S.weight) AS score
+                FROM shared S
+                JOIN total TA ON TA.th_num = S.th_num
+                JOIN total TB ON TB.th_num = S.other
+            )
+            SELECT th_num, other, score
+            FROM (
+                SELECT *, row_number() OVER (PARTITION BY th_num ORDER BY score DESC, other) AS rank
+                FROM scored
+            ) R
+            WHERE rank <= %(k)s
+        """, {"k": k, "max_df": max_df})
+        pairs = cur.rowcount
+        conn.commit()
+        log(f"indexed {pairs} similar pairs in {time.monotonic() - started:.2f}s")
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def lock_similar(conn):
+    # Transaction sonuna kadar tutulur; aynı transaction'da tekrar almak bekletmez
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (SIMILAR_WRITE_LOCK_ID,))
+    finally:
+        cur.close()
+
+
+def refresh_similar(conn, th_num, k=SIMILAR_K, max_df=SIMILAR_MAX_DF):
+    # Tezin terimlerini günceller ve değiştiyse benzer listesini yeniden hesaplar.
+    # Çağıranın transaction'ında çalışır; commit çağırana kalır. Tez yeni eşleştiği
+    # tezlerin listesine de girer; eskiden girdiği listelerden çıkarken yerine
+    # gelecek tez bir sonraki build'e kadar eksik kalır. Terimler değiştiyse True döner.
+    lock_similar(conn)
+    cur = conn.cursor()
+    try:
+        return _refresh_similar(cur, th_num, k, max_df)
+    finally:
+        cur.close()
+
+
+def _refresh_similar(cur, th_num, k, max_df):
+    cur.execute(f"""
+        WITH current AS (
+            {TERMS_SQL.format(
+                topic_filter="WHERE P.th_num = %(th_num)s",
+                keyword_filter="WHERE K.th_num = %(th_num)s",
+            )}
+        ),
+        removed AS (
+            DELETE FROM public.thesis_term T
+            WHERE T.th_num = %(th_num)s
+              AND T.term NOT IN (SELECT term FROM current)
+            RETURNING T.term
+        ),
+        added AS (
+            INSERT INTO public.thesis_term (th_num, term)
+            SELECT %(th_num)s, C.term
+            FROM current C
+            WHERE NOT EXISTS (
+                SELECT 1 FROM public.thesis_term T
+                WHERE T.th_num = %(th_num)s AND T.term = C.term
+            )
+            RETURNING term
+        ),
+        decremented AS (
+            UPDATE public.similar_term V
+            SET df = V.df - 1,
+                weight = {WEIGHT_SQL.format(df="V.df - 1")}
+            WHERE V.term IN (SELECT term FROM removed)
+        ),
+        incremented AS (
+            INSERT INTO public.similar_term AS V (term, df, weight)
+            SELECT term, 1, {WEIGHT_SQL.format(df="1")}
+            FROM added
+            ON CONFLICT (term) DO UPDATE
+            SET df = V.df + 1,
+                weight = {WEIGHT_SQL.format(df="V.df + 1")}
+        )
+        SELECT (SELECT count(*) FROM removed) + (SELECT count(*) FROM added)
+    """, {"th_num": th_num})
+    if not cur.fetchone()[0]:
+        return False
+
+    cur.execute(
+        "DELETE FROM public.similar_thesis WHERE th_num = %(th_num)s OR similar_th_num = %(th_num)s",
+        {"th_num": th_num},
+    )
+    # Adaylar nadir terimlerin posting listelerinden gelir (en fazla terim × max_df)
+    cur.execute("""
+        WITH shared AS (
+            SELECT B.th_num AS other, sum(V.weight) AS weight
+            FROM public.thesis_term A
+            JOIN public.similar_term V ON V.term = A.term AND V.df <= %(max_df)s
+            JOIN public.thesis_term B ON B.term = A.term AND B.th_num <> A.th_num
+            WHERE A.th_num = %(th_num)s
+            GROUP BY B.th_num
+        ),
+        scored AS (
+            SELECT
+                S.other,
+                S.weight / (
+                    (SELECT sum(V.weight) FROM public.thesis_term T
+                     JOIN public.similar_term V ON V.term = T.term
+                     WHERE T.th_num = %(th_num)s)
+                    + (SELECT sum(V.weight) FROM public.thesis_term T
+                       JOIN public.similar_term V ON V.term = T.term
+                       WHERE T.th_num = S.other)
+                    - S.weight
+                ) AS score
+            FROM shared S
+        ),
+        own AS (
+            INSERT INTO public.similar_thesis (th_num, similar_th_num, score)
+            SELECT %(th_num)s, other, score
+            FROM scored
+            ORDER BY score DESC, other
+            LIMIT %(k)s
+        )
+        -- Karşı taraf: listesi dolu değilse ya da son sıradakini geçiyorsa eklenir
+        INSERT INTO public.similar_thesis (th_num, similar_th_num, score)
+        SELECT S.other, %(th_num)s, S.score
+        FROM scored S
+        WHERE S.score > coalesce((
+            SELECT X.score FROM public.similar_thesis X
+            WHERE X.th_num = S.other
+            ORDER BY X.score DESC
+            OFFSET (%(k)s - 1) LIMIT 1
+        ), 0)
+        RETURNING th_num
+    """, {"th_num": th_num, "k": k, "max_df": max_df})
+    grown = [row[0] for row in cur.fetchall()]
+    if grown:
+        # Yeni satırla k'yı aşan listelerin sonuncusu düşer
+        cur.execute("""
+            DELETE FROM public.similar_thesis S
+            USING (
+                SELECT th_num, similar_th_num,
+                       row_number() OVER (PARTITION BY th_num ORDER BY score DESC, similar_th_num) AS rank
+                FROM public.similar_thesis
+                WHERE th_num = ANY(%(grown)s)
+            ) R
+            WHERE S.th_num = R.th_num
+              AND S.similar_th_num = R.similar_th_num
+              AND R.rank > %(k)s
+        """, {"grown": grown, "k": k})
+    return True
+
+
+def forget_theses(conn, th_nums):
+    # Silinecek tezleri index'ten çıkarır ve terim sayaçlarını düşer. Diğer
+    # tezlerin listelerinde boşalan yerler bir sonraki build'de dolar.
+    lock_similar(conn)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            WITH removed AS (
+                DELETE FROM public.thesis_term
+                WHERE th_num = ANY(%(th_nums)s)
+                RETURNING term
+            ),
+            counts AS (
+                SELECT term, count(*) AS n FROM removed GROUP BY term
+            )
+            UPDATE public.similar_term V
+            SET df = V.df - C.n,
+                weight = {WEIGHT_SQL.format(df="V.df - C.n")}
+            FROM counts C
+            WHERE V.term = C.term
+        """, {"th_nums": th_nums})
+        # İki ayrı statement: OR ile birleşince çok id'de seq scan'e düşüyor
+        cur.execute("DELETE FROM public.similar_thesis WHERE th_num = ANY(%s)", (th_nums,))
+        cur.execute("DELETE FROM public.similar_thesis WHERE similar_th_num = ANY(%s)", (th_nums,))
+    finally:
+        cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the similar-thesis index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="rebuild the whole index")
+    build.add_argument("-k", type=int, default=SIMILAR_K, help="similar theses kept per thesis")
+    build.add_argument("--max-df", type=int, default=SIMILAR_MAX_DF,
+                       help="ignore terms shared by more theses than this")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    try:
+        build_similar(conn, k=args.k, max_df=args.max_df)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import argparse
+import sys
+import time
+
+from db import connect
+
+# /api/stats materialized view'larını (migrations/0005) yeniler. Kaynak tablolar
+# son yenilemeden beri değişmediyse hiçbir şey yapmaz; sık çalıştırmak ucuzdur:
+#
+#   python stats.py refresh              # tek sefer (cron için)
+#   python stats.py refresh --every 60   # 60 saniyede bir, sürekli
+#   python stats.py refresh --force      # değişiklik olmasa da yenile
+
+STATS_VIEWS = [
+    "stats_overview",
+    "stats_university",
+    "stats_institute",
+    "stats_year",
+    "stats_type",
+    "stats_language",
+    "stats_topic",
+    "stats_keyword",
+]
+STATS_SOURCE_TABLES = ["thesis", "person", "university", "institute", "topic", "keyword"]
+# Aynı anda iki yenileme çalışmasın diye
+STATS_LOCK_ID = 4747002
+
+
+def source_version(cur):
+    cur.execute(
+        "SELECT coalesce(sum(version), 0) FROM public.table_version WHERE table_name = ANY(%s)",
+        (STATS_SOURCE_TABLES,),
+    )
+    return cur.fetchone()[0]
+
+
+def refresh_stats(conn, force=False, log=print):
+    # CONCURRENTLY: yenileme sırasında /api/stats eski veriyi okumaya devam eder
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (STATS_LOCK_ID,))
+        if not cur.fetchone()[0]:
+            log("another refresh is running")
+            conn.rollback()
+            return False
+
+        # Versiyon yenilemeden önce okunur; yenileme sırasında gelen yazmalar
+        # bir sonraki çalıştırmada yakalanır
+        version = source_version(cur)
+        cur.execute("SELECT source_version FROM public.stats_refresh")
+        row = cur.fetchone()
+        if not force and row is not None and row[0] == version:
+            conn.rollback()
+            return False
+
+        started = time.monotonic()
+        for view in STATS_VIEWS:
+            cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY public.{view}")
+        cur.execute("""
+            INSERT INTO public.stats_refresh (id, refreshed_at, source_version)
+            VALUES (true, now(), %s)
+            ON CONFLICT (id) DO UPDATE
+            SET refreshed_at = EXCLUDED.refreshed_at,
+                source_version = EXCLUDED.source_version
+        """, (version,))
+        cur.execute("INSERT INTO public.table_change (table_name) VALUES ('stats')")
+        conn.commit()
+        log(f"refreshed {len(STATS_VIEWS)} views in {time.monotonic() - started:.2f}s")
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the /api/stats materialized views")
+    sub = parser.add_subparsers(dest="command", required=True)
+    refresh = sub.add_parser("refresh", help="refresh the views if the catalogue changed")
+    refresh.add_argument("--every", type=float, metavar="SECONDS",
+                         help="keep running and check every SECONDS")
+    refresh.add_argument("--force", action="store_true", help="refresh even if nothing changed")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    try:
+        while True:
+            refresh_stats(conn, force=args.force)
+            if not args.every:
+                break
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,27 @@ type InstituteRow = {
   universityName?: string;
 };
 
+// Persons, universities and institutes in one /api/bundle request; null if any part failed
+const fetchEntitiesBundle = async (signal?: AbortSignal) => {
+  const response = await fetch('/api/bundle', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      requests: {
+        persons: '/api/persons',
+        universities: '/api/universities',
+        institutes: '/api/institutes',
+      },
+    }),
+    signal,
+  });
+  if (!response.ok) return null;
+  const bundle = await response.json();
+  const parts = [bundle.persons, bundle.universities, bundle.institutes];
+  if (parts.some((part) => !part || part.status !== 200)) return null;
+  return parts.map((part) => part.body);
+};
+
 export default function Home() {
   const [activeTab, setActiveTab] = useState<TabType>('theses');
   const [deleteModal, setDeleteModal] = useState<{ isOpen: boolean; id: number | null; title: string; entityType: string }>({
@@ -88,19 +109,11 @@ export default function Home() {
       setEntitiesLoading(true);
       setEntitiesError(null);
       try {
-        const [personsRes, universitiesRes, institutesRes] = await Promise.all([
-          fetch('/api/persons', { signal: controller.signal }),
-          fetch('/api/universities', { signal: controller.signal }),
-          fetch('/api/institutes', { signal: controller.signal }),
-        ]);
-        if (!personsRes.ok || !universitiesRes.ok || !institutesRes.ok) {
+        const bundle = await fetchEntitiesBundle(controller.signal);
+        if (!bundle) {
           throw new Error('HTTP error');
         }
-        const [personsData, universitiesData, institutesData] = await Promise.all([
-          personsRes.json(),
-          universitiesRes.json(),
-          institutesRes.json(),
-        ]);
+        const [personsData, universitiesData, institutesData] = bundle;
         setPersons(Array.isArray(personsData) ? personsData : []);
         setUniversities(Array.isArray(universitiesData) ? universitiesData : []);
         setInstitutes(Array.isArray(institutesData) ? institutesData : []);
@@ -137,23 +150,12 @@ export default function Home() {
 
   const reloadEntities = async () => {
     try {
-      const [personsRes, universitiesRes, institutesRes] = await Promise.all([
-        fetch('/api/persons'),
-        fetch('/api/universities'),
-        fetch('/api/institutes'),
-      ]);
-      if (personsRes.ok) {
-        const personsData = await personsRes.json();
-        setPersons(Array.isArray(personsData) ? personsData : []);
-      }
-      if (universitiesRes.ok) {
-        const universitiesData = await universitiesRes.json();
-        setUniversities(Array.isArray(universitiesData) ? universitiesData : []);
-      }
-      if (institutesRes.ok) {
-        const institutesData = await institutesRes.json();
-        setInstitutes(Array.isArray(institutesData) ? institutesData : []);
-      }
+      const bundle = await fetchEntitiesBundle();
+      if (!bundle) return;
+      const [personsData, universitiesData, institutesData] = bundle;
+      setPersons(Array.isArray(personsData) ? personsData : []);
+      setUniversities(Array.isArray(universitiesData) ? universitiesData : []);
+      setInstitutes(Array.isArray(institutesData) ? institutesData : []);
     } catch {
       // ignore reload errors
     }
@@ -65,22 +65,34 @@ export default function ThesisEdit() {
       setLoading(true);
       setError(null);
       try {
-        const [thesisRes, personsRes, universitiesRes, institutesRes] = await Promise.all([
-          fetch(`/api/theses/${id}`, { signal: controller.signal }),
-          fetch('/api/persons', { signal: controller.signal }),
-          fetch('/api/universities', { signal: controller.signal }),
-          fetch('/api/institutes', { signal: controller.signal }),
-        ]);
-        if (!thesisRes.ok) {
-          throw new Error(`HTTP ${thesisRes.status}`);
+        // One request (one DB connection and snapshot) for the whole form
+        const response = await fetch('/api/bundle', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            requests: {
+              thesis: `/api/theses/${id}`,
+              persons: '/api/persons',
+              universities: '/api/universities',
+              institutes: '/api/institutes',
+            },
+          }),
+          signal: controller.signal,
+        });
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}`);
         }
-        const thesisData = await thesisRes.json();
+        const bundle = await response.json();
+        if (bundle.thesis.status !== 200) {
+          throw new Error(`HTTP ${bundle.thesis.status}`);
+        }
+        const thesisData = bundle.thesis.body;
         setThesis(thesisData);
         setTopics(Array.isArray(thesisData.topics) && thesisData.topics.length > 0 ? thesisData.topics : ['']);
         setKeywords(Array.isArray(thesisData.keywords) && thesisData.keywords.length > 0 ? thesisData.keywords : ['']);
-        const personsData = personsRes.ok ? await personsRes.json() : [];
-        const universitiesData = universitiesRes.ok ? await universitiesRes.json() : [];
-        const institutesData = institutesRes.ok ? await institutesRes.json() : [];
+        const personsData = bundle.persons.status === 200 ? bundle.persons.body : [];
+        const universitiesData = bundle.universities.status === 200 ? bundle.universities.body : [];
+        const institutesData = bundle.institutes.status === 200 ? bundle.institutes.body : [];
         setPersons(Array.isArray(personsData) ? personsData : []);
         setUniversities(Array.isArray(universitiesData) ? universitiesData : []);
         setInstitutes(Array.isArray(institutesData) ? institutesData : []);